@@ -0,0 +1,68 @@
+"""
+bench_lattice_backends.py
+
+Benchmarks the array backends of simulation.lattice_solver.run_lattice_solver.
+
+Purpose:
+- Compare the NumPy reference path with the Numba njit(parallel=True) kernel
+- Show strong scaling of the Numba kernel over thread counts on a multi-core CPU
+
+Inputs:
+- grid size, number of steps, thread counts (command-line flags)
+
+Outputs:
+- One JSON line per (backend, threads) with steps_per_sec and speedup vs NumPy
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.lattice_solver import run_lattice_solver, NUMBA_AVAILABLE
+
+
+def _time(fn, n_steps: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return n_steps / (time.perf_counter() - t0)
+
+
+def run_benchmark(grid_size: int = 1024, n_steps: int = 20, threads=None) -> list:
+    rng = np.random.default_rng(0)
+    Phi = rng.standard_normal((grid_size, grid_size))
+    V = rng.standard_normal((grid_size, grid_size, 2))
+    S = rng.standard_normal((grid_size, grid_size))
+
+    results = []
+    base = _time(lambda: run_lattice_solver(Phi, V, S, n_steps=n_steps, backend='numpy'), n_steps)
+    results.append({'backend': 'numpy', 'threads': 1, 'grid_size': grid_size, 'steps_per_sec': base, 'speedup': 1.0})
+    if not NUMBA_AVAILABLE:
+        return results
+
+    import numba
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    threads = threads or sorted({1, 2, 4, 8, 16, 32, max_threads})
+    run_lattice_solver(Phi[:8, :8], V[:8, :8], S[:8, :8], n_steps=1, backend='numba')  # JIT warm-up
+    for n in threads:
+        if n > max_threads:
+            continue
+        numba.set_num_threads(n)
+        rate = _time(lambda: run_lattice_solver(Phi, V, S, n_steps=n_steps, backend='numba'), n_steps)
+        results.append({'backend': 'numba', 'threads': n, 'grid_size': grid_size, 'steps_per_sec': rate, 'speedup': rate / base})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark lattice solver backends')
+    parser.add_argument('--size', type=int, default=1024)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--threads', type=int, nargs='*', default=None)
+    args = parser.parse_args()
+    for rec in run_benchmark(args.size, args.steps, args.threads):
+        print(json.dumps(rec))
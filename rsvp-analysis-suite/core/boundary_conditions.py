@@ -4,54 +4,222 @@ boundary_conditions.py
 Implements boundary handling for RSVP fields (Phi, V, S) on 2D/3D lattices.
 
 Purpose:
-- Supports reflective, periodic, and open boundary conditions.
+- Supports periodic, reflective, open, Dirichlet and Neumann boundary conditions.
 - Ensures consistent evolution for core solvers and simulations.
+- Provides a ghost-cell layer (`GhostField`): the field lives in the interior of a
+  buffer padded by one cell along each lattice axis, `fill_ghosts` rewrites only the
+  ghost slabs in place, and the Laplacian / central differences read shifted views of
+  the buffer. The lattice, Lamphron, stochastic and entropy-balance operators use it
+  for every boundary other than periodic on a 2D lattice (which keeps their existing
+  np.roll / slice kernels).
 
 Inputs:
-- Field array (Phi, V, or S)
-- bc_type: 'reflective', 'periodic', or 'open'
+- Field array (Phi, V, or S); trailing component axes (e.g. V[..., 2]) are not padded
+- bc_type: 'periodic', 'reflective', 'open', 'dirichlet' or 'neumann', or one name
+  per lattice axis
+- value: Dirichlet boundary value or Neumann outward gradient (scalar or per axis)
 
 Outputs:
 - Field array with boundary conditions applied
+- Ghost-padded buffers and stencil results on the interior
+
+Ghost-cell conventions (g = ghost, u_b = adjacent interior cell, u_f = the interior
+cell at the opposite face):
+- periodic:   g = u_f (wrap-around)
+- reflective: g = u_b (mirror about the face; zero flux)
+- open:       g = 0 (zero padding)
+- dirichlet:  g = 2 * value - u_b (the face value equals `value`)
+- neumann:    g = u_b + value * dx (outward gradient equals `value`; reflective is
+  the value = 0 case)
 
 Testing Focus:
 - Correct mirroring for reflective BC
-- Wrap-around for periodic BC
+- Wrap-around for periodic BC (matches np.roll stencils)
 - Zero-padding for open BC
+- Face values / fluxes for Dirichlet and Neumann BC, in 2D and 3D
 """
 from __future__ import annotations
+from typing import Optional, Sequence, Tuple, Union
 import numpy as np
 
+BOUNDARY_TYPES = ('periodic', 'reflective', 'open', 'dirichlet', 'neumann')
+
+BCSpec = Union[str, Sequence[str]]
+
+
+def _per_axis(bc: BCSpec, value, ndim: int) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+    """Normalize a boundary spec and its value to one entry per lattice axis."""
+    kinds = (bc,) * ndim if isinstance(bc, str) else tuple(bc)
+    values = tuple(value) if np.ndim(value) else (value,) * ndim
+    if len(kinds) != ndim or len(values) != ndim:
+        raise ValueError(f'expected {ndim} boundary entries, got {len(kinds)} types and {len(values)} values')
+    for kind in kinds:
+        if kind not in BOUNDARY_TYPES:
+            raise ValueError(f'Unknown boundary condition type: {kind}')
+    return kinds, tuple(float(v) for v in values)
+
+
+def _face(axis: int, index) -> tuple:
+    return (slice(None),) * axis + (index,)
+
+
+def fill_ghosts(padded: np.ndarray, bc: BCSpec = 'periodic', value=0.0, ndim: Optional[int] = None,
+                dx: float = 1.0) -> np.ndarray:
+    """Rewrite the one-cell ghost layer of `padded` in place and return it.
+
+    The first `ndim` axes (default: all) are lattice axes whose first and last entries
+    are ghosts. Axes are filled in order over their full extent, so edge and corner
+    ghosts are consistent as well. Only the ghost slabs are written.
+    """
+    ndim = padded.ndim if ndim is None else ndim
+    kinds, values = _per_axis(bc, value, ndim)
+    for axis, (kind, val) in enumerate(zip(kinds, values)):
+        lo, hi = _face(axis, 0), _face(axis, -1)
+        first, last = _face(axis, 1), _face(axis, -2)
+        if kind == 'periodic':
+            padded[lo] = padded[last]
+            padded[hi] = padded[first]
+        elif kind == 'open':
+            padded[lo] = 0
+            padded[hi] = 0
+        elif kind == 'dirichlet':
+            padded[lo] = 2 * val - padded[first]
+            padded[hi] = 2 * val - padded[last]
+        else:  # reflective / neumann
+            padded[lo] = padded[first]
+            padded[hi] = padded[last]
+            if kind == 'neumann' and val != 0.0:
+                padded[lo] += val * dx
+                padded[hi] += val * dx
+    return padded
+
+
+def apply_boundary(field: np.ndarray, bc_type: BCSpec = 'periodic', value=0.0, ndim: int = 2,
+                   inplace: bool = False) -> np.ndarray:
+    """Apply boundary conditions to a field array.
+
+    The outermost cells of the first `ndim` lattice axes (default 2, so the components
+    of a (nx, ny, 2) vector field are left alone; pass ndim=3 for a 3D lattice) are
+    treated as ghosts and rewritten with `fill_ghosts`. inplace=True writes the edges
+    of `field` itself instead of a copy.
+    """
+    field_bc = field if inplace else field.copy()
+    return fill_ghosts(field_bc, bc_type, value, ndim=ndim)
+
+
+def _float_dtype(dtype) -> np.dtype:
+    dtype = np.dtype(dtype)
+    return dtype if dtype.kind in 'fc' else np.dtype(np.float64)
+
+
+class GhostField:
+    """A lattice field stored in the interior of a one-cell ghost-padded buffer.
+
+    `interior` is a view of the field and is updated in place by the solvers; `fill()`
+    refreshes the ghost slabs for the configured boundary. The stencils read shifted
+    views of the padded buffer, so a step allocates nothing:
+      laplacian(out): sum over lattice axes of u[i-1] + u[i+1], minus 2 * ndim * u,
+                      accumulated in the same order as the np.roll stencils
+      central_difference(axis, out): (u[i+1] - u[i-1]) / 2
+      diffuse(coef):  interior += coef * laplacian
+
+    shape is the interior shape; its first `ndim` axes after `n_batch` leading batch
+    axes (e.g. ensemble members) are lattice axes and any remaining axes are field
+    components. `xp` is the array module (numpy or cupy) the buffer lives in.
+    """
+
+    def __init__(self, shape: Sequence[int], bc: BCSpec = 'periodic', value=0.0, ndim: Optional[int] = None,
+                 dx: float = 1.0, dtype=np.float64, n_batch: int = 0, xp=np):
+        shape = tuple(int(n) for n in shape)
+        ndim = len(shape) - n_batch if ndim is None else ndim
+        if ndim < 1 or n_batch + ndim > len(shape):
+            raise ValueError(f'cannot use {ndim} lattice axes after {n_batch} batch axes of shape {shape}')
+        _per_axis(bc, value, ndim)
+        self.shape = shape
+        self.bc = bc
+        self.value = value
+        self.ndim = ndim
+        self.n_batch = n_batch
+        self.dx = dx
+        self.xp = xp
+        lattice = range(n_batch, n_batch + ndim)
+        padded_shape = tuple(n + 2 if a in lattice else n for a, n in enumerate(shape))
+        self.padded = xp.zeros(padded_shape, dtype=dtype)
+        self.interior = self.padded[self._shift(None, 0)]
+        self._lap = xp.empty(shape, dtype=dtype)
+        self._work = xp.empty(shape, dtype=dtype)
+
+    @classmethod
+    def from_array(cls, arr, bc: BCSpec = 'periodic', value=0.0, ndim: Optional[int] = None, dx: float = 1.0,
+                   n_batch: int = 0, xp=np) -> 'GhostField':
+        """A GhostField holding a copy of `arr` (integer input is promoted to float64)."""
+        arr = xp.asarray(arr)
+        g = cls(arr.shape, bc=bc, value=value, ndim=ndim, dx=dx, dtype=_float_dtype(arr.dtype),
+                n_batch=n_batch, xp=xp)
+        g.interior[...] = arr
+        return g
+
+    def _shift(self, axis: Optional[int], offset: int) -> tuple:
+        """Index of the interior shifted by `offset` cells along lattice axis `axis`."""
+        idx = [slice(None)] * self.n_batch
+        for a in range(self.ndim):
+            s = 1 + (offset if a == axis else 0)
+            idx.append(slice(s, s - 2 if s - 2 < 0 else None))
+        return tuple(idx)
+
+    def fill(self) -> np.ndarray:
+        """Refresh the ghost slabs from the interior; returns the padded buffer."""
+        view = self.padded
+        if self.n_batch:
+            # move batch axes last so the lattice axes lead
+            view = self.xp.moveaxis(view, tuple(range(self.n_batch)), tuple(range(-self.n_batch, 0)))
+        fill_ghosts(view, self.bc, self.value, ndim=self.ndim, dx=self.dx)
+        return self.padded
 
-def apply_boundary(field: np.ndarray, bc_type: str = 'periodic') -> np.ndarray:
-    """Apply boundary conditions to a field array."""
-    field_bc = field.copy()
+    def laplacian(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Undivided (2 * ndim + 1)-point Laplacian of the interior (ghosts refreshed first)."""
+        xp, P = self.xp, self.padded
+        out = self._lap if out is None else out
+        self.fill()
+        xp.add(P[self._shift(0, -1)], P[self._shift(0, 1)], out=out)
+        for axis in range(1, self.ndim):
+            out += P[self._shift(axis, -1)]
+            out += P[self._shift(axis, 1)]
+        xp.multiply(self.interior, 2 * self.ndim, out=self._work)
+        out -= self._work
+        return out
 
-    if bc_type == 'reflective':
-        # Mirror edges
-        field_bc[0,:] = field_bc[1,:]
-        field_bc[-1,:] = field_bc[-2,:]
-        field_bc[:,0] = field_bc[:,1]
-        field_bc[:,-1] = field_bc[:,-2]
+    def central_difference(self, axis: int, out: Optional[np.ndarray] = None, component: Optional[int] = None,
+                           fill: bool = True) -> np.ndarray:
+        """(u[i+1] - u[i-1]) / 2 along lattice axis `axis` (undivided by dx).
 
-    elif bc_type == 'periodic':
-        # Wrap-around edges
-        field_bc[0,:] = field_bc[-2,:]
-        field_bc[-1,:] = field_bc[1,:]
-        field_bc[:,0] = field_bc[:,-2]
-        field_bc[:,-1] = field_bc[:,1]
+        component=c differentiates only u[..., c] (out then has no component axis).
+        """
+        P = self.padded
+        if fill:
+            self.fill()
+        ahead, behind = P[self._shift(axis, 1)], P[self._shift(axis, -1)]
+        if component is not None:
+            ahead, behind = ahead[..., component], behind[..., component]
+        if out is None:
+            out = self._lap if component is None else self.xp.empty(ahead.shape, dtype=P.dtype)
+        self.xp.subtract(ahead, behind, out=out)
+        out /= 2
+        return out
 
-    elif bc_type == 'open':
-        # Zero padding
-        field_bc[0,:] = 0
-        field_bc[-1,:] = 0
-        field_bc[:,0] = 0
-        field_bc[:,-1] = 0
+    def diffuse(self, coef: float) -> np.ndarray:
+        """interior += coef * laplacian, in place; returns the interior view."""
+        lap = self.laplacian()
+        lap *= coef
+        self.interior += lap
+        return self.interior
 
-    else:
-        raise ValueError(f'Unknown boundary condition type: {bc_type}')
 
-    return field_bc
+def diffuse(u: np.ndarray, coef: float, bc: BCSpec = 'periodic', value=0.0, ndim: Optional[int] = None,
+            n_batch: int = 0, xp=np) -> np.ndarray:
+    """u + coef * laplacian(u) under the given boundary, as a new array."""
+    g = GhostField.from_array(u, bc=bc, value=value, ndim=ndim, n_batch=n_batch, xp=xp)
+    return g.diffuse(coef).copy()
 
 
 # Demo harness
@@ -67,3 +235,8 @@ if __name__ == '__main__':
     Phi_open = apply_boundary(Phi, bc_type='open')
     print('Open Phi[0,:]:', Phi_open[0,:])
 
+    u = GhostField.from_array(np.random.randn(16, 16, 16), bc='neumann')
+    total = u.interior.sum()
+    for _ in range(20):
+        u.diffuse(0.1)
+    print('3D Neumann diffusion, total before/after:', total, u.interior.sum())
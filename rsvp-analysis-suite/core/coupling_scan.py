@@ -7,26 +7,36 @@ and phase transitions in RSVP Analysis Suite (RAS).
 Purpose:
 - Scan λ parameter space for given Phi, V, S fields.
 - Record observables and identify phase transitions.
+- Continuation mode (`continuation_scan`): warm-start each λ from the previous
+  equilibrium, run independent λ brackets in parallel, then locate λ₍c₎ by
+  bisection around the largest jump instead of a dense uniform grid.
 
 Inputs:
 - Phi, V, S arrays (numpy)
-- lam_range: list/array of λ values
-- n_steps: number of Lamphron steps per λ
+- lam_range: list/array of λ values (or lam_min, lam_max, n_coarse for continuation)
+- n_steps: number of Lamphron steps per λ (upper bound with steady_tol)
 - dt: time step
+- tol: target width of the λ₍c₎ bracket
 
 Outputs:
 - Dictionary of λ → observables (e.g., mean S, torsion, topological charge)
 - Critical λ₍c₎ estimate
+- Solver call / step counts for the continuation mode
 
 Testing Focus:
 - Reproducibility of phase transition detection
 - Correct aggregation of observables
+- Bisection reaches tol with far fewer solver calls than a uniform grid
 """
 from __future__ import annotations
-from typing import List, Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple, Dict
+import multiprocessing as mp
 import numpy as np
 
-from rsvp_analysis_suite.core import lamphron_solver, torsion_spectrum
+from core import lamphron_solver, torsion_spectrum
+
+Fields = Tuple[np.ndarray, np.ndarray, np.ndarray]
 
 
 def scan_lambda(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, lam_range: List[float], dt: float = 0.01, n_steps: int = 100) -> Tuple[Dict[float, Dict[str,float]], float]:
@@ -50,6 +60,100 @@ def scan_lambda(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, lam_range: List[f
     return results, critical_lambda
 
 
+def observables(Phi: np.ndarray, V: np.ndarray, S: np.ndarray) -> Dict[str, float]:
+    """Observables recorded per λ: mean S and the topological charge of the torsion map."""
+    torsion_map = torsion_spectrum.torsion_map(Phi, V, S)
+    return {'mean_S': float(np.mean(S)), 'topological_charge': float(torsion_spectrum.topological_charge(torsion_map))}
+
+
+def relax(fields: Fields, lam: float, dt: float = 0.01, n_steps: int = 100, steady_tol: Optional[float] = None,
+          check_every: int = 10, solver: Optional[Callable] = None) -> Tuple[Fields, int]:
+    """Run `solver` at λ from `fields` and return (fields, steps used).
+
+    With steady_tol set, the run stops early once S changes by less than steady_tol
+    (max abs) over `check_every` steps; warm starts near equilibrium then cost little.
+    """
+    solver = solver or lamphron_solver.run_lamphron
+    if steady_tol is None:
+        return solver(*fields, dt=dt, n_steps=n_steps, lam=lam), n_steps
+    steps = 0
+    while steps < n_steps:
+        chunk = min(check_every, n_steps - steps)
+        new = solver(*fields, dt=dt, n_steps=chunk, lam=lam)
+        steps += chunk
+        converged = np.max(np.abs(new[2] - fields[2])) < steady_tol
+        fields = new
+        if converged:
+            break
+    return fields, steps
+
+
+def _continuation_chain(fields: Fields, lams: List[float], dt: float, n_steps: int, steady_tol: Optional[float],
+                        solver: Optional[Callable]) -> List[Tuple[float, Dict[str, float], Fields, int]]:
+    """Follow one branch over increasing λ, each point warm-started from the previous one."""
+    out = []
+    for lam in lams:
+        fields, steps = relax(fields, lam, dt, n_steps, steady_tol, solver=solver)
+        out.append((lam, observables(*fields), fields, steps))
+    return out
+
+
+def continuation_scan(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, lam_min: float, lam_max: float,
+                      n_coarse: int = 9, dt: float = 0.01, n_steps: int = 100, observable: str = 'mean_S',
+                      tol: float = 1e-4, jump_threshold: float = 0.1, steady_tol: Optional[float] = None,
+                      n_workers: int = 1, solver: Optional[Callable] = None
+                      ) -> Tuple[Dict[float, Dict[str, float]], Optional[float], Dict[str, Any]]:
+    """Locate λ₍c₎ by warm-started continuation plus bisection.
+
+    1. The coarse grid linspace(lam_min, lam_max, n_coarse) is cut into n_workers
+       contiguous brackets; each is followed as a warm-started branch from the
+       initial fields, brackets in parallel.
+    2. The neighbouring pair with the largest |Δ observable| brackets the jump; if
+       that jump is below jump_threshold no transition is reported (λ₍c₎ = None).
+    3. The bracket is bisected, each midpoint warm-started from the left endpoint's
+       equilibrium, until it is narrower than tol. λ₍c₎ is the bracket midpoint.
+
+    `solver(Phi, V, S, dt=..., n_steps=..., lam=...)` defaults to run_lamphron and
+    must be picklable when n_workers > 1. Returns (results, λ₍c₎, info) where info
+    holds the final bracket and the solver call / step counts.
+    """
+    lams = [float(l) for l in np.linspace(lam_min, lam_max, n_coarse)]
+    segments = [list(seg) for seg in np.array_split(lams, max(1, min(n_workers, n_coarse))) if len(seg)]
+    fields = (Phi, V, S)
+    if len(segments) == 1:
+        chains = [_continuation_chain(fields, segments[0], dt, n_steps, steady_tol, solver)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(segments), mp_context=mp.get_context('spawn')) as pool:
+            futures = [pool.submit(_continuation_chain, fields, seg, dt, n_steps, steady_tol, solver) for seg in segments]
+            chains = [f.result() for f in futures]
+    points = [p for chain in chains for p in chain]
+
+    results = {lam: obs for lam, obs, _, _ in points}
+    info: Dict[str, Any] = {'solver_calls': len(points), 'solver_steps': sum(p[3] for p in points), 'bracket': None}
+    values = np.array([obs[observable] for _, obs, _, _ in points])
+    jumps = np.abs(np.diff(values))
+    if jumps.size == 0 or jumps.max() <= jump_threshold:
+        return results, None, info
+
+    i = int(np.argmax(jumps))
+    (lam_a, obs_a, state_a, _), (lam_b, obs_b, _, _) = points[i], points[i + 1]
+    val_a, val_b = obs_a[observable], obs_b[observable]
+    while lam_b - lam_a > tol:
+        lam_m = 0.5 * (lam_a + lam_b)
+        state_m, steps = relax(state_a, lam_m, dt, n_steps, steady_tol, solver=solver)
+        obs_m = observables(*state_m)
+        results[lam_m] = obs_m
+        info['solver_calls'] += 1
+        info['solver_steps'] += steps
+        val_m = obs_m[observable]
+        if abs(val_m - val_a) <= abs(val_b - val_m):
+            lam_a, val_a, state_a = lam_m, val_m, state_m
+        else:
+            lam_b, val_b = lam_m, val_m
+    info['bracket'] = (lam_a, lam_b)
+    return dict(sorted(results.items())), 0.5 * (lam_a + lam_b), info
+
+
 # Demo harness
 if __name__ == '__main__':
     print('coupling_scan demo')
@@ -59,4 +163,6 @@ if __name__ == '__main__':
     results, lam_c = scan_lambda(Phi, V, S, lam_range, dt=0.01, n_steps=50)
     print('Results:', results)
     print('Estimated critical lambda:', lam_c)
+    results, lam_c, info = continuation_scan(Phi, V, S, 0.1, 2.0, n_coarse=5, dt=0.01, n_steps=50, steady_tol=1e-6)
+    print('Continuation critical lambda:', lam_c, info)
 
@@ -10,7 +10,9 @@ Goals for this starter module:
   at a discrete / algebraic level for experiments.
 - Helpers to construct 2-shifted and (-1)-shifted symplectic forms symbolically
   (using sympy) for toy finite-dimensional models.
-- Utilities to discretize forms and test nondegeneracy on small grids.
+- Utilities to discretize forms and test nondegeneracy: array-aware sampling over
+  meshgrids, and a numeric sparse-LU rank / log-determinant test at random points
+  (symbolic determinant only for small systems) for lattice-sized models.
 
 This is intentionally a prototype meant to be extended into your more
 rigorous derived geometry pipeline when you discretize fields or connect
@@ -29,6 +31,14 @@ try:
 except Exception as e:
     raise ImportError("numpy is required for derived_geometry.py — please install numpy") from e
 
+# optional scipy.sparse for the numeric nondegeneracy test
+try:
+    import scipy.sparse as sp_sparse
+    import scipy.sparse.linalg as sp_linalg
+except Exception:
+    sp_sparse = None
+    sp_linalg = None
+
 
 # ----------------------------- Simple derived fiber product -----------------------------
 
@@ -84,27 +94,155 @@ def shifted_symplectic_form(symbols: Sequence[sp.Symbol], shift: int = -1) -> sp
     return sp.simplify(s)
 
 
-def is_nondegenerate(pairing: sp.Expr, symbols: Sequence[sp.Symbol]) -> bool:
+def _sparse_hessian(pairing: sp.Expr, symbols: Sequence[sp.Symbol]) -> Tuple[np.ndarray, np.ndarray, list]:
+    """Structurally non-zero Hessian entries (rows, cols, exprs) of `pairing`.
+
+    The gradient is assembled from the terms that contain each symbol, and row i is
+    only differentiated by the symbols that survive in dP/ds_i, so a local (lattice)
+    pairing costs O(n) derivatives instead of n^2.
+    """
+    index = {s_: k for k, s_ in enumerate(symbols)}
+    wanted = set(symbols)
+    by_symbol: Dict[sp.Symbol, list] = {}
+    for term in sp.Add.make_args(sp.expand(pairing)):
+        for sym in term.free_symbols & wanted:
+            by_symbol.setdefault(sym, []).append(term)
+    rows, cols, exprs = [], [], []
+    for i, si in enumerate(symbols):
+        gi = sp.Add(*[sp.diff(t, si) for t in by_symbol.get(si, [])])
+        for sj in sorted(gi.free_symbols & wanted, key=index.get):
+            hij = sp.diff(gi, sj)
+            if hij != 0:
+                rows.append(i)
+                cols.append(index[sj])
+                exprs.append(hij)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), exprs
+
+
+def _lu_rank_logdet(rows: np.ndarray, cols: np.ndarray, values: np.ndarray, n: int,
+                    rtol: float, dense_max: int = 512) -> Tuple[int, float]:
+    """(rank estimate, log|det|) of the n x n matrix given in COO form.
+
+    Uses the pivots of a sparse LU (scipy); without scipy, the singular values of the
+    dense matrix. A pivot below rtol * max|pivot| counts as zero. When SuperLU finds
+    an exactly singular factor the determinant is 0; the rank is then exact (dense
+    SVD) up to n = dense_max, and above that estimated sparsely from the LU of
+    A + delta I (delta = sqrt(eps) * max|A|), counting pivots at the scale of delta
+    as zero. LU is not rank-revealing, so that estimate can be off by a few.
+    """
+    if n == 0:
+        return 0, 0.0
+    shift = 0.0
+    if sp_sparse is not None:
+        A = sp_sparse.csc_matrix((values, (rows, cols)), shape=(n, n))
+        try:
+            pivots = np.abs(sp_linalg.splu(A).U.diagonal())
+        except RuntimeError:
+            if n <= dense_max:
+                return int(np.linalg.matrix_rank(A.toarray())), -np.inf
+            shift = np.sqrt(np.finfo(float).eps) * max(float(np.abs(values).max(initial=0.0)), 1.0)
+            shifted = (A + shift * sp_sparse.identity(n, format='csc')).tocsc()
+            pivots = np.abs(sp_linalg.splu(shifted).U.diagonal())
+    else:
+        dense = np.zeros((n, n))
+        np.add.at(dense, (rows, cols), values)
+        pivots = np.linalg.svd(dense, compute_uv=False)
+    small = pivots <= max(rtol * pivots.max(), 1e3 * shift)
+    rank = int(n - np.count_nonzero(small))
+    logdet = -np.inf if small.any() or shift else float(np.sum(np.log(pivots)))
+    return rank, logdet
+
+
+def nondegeneracy_report(pairing: sp.Expr, symbols: Sequence[sp.Symbol], method: str = 'auto',
+                         n_points: int = 3, rtol: float = 1e-10, symbolic_max: int = 8,
+                         seed: int = 0, dense_max: int = 512) -> Dict[str, Any]:
+    """Rank / log-determinant diagnostics of the Hessian of `pairing` wrt `symbols`.
+
+    method='symbolic' takes the exact determinant (only practical for small n).
+    method='numeric' assembles the sparse Hessian once, lambdifies its non-constant
+    entries once, and factorizes it with sparse LU at up to n_points random points;
+    any other free symbols (parameters) are sampled too. A non-degenerate Hessian is
+    full rank at a random point with probability ~1, so the form is reported
+    non-degenerate as soon as one sample is full rank. 'auto' is symbolic up to
+    symbolic_max symbols and numeric beyond. For an exactly singular sample the rank
+    is exact up to dense_max symbols and a sparse estimate beyond (see _lu_rank_logdet).
+
+    Returns a dict with nondegenerate, rank, n, logabsdet (numeric only; -inf when
+    singular) and method.
+    """
+    n = len(symbols)
+    if method == 'auto':
+        method = 'symbolic' if n <= symbolic_max else 'numeric'
+    if method == 'symbolic':
+        M = sp.Matrix([[sp.diff(pairing, si, sj) for sj in symbols] for si in symbols])
+        det = sp.simplify(M.det())
+        return {'nondegenerate': det != 0, 'rank': n if det != 0 else M.rank(), 'n': n,
+                'logabsdet': None, 'method': method}
+    if method != 'numeric':
+        raise ValueError(f"unknown method '{method}'")
+    from core.bv_formalism import _lambdify_cse
+
+    rows, cols, exprs = _sparse_hessian(pairing, symbols)
+    const = np.array([e.is_number for e in exprs], dtype=bool)
+    values = np.zeros(len(exprs))
+    values[const] = [float(e) for e, c in zip(exprs, const) if c]
+    variable = [e for e, c in zip(exprs, const) if not c]
+    params = sorted(set().union(*(e.free_symbols for e in variable)), key=str) if variable else []
+    f = _lambdify_cse(params, variable, 'numpy') if variable else None
+
+    rng = np.random.default_rng(seed)
+    best_rank, best_logdet = -1, -np.inf
+    for _ in range(n_points if f is not None else 1):
+        if f is not None:
+            values[~const] = np.asarray(f(*rng.uniform(-1.0, 1.0, len(params))), dtype=float)
+        rank, logdet = _lu_rank_logdet(rows, cols, values, n, rtol, dense_max)
+        if (rank, logdet) > (best_rank, best_logdet):
+            best_rank, best_logdet = rank, logdet
+        if best_rank == n:
+            break
+    return {'nondegenerate': best_rank == n, 'rank': best_rank, 'n': n,
+            'logabsdet': float(best_logdet), 'method': method}
+
+
+def is_nondegenerate(pairing: sp.Expr, symbols: Sequence[sp.Symbol], method: str = 'auto') -> bool:
     """Check nondegeneracy by building and testing the matrix of second derivatives (toy).
 
     This computes the Hessian matrix of `pairing` wrt `symbols` and checks if det != 0.
+    Small systems use the exact symbolic determinant; larger ones the randomized
+    sparse-LU test (see `nondegeneracy_report`).
     Note: for a true 2-form one should anti-symmetrize; this is a simplified heuristic.
     """
-    M = sp.Matrix([[sp.diff(pairing, si, sj) for sj in symbols] for si in symbols])
-    det = sp.simplify(M.det())
-    return det != 0
+    return bool(nondegeneracy_report(pairing, symbols, method=method)['nondegenerate'])
 
 
 # ----------------------------- Discretize forms on small grids -----------------------------
 
-def discretize_form_on_grid(form_fn, grid_shape: Tuple[int, int] = (8, 8)) -> np.ndarray:
+def discretize_form_on_grid(form_fn, grid_shape: Tuple[int, int] = (8, 8),
+                            symbols: Sequence[sp.Symbol] | None = None,
+                            vectorized: bool | None = None) -> np.ndarray:
     """Sample a scalar form-generating function across a grid to create a matrix.
 
-    `form_fn` should accept two floats (x, y) and return a scalar. Returns a 2D numpy array.
+    `form_fn` is a callable of (x, y) or a sympy expression in `symbols` = (x, y),
+    which is lambdified once. The callable is first evaluated on the whole 'ij'
+    meshgrid of [0, 1]^2; if it cannot take arrays (e.g. it uses `math`) it is called
+    once per cell as before. vectorized=True requires the array path and False forces
+    the per-cell loop. Returns a 2D numpy array.
     """
     nx, ny = grid_shape
     xs = np.linspace(0, 1, nx)
     ys = np.linspace(0, 1, ny)
+    if isinstance(form_fn, sp.Basic):
+        if symbols is None or len(symbols) != 2:
+            raise ValueError('a sympy form needs symbols=(x, y)')
+        form_fn = sp.lambdify(tuple(symbols), form_fn, 'numpy')
+    if vectorized is not False:
+        X, Y = np.meshgrid(xs, ys, indexing='ij')
+        try:
+            vals = np.asarray(form_fn(X, Y), dtype=float)
+            return np.array(np.broadcast_to(vals, (nx, ny)))
+        except (TypeError, ValueError) as exc:
+            if vectorized:
+                raise ValueError('form_fn does not accept array arguments') from exc
     out = np.zeros((nx, ny), dtype=float)
     for i, x in enumerate(xs):
         for j, y in enumerate(ys):
@@ -127,10 +265,23 @@ def demo_discretize():
     fn = lambda x, y: math.sin(2 * math.pi * x) * math.cos(2 * math.pi * y)
     M = discretize_form_on_grid(fn, grid_shape=(16, 16))
     print('Sample matrix shape:', M.shape, 'mean abs val:', np.mean(np.abs(M)))
+    x, y = sp.symbols('x y')
+    M = discretize_form_on_grid(sp.sin(2 * sp.pi * x) * sp.cos(2 * sp.pi * y), (512, 512), symbols=(x, y))
+    print('Vectorized sympy form on 512x512, mean abs val:', np.mean(np.abs(M)))
+
+
+def demo_lattice_nondegeneracy(L: int = 16):
+    # nearest-neighbour deformed pairing on an L x L lattice: 2 L^2 symbols
+    xs = sp.symbols(f'x0:{L * L}')
+    ps = sp.symbols(f'p0:{L * L}')
+    pairing = shifted_symplectic_form(tuple(xs) + tuple(ps)) + sum(xs[k] * xs[(k + 1) % (L * L)] * ps[k] for k in range(L * L))
+    report = nondegeneracy_report(pairing, tuple(xs) + tuple(ps))
+    print('Lattice pairing with', report['n'], 'symbols: rank', report['rank'], 'nondegenerate', report['nondegenerate'])
 
 
 if __name__ == "__main__":
     print("Derived geometry demo — toy shifted pairing and discretization")
     demo_shifted_pairing()
     demo_discretize()
+    demo_lattice_nondegeneracy()
 
@@ -3,28 +3,42 @@ fpc_dynamics.py
 
 Fixed-Point Causality (FPC) dynamics module for the RSVP Analysis Suite (RAS).
 Includes:
-- deterministic ODE time-steppers (explicit Euler, RK4)
-- simple delay-differential equation (DDE) integrator using fixed lag buffer
-- stochastic SDE integrator (Euler-Maruyama)
+- deterministic ODE time-steppers (explicit Euler, RK4) writing into preallocated,
+  optionally decimated (`save_every`) trajectories
+- adaptive integrators with error control and dense output: embedded Dormand-Prince
+  RK45, a Rosenbrock (ode23s) scheme for stiff systems, and BDF via scipy if present
+- delay-differential equation (DDE) integrator: NumPy ring-buffer history with cubic
+  Hermite interpolation, Euler / RK4 stepping, multiple and state-dependent delays
+- stochastic SDE integrator (Euler-Maruyama) and a batched many-path engine
+  (Euler-Maruyama / Milstein on an (n_paths, dim) state matrix, SeedSequence seeding,
+  per-time mean / variance / quantiles and first-passage times, optional path tensor)
 - root-finding and fixed-point solvers (Newton, hybrid via scipy if present)
 - constraint projection utilities to enforce linear/nonlinear constraints during evolution
-- Jacobian estimation and linear stability analysis at fixed points
+- Jacobian estimation and linear stability analysis at fixed points: forward-difference,
+  complex-step and column-colored sparse finite-difference Jacobians, Jacobian-vector
+  products, matrix-free Newton-Krylov and ARPACK leading-eigenvalue stability checks
 
 This starter module aims to cover the breadth of FPC experimental needs: delays, noise,
 constraints, and stability diagnostics. Replace or extend integrators with more sophisticated
 solvers for production experiments.
 """
 from __future__ import annotations
-from typing import Callable, Tuple, Optional, Dict, Any
+from typing import Callable, Tuple, Optional, Dict, Any, Sequence, Union
 
 import numpy as np
 
 try:
     from scipy import optimize
     from scipy import linalg
+    from scipy import integrate as sp_integrate
+    from scipy import sparse
+    from scipy.sparse import linalg as splinalg
 except Exception:
     optimize = None
     linalg = None
+    sp_integrate = None
+    sparse = None
+    splinalg = None
 
 
 Vector = np.ndarray
@@ -46,74 +60,348 @@ def rk4_step(x: Vector, f: Callable[[Vector, float], Vector], t: float, dt: floa
     return x + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
 
 
+def _output_grid(t0: float, t1: float, dt: float, save_every: int) -> Tuple[int, int]:
+    """Number of steps and of saved points for a fixed-dt run from t0 to t1."""
+    if save_every < 1:
+        raise ValueError('save_every must be >= 1')
+    nsteps = int(np.ceil((t1 - t0) / dt))
+    return nsteps, -(-nsteps // save_every)
+
+
 def integrate_ode(x0: Vector, f: Callable[[Vector, float], Vector], t_span: Tuple[float, float], dt: float,
-                  method: str = 'rk4', callback: Optional[Callable[[Vector, float], None]] = None) -> Tuple[np.ndarray, np.ndarray]:
-    """Integrate an ODE from t_span[0] to t_span[1] with fixed dt and return (times, trajectory).
-    method: 'euler' or 'rk4'
+                  method: str = 'rk4', callback: Optional[Callable[[Vector, float], None]] = None,
+                  save_every: int = 1, rtol: float = 1e-6, atol: float = 1e-9,
+                  jac: Optional[Callable[[Vector, float], np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Integrate an ODE from t_span[0] to t_span[1] and return (times, trajectory).
+    method: 'euler' or 'rk4' (fixed dt), or 'rk45', 'rosenbrock', 'bdf' (adaptive, error
+    controlled by rtol/atol; dt then only sets the output grid and the first trial step).
     callback: optional function called at each step with (x, t) for logging.
+    save_every: keep every save_every-th point of the grid t0 + k*dt, k < ceil((t1-t0)/dt);
+    the trajectory is preallocated, so memory is O(saved points).
+    jac: optional Jacobian jac(x, t) for the stiff methods (finite differences otherwise).
+    Every method returns a trajectory of shape (nsaved,) + x0.shape and calls f, jac and
+    callback with states of x0's shape.
     """
     t0, t1 = t_span
-    nsteps = int(np.ceil((t1 - t0) / dt))
-    xs = []
-    ts = []
+    nsteps, nsaved = _output_grid(t0, t1, dt, save_every)
+    if method in ('rk45', 'rosenbrock', 'bdf'):
+        t_eval = t0 + dt * save_every * np.arange(nsaved)
+        shape = np.shape(x0)
+        if len(shape) != 1:
+            # the adaptive driver works on flat state vectors
+            f_user, jac_user, cb_user = f, jac, callback
+            f = lambda y, t: np.ravel(f_user(y.reshape(shape), t))
+            if jac_user is not None:
+                jac = lambda y, t: np.reshape(jac_user(y.reshape(shape), t), (y.size, y.size))
+            if cb_user is not None:
+                callback = lambda y, t: cb_user(y.reshape(shape), t)
+        xs = _integrate_adaptive(x0, f, t0, t1, method, rtol, atol, dt, jac, t_eval=t_eval, callback=callback)[0]
+        return t_eval, xs.reshape((nsaved,) + shape)
+    if method not in ('euler', 'rk4'):
+        raise ValueError(f'unknown method {method!r}')
     x = x0.copy()
+    ts = np.empty(nsaved)
+    xs = np.empty((nsaved,) + x.shape, dtype=np.result_type(x, float))
     t = t0
     step_fn = euler_step if method == 'euler' else rk4_step
     for i in range(nsteps):
-        xs.append(x.copy())
-        ts.append(t)
+        if i % save_every == 0:
+            xs[i // save_every] = x
+            ts[i // save_every] = t
         if callback is not None:
             callback(x, t)
         x = step_fn(x, f, t, dt)
         t += dt
-    return np.array(ts), np.array(xs)
+    return ts, xs
+
+
+# ----------------------------- Adaptive integrators -----------------------------
+
+# Dormand-Prince 5(4) tableau, error weights and 4th-order dense output (Hairer, Norsett & Wanner; as in scipy RK45)
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_DP_A = [np.array([]), np.array([1/5]), np.array([3/40, 9/40]), np.array([44/45, -56/15, 32/9]),
+         np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+         np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656])]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+_DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+_DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]])
+
+# Rosenbrock 2(3) constants (Shampine & Reichelt, ode23s)
+_ROS_D = 1.0 / (2.0 + np.sqrt(2.0))
+_ROS_E32 = 6.0 + np.sqrt(2.0)
+
+
+def _dp_step(f, x, t, h, k0):
+    """One Dormand-Prince trial step; returns (x_new, error, K, Q) with Q the dense-output polynomial."""
+    K = np.empty((7, x.size))
+    K[0] = k0
+    for s in range(1, 6):
+        K[s] = f(x + h * (K[:s].T @ _DP_A[s]), t + _DP_C[s] * h)
+    x_new = x + h * (K[:6].T @ _DP_B)
+    K[6] = f(x_new, t + h)
+    err = h * (K.T @ _DP_E)
+    return x_new, err, K, K.T @ _DP_P
+
+
+def _ros_step(f, x, t, h, f0, J, solve_factory):
+    """One Rosenbrock 2(3) trial step; returns (x_new, error, f_new, Q)."""
+    n = x.size
+    solve = solve_factory(np.eye(n) - h * _ROS_D * J)
+    delta = np.sqrt(np.finfo(float).eps) * max(abs(t), 1.0)
+    T = h * _ROS_D * (f(x, t + delta) - f0) / delta
+    k1 = solve(f0 + T)
+    f1 = f(x + 0.5 * h * k1, t + 0.5 * h)
+    k2 = solve(f1 - k1) + k1
+    x_new = x + h * k2
+    f2 = f(x_new, t + h)
+    k3 = solve(f2 - _ROS_E32 * (k2 - f1) - 2.0 * (k1 - f0) + T)
+    err = (h / 6.0) * (k1 - 2.0 * k2 + k3)
+    Q = np.stack([(k1 - 2.0 * _ROS_D * k2), (k2 - k1)], axis=1) / (1.0 - 2.0 * _ROS_D)
+    return x_new, err, f2, Q
+
+
+def _lu_solver(M: np.ndarray) -> Callable[[Vector], Vector]:
+    if linalg is not None:
+        lu = linalg.lu_factor(M)
+        return lambda b: linalg.lu_solve(lu, b)
+    return lambda b: np.linalg.solve(M, b)
+
+
+def _poly_eval(x_old: Vector, h: float, Q: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    """x_old + h * Q @ [theta, theta^2, ...] for an array of theta; returns (len(theta), n)."""
+    powers = np.cumprod(np.repeat(np.atleast_1d(theta)[None, :], Q.shape[1], axis=0), axis=0)
+    return x_old[None, :] + h * (Q @ powers).T
+
+
+class DenseSolution:
+    """Continuous solution of an adaptive run: call with t (scalar or array) -> state(s).
+
+    Stores one interpolating polynomial per accepted step, so memory is O(accepted steps).
+    """
+
+    def __init__(self):
+        self.t_steps = []
+        self._h = []
+        self._x = []
+        self._Q = []
+        self._scipy_sol = None
+        self.nfev = 0
+
+    def _add(self, t: float, h: float, x: Vector, Q: np.ndarray) -> None:
+        self.t_steps.append(t)
+        self._h.append(h)
+        self._x.append(x.copy())
+        self._Q.append(Q)
+
+    def __call__(self, t) -> np.ndarray:
+        scalar = np.ndim(t) == 0
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        if self._scipy_sol is not None:
+            out = self._scipy_sol(t).T
+        else:
+            starts = np.asarray(self.t_steps)
+            idx = np.clip(np.searchsorted(starts, t, side='right') - 1, 0, len(starts) - 1)
+            out = np.empty((t.size, self._x[0].size))
+            for k in np.unique(idx):
+                sel = idx == k
+                out[sel] = _poly_eval(self._x[k], self._h[k], self._Q[k], (t[sel] - starts[k]) / self._h[k])
+        return out[0] if scalar else out
+
+
+def _integrate_adaptive(x0: Vector, f: Callable[[Vector, float], Vector], t0: float, t1: float, method: str,
+                        rtol: float, atol: float, h0: Optional[float], jac: Optional[Callable],
+                        t_eval: Optional[np.ndarray] = None, dense: bool = False,
+                        callback: Optional[Callable[[Vector, float], None]] = None,
+                        max_steps: int = 1_000_000) -> Tuple[Optional[np.ndarray], Optional[DenseSolution]]:
+    """Shared driver: error-controlled stepping, filling t_eval from each step's interpolant."""
+    x = np.asarray(x0, dtype=float).ravel().copy()
+    n_eval = 0 if t_eval is None else len(t_eval)
+    out = np.empty((n_eval, x.size)) if t_eval is not None else None
+    sol = DenseSolution() if dense else None
+
+    if method == 'bdf':
+        if sp_integrate is None:
+            raise ImportError("scipy is required for method='bdf'")
+        res = sp_integrate.solve_ivp(lambda t, y: f(y, t), (t0, t1), x, method='BDF', rtol=rtol, atol=atol,
+                                     t_eval=t_eval, dense_output=dense, first_step=h0,
+                                     jac=None if jac is None else (lambda t, y: jac(y, t)))
+        if not res.success:
+            raise RuntimeError(f'BDF integration failed: {res.message}')
+        if sol is not None:
+            sol._scipy_sol = res.sol
+            sol.t_steps = list(res.t)
+            sol.nfev = res.nfev
+        return (res.y.T.copy() if t_eval is not None else None), sol
+
+    if method not in ('rk45', 'rosenbrock'):
+        raise ValueError(f'unknown adaptive method {method!r}')
+    order = 5 if method == 'rk45' else 3
+    nfev = 1
+    t = t0
+    fx = f(x, t)
+    h = h0 if h0 else 0.01 * max(np.linalg.norm(x), 1e-3) / max(np.linalg.norm(fx), 1e-3)
+    h = min(h, t1 - t0)
+    jac_fn = jac if jac is not None else (lambda y, s: approx_jacobian(lambda z: f(z, s), y))
+    i_eval = 0
+    steps = 0
+    while t < t1:
+        if steps >= max_steps:
+            raise RuntimeError(f'{method}: exceeded max_steps={max_steps}')
+        if h < 1e-14 * max(abs(t), 1.0):
+            raise RuntimeError(f'{method}: step size underflow at t={t}')
+        h = min(h, t1 - t)
+        J = None
+        if method == 'rosenbrock':
+            J = jac_fn(x, t)
+            nfev += 0 if jac is not None else x.size + 1
+        while True:
+            if method == 'rk45':
+                x_new, err, K, Q = _dp_step(f, x, t, h, fx)
+                f_new = K[6]
+                nfev += 6
+            else:
+                x_new, err, f_new, Q = _ros_step(f, x, t, h, fx, J, _lu_solver)
+                nfev += 4
+            scale = atol + rtol * np.maximum(np.abs(x), np.abs(x_new))
+            err_norm = np.sqrt(np.mean((err / scale) ** 2))
+            if err_norm <= 1.0:
+                break
+            h *= max(0.2, 0.9 * err_norm ** (-1.0 / order))
+        if callback is not None:
+            callback(x, t)
+        t_new = t + h if t + h < t1 else t1
+        while i_eval < n_eval and t_eval[i_eval] <= t_new:
+            out[i_eval] = _poly_eval(x, h, Q, np.array([(t_eval[i_eval] - t) / h]))[0]
+            i_eval += 1
+        if sol is not None:
+            sol._add(t, h, x, Q)
+        x, fx, t = x_new, f_new, t_new
+        steps += 1
+        h *= min(10.0, 0.9 * err_norm ** (-1.0 / order)) if err_norm > 0 else 10.0
+    if sol is not None:
+        sol.nfev = nfev
+    return out, sol
+
+
+def integrate_ode_dense(x0: Vector, f: Callable[[Vector, float], Vector], t_span: Tuple[float, float],
+                        method: str = 'rk45', rtol: float = 1e-6, atol: float = 1e-9, h0: Optional[float] = None,
+                        jac: Optional[Callable[[Vector, float], np.ndarray]] = None) -> DenseSolution:
+    """Adaptive integration returning a DenseSolution that can be evaluated at any t in t_span."""
+    return _integrate_adaptive(x0, f, t_span[0], t_span[1], method, rtol, atol, h0, jac, dense=True)[1]
 
 
 # ----------------------------- Delay Differential Equation (simple) -----------------------------
 
+class DelayBuffer:
+    """Fixed-capacity ring buffer of (x, x') samples on the grid t0 + n*dt.
+
+    Lagged states are found by direct index arithmetic (O(1) per query) and cubic
+    Hermite interpolation between the two bracketing samples. Times before t0 come
+    from the history function; times after the newest sample are extrapolated
+    linearly from it (needed when a delay is shorter than one step).
+    """
+
+    def __init__(self, history: Callable[[float], Vector], t0: float, dt: float, capacity: int, dim: int):
+        self.history = history
+        self.t0 = t0
+        self.dt = dt
+        self.capacity = capacity
+        self.x = np.empty((capacity, dim))
+        self.dx = np.empty((capacity, dim))
+        self.n = 0  # number of samples pushed; newest has index n - 1
+
+    def push(self, x: Vector, dx: Vector) -> None:
+        slot = self.n % self.capacity
+        self.x[slot] = x
+        self.dx[slot] = dx
+        self.n += 1
+
+    def __call__(self, tq) -> np.ndarray:
+        scalar = np.ndim(tq) == 0
+        tq = np.atleast_1d(np.asarray(tq, dtype=float))
+        out = np.empty((tq.size, self.x.shape[1]))
+        newest = self.n - 1
+        u = (tq - self.t0) / self.dt
+        k = np.floor(u).astype(np.int64)
+        for j in range(tq.size):
+            if tq[j] <= self.t0 or newest < 0:
+                out[j] = self.history(tq[j])
+            elif k[j] >= newest:
+                s = newest % self.capacity
+                out[j] = self.x[s] + (tq[j] - (self.t0 + newest * self.dt)) * self.dx[s]
+            else:
+                if k[j] < self.n - self.capacity:
+                    raise ValueError('requested lag is older than the buffer holds; increase max_delay')
+                a, b = k[j] % self.capacity, (k[j] + 1) % self.capacity
+                s_ = u[j] - k[j]
+                s2, s3 = s_ * s_, s_ * s_ * s_
+                out[j] = ((2*s3 - 3*s2 + 1) * self.x[a] + (s3 - 2*s2 + s_) * self.dt * self.dx[a] +
+                          (-2*s3 + 3*s2) * self.x[b] + (s3 - s2) * self.dt * self.dx[b])
+        return out[0] if scalar else out
+
+
 def integrate_dde(x0_func: Callable[[float], Vector], f_delay: Callable[[Vector, Vector, float], Vector],
-                  t_span: Tuple[float, float], dt: float, delay: float) -> Tuple[np.ndarray, np.ndarray]:
-    """Integrate a simple fixed-lag DDE: x'(t) = f_delay(x(t), x(t - delay), t).
+                  t_span: Tuple[float, float], dt: float,
+                  delay: Union[float, Sequence[float], Callable[[Vector, float], Any]],
+                  method: str = 'euler', max_delay: Optional[float] = None, save_every: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Integrate a DDE: x'(t) = f_delay(x(t), x_lag, t).
 
     x0_func: function providing history x(t) for t <= t0
     f_delay: function f_delay(x_now, x_lag, t)
+    delay: a float (x_lag is x(t - delay)), a sequence of floats (x_lag has shape
+        (n_delays, dim), one row per delay), or a callable delay(x, t) returning a float
+        or an array of delays (state-dependent; requires max_delay)
+    method: 'euler' (default) or 'rk4' (with Hermite-interpolated lags)
+    max_delay: upper bound on all delays; sets the ring-buffer capacity
+    save_every: keep every save_every-th point of the output grid (preallocated)
     Returns (times, trajectory)
     """
+    if method not in ('euler', 'rk4'):
+        raise ValueError(f'unknown method {method!r}')
     t0, t1 = t_span
-    nsteps = int(np.ceil((t1 - t0) / dt))
-    size = len(x0_func(t0))
-
-    # buffer to store history; we keep M = ceil(delay/dt)+1 previous states
-    M = int(np.ceil(delay / dt)) + 2
-    buf = [x0_func(t0 - (M - 1 - i) * dt).copy() for i in range(M)]
-    times = []
-    traj = []
-
-    t = t0
-    x = x0_func(t0).copy()
+    nsteps, nsaved = _output_grid(t0, t1, dt, save_every)
+    x = np.asarray(x0_func(t0), dtype=float).copy()
+    size = x.size
+
+    if callable(delay):
+        if max_delay is None:
+            raise ValueError('max_delay is required for state-dependent delays')
+        delay_fn = delay
+    else:
+        taus = np.asarray(delay, dtype=float)
+        max_delay = float(taus.max()) if max_delay is None else max_delay
+        delay_fn = lambda x_, t_: taus
+    # two extra samples bracket the oldest lag; one more covers the in-progress step
+    capacity = int(np.ceil(max_delay / dt)) + 3
+    buf = DelayBuffer(x0_func, t0, dt, capacity, size)
+
+    def F(xs: Vector, ts: float) -> Vector:
+        return f_delay(xs, buf(ts - delay_fn(xs, ts)), ts)
+
+    ts_out = np.empty(nsaved)
+    xs_out = np.empty((nsaved, size))
     for i in range(nsteps):
-        times.append(t)
-        traj.append(x.copy())
-        # find lagged state via interpolation in the buffer
-        lag_t = t - delay
-        if lag_t <= t0:
-            x_lag = x0_func(lag_t)
+        t = t0 + i * dt
+        if i % save_every == 0:
+            ts_out[i // save_every] = t
+            xs_out[i // save_every] = x
+        k1 = F(x, t)
+        buf.push(x, k1)
+        if method == 'euler':
+            x = x + dt * k1
         else:
-            # linear interpolation between nearest buffer entries
-            idx = int((lag_t - t0) // dt)
-            idx = max(0, min(len(buf) - 2, idx))
-            t_idx = t - (len(buf) - 1 - idx) * dt
-            # fallback: use oldest
-            x_lag = buf[idx]
-        # Euler step for DDE
-        dx = f_delay(x, x_lag, t)
-        x = x + dt * dx
-        # append to buffer
-        buf.append(x.copy())
-        if len(buf) > M:
-            buf.pop(0)
-        t += dt
-    return np.array(times), np.array(traj)
+            k2 = F(x + 0.5 * dt * k1, t + 0.5 * dt)
+            k3 = F(x + 0.5 * dt * k2, t + 0.5 * dt)
+            k4 = F(x + dt * k3, t + dt)
+            x = x + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+    return ts_out, xs_out
 
 
 # ----------------------------- Stochastic SDE (Euler-Maruyama) -----------------------------
@@ -143,16 +431,108 @@ def integrate_sde_em(x0: Vector, drift: Callable[[Vector, float], Vector], diffu
     return np.array(ts), np.array(xs)
 
 
+def integrate_sde_batch(x0: Vector, drift: Callable[[np.ndarray, float], np.ndarray],
+                        diffusion: Callable[[np.ndarray, float], np.ndarray], t_span: Tuple[float, float], dt: float,
+                        n_paths: int = 1000, seed: Union[None, int, np.random.SeedSequence] = None,
+                        method: str = 'em', diffusion_dx: Optional[Callable[[np.ndarray, float], np.ndarray]] = None,
+                        save_every: int = 1, quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+                        barrier: Optional[float] = None, barrier_dim: int = 0,
+                        store_paths: bool = False) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Integrate n_paths independent copies of dx = drift dt + diffusion dW in one vectorized loop.
+
+    drift and diffusion act on the whole (n_paths, dim) state matrix; diffusion gives the
+    diagonal noise amplitude as in integrate_sde_em. method='milstein' adds the diagonal
+    correction 0.5 * sigma * dsigma/dx * (dW^2 - dt), using diffusion_dx(X, t) if given or
+    a forward difference of diffusion otherwise (each sigma_i must depend on x_i only).
+
+    Noise comes from np.random.default_rng(SeedSequence(seed)), one standard_normal
+    (n_paths, dim) block per step, so a run is reproducible from (seed, n_paths).
+
+    Statistics are taken across paths on the output grid t0 + k*save_every*dt (the
+    state before each saved step, as in integrate_ode). Returns (times, result) with:
+      'mean', 'var'        (n_saved, dim)
+      'quantiles'          (n_saved, len(quantiles), dim), exact over the paths
+      'final'              (n_paths, dim) state at t1
+      'first_passage'      (n_paths,) first time x[:, barrier_dim] crosses barrier
+                           (upward if it starts below, else downward); inf if never
+      'paths'              (n_saved, n_paths, dim), only with store_paths=True
+    """
+    if method not in ('em', 'milstein'):
+        raise ValueError(f"method must be 'em' or 'milstein', got {method!r}")
+    t0, t1 = t_span
+    nsteps, nsaved = _output_grid(t0, t1, dt, save_every)
+    ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    rng = np.random.default_rng(ss)
+
+    x0 = np.asarray(x0, dtype=float)
+    X = np.array(np.broadcast_to(x0 if x0.ndim == 2 else x0.reshape(1, -1), (n_paths, x0.shape[-1])))
+    dim = X.shape[1]
+    q = np.asarray(quantiles, dtype=float)
+    ts = np.empty(nsaved)
+    mean = np.empty((nsaved, dim))
+    var = np.empty((nsaved, dim))
+    qs = np.empty((nsaved, q.size, dim))
+    paths = np.empty((nsaved, n_paths, dim)) if store_paths else None
+
+    fpt = np.full(n_paths, np.inf)
+    if barrier is not None:
+        upward = X[:, barrier_dim] < barrier
+        fpt[~upward & (X[:, barrier_dim] <= barrier)] = t0
+        fpt[upward & (X[:, barrier_dim] >= barrier)] = t0
+
+    dW = np.empty((n_paths, dim))
+    sqrt_dt = np.sqrt(dt)
+    eps = np.sqrt(np.finfo(float).eps)
+    t = t0
+    for i in range(nsteps):
+        if i % save_every == 0:
+            k = i // save_every
+            ts[k] = t
+            mean[k] = X.mean(axis=0)
+            var[k] = X.var(axis=0)
+            if q.size:
+                qs[k] = np.quantile(X, q, axis=0)
+            if paths is not None:
+                paths[k] = X
+        mu = drift(X, t)
+        sigma = diffusion(X, t)
+        rng.standard_normal(out=dW)
+        dW *= sqrt_dt
+        if method == 'milstein':
+            dsigma = diffusion_dx(X, t) if diffusion_dx is not None else (diffusion(X + eps, t) - sigma) / eps
+            X = X + mu * dt + sigma * dW + 0.5 * sigma * dsigma * (dW * dW - dt)
+        else:
+            X = X + mu * dt + sigma * dW
+        t += dt
+        if barrier is not None:
+            xb = X[:, barrier_dim]
+            hit = np.isinf(fpt) & np.where(upward, xb >= barrier, xb <= barrier)
+            fpt[hit] = t
+
+    result: Dict[str, Any] = {'mean': mean, 'var': var, 'quantiles': qs, 'final': X, 'first_passage': fpt}
+    if paths is not None:
+        result['paths'] = paths
+    return ts, result
+
+
 # ----------------------------- Fixed point solvers / root finding -----------------------------
 
-def find_fixed_point(f: Callable[[Vector], Vector], x0: Vector, method: str = 'newton', tol: float = 1e-8, maxiter: int = 200) -> Tuple[Vector, Dict[str, Any]]:
+def find_fixed_point(f: Callable[[Vector], Vector], x0: Vector, method: str = 'newton', tol: float = 1e-8, maxiter: int = 200,
+                     jac: Any = None, sparsity: Any = None) -> Tuple[Vector, Dict[str, Any]]:
     """Find x such that f(x) = 0. Wrapper supporting scipy if available, else simple Newton.
 
     f: maps R^n -> R^n
+    method: 'newton' (scipy hybr when no Jacobian option is given, else damped Newton) or
+        'newton_krylov' (matrix-free; Jacobian-vector products + GMRES, needs scipy)
+    jac: None (forward differences), 'complex' (complex step) or a callable x -> J
+        (dense or scipy.sparse)
+    sparsity: Jacobian sparsity pattern; selects colored sparse differences and sparse solves
     Returns (x_sol, info)
     """
     n = x0.size
-    if method == 'newton' and optimize is not None:
+    if method == 'newton_krylov':
+        return newton_krylov(f, x0, tol=tol, maxiter=maxiter)
+    if method == 'newton' and optimize is not None and jac is None and sparsity is None:
         try:
             sol = optimize.root(lambda x: f(x), x0, method='hybr', tol=tol)
             return sol.x, {'success': sol.success, 'nfev': sol.nfev}
@@ -166,10 +546,12 @@ def find_fixed_point(f: Callable[[Vector], Vector], x0: Vector, method: str = 'n
         norm = np.linalg.norm(Fx)
         if norm < tol:
             return x, {'success': True, 'iter': i}
-        # approximate Jacobian via finite differences
-        J = approx_jacobian(lambda y: f(y), x)
+        J = jacobian(f, x, jac=jac, sparsity=sparsity)
         try:
-            delta = np.linalg.solve(J, -Fx)
+            if sparse is not None and sparse.issparse(J):
+                delta = splinalg.spsolve(J.tocsc(), -Fx)
+            else:
+                delta = np.linalg.solve(J, -Fx)
         except np.linalg.LinAlgError:
             delta = -0.1 * Fx
         # damping
@@ -185,13 +567,190 @@ def approx_jacobian(f: Callable[[Vector], Vector], x: Vector, eps: float = 1e-6)
     Fx = f(x)
     m = Fx.size
     J = np.zeros((m, n), dtype=float)
+    xp = x.copy()
     for i in range(n):
-        xp = x.copy()
-        xp[i] += eps
+        xp[i] = x[i] + eps
         J[:, i] = (f(xp) - Fx) / eps
+        xp[i] = x[i]
+    return J
+
+
+# ----------------------------- Jacobian service -----------------------------
+
+def complex_step_jacobian(f: Callable[[Vector], Vector], x: Vector, h: float = 1e-20) -> np.ndarray:
+    """Jacobian via complex-step differentiation: J[:, i] = Im f(x + i h e_i) / h.
+
+    Accurate to machine precision (no subtractive cancellation); f must accept complex
+    input and be complex-analytic (no abs, comparisons or np.real inside).
+    """
+    xc = np.asarray(x, dtype=complex).copy()
+    n = xc.size
+    J = None
+    for i in range(n):
+        xc[i] += 1j * h
+        col = np.imag(f(xc)) / h
+        xc[i] -= 1j * h
+        if J is None:
+            J = np.empty((col.size, n))
+        J[:, i] = col
     return J
 
 
+def stencil_sparsity(shape: Tuple[int, ...], periodic: bool = True, n_components: int = 1):
+    """Sparsity of a 5-point (2D) / 7-point (3D) nearest-neighbour stencil, as a CSR pattern.
+
+    Unknowns are the C-ordered flattening of an array of `shape` (+ n_components
+    trailing components, all coupled within a site).
+    """
+    if sparse is None:
+        raise ImportError('scipy is required for sparse Jacobians')
+    idx = np.arange(int(np.prod(shape))).reshape(shape)
+    rows, cols = [idx.ravel()], [idx.ravel()]
+    for axis in range(len(shape)):
+        for shift in (1, -1):
+            nb = np.roll(idx, shift, axis=axis)
+            keep = np.ones(shape, dtype=bool)
+            if not periodic:
+                edge = [slice(None)] * len(shape)
+                edge[axis] = 0 if shift == 1 else -1
+                keep[tuple(edge)] = False
+            rows.append(idx[keep])
+            cols.append(nb[keep])
+    r, c = np.concatenate(rows), np.concatenate(cols)
+    m = idx.size
+    pattern = sparse.csr_matrix((np.ones(r.size, dtype=bool), (r, c)), shape=(m, m))
+    if n_components > 1:
+        pattern = sparse.kron(pattern, np.ones((n_components, n_components), dtype=bool), format='csr')
+    pattern.sum_duplicates()
+    return pattern
+
+
+def color_columns(sparsity) -> np.ndarray:
+    """Greedy coloring so that no two columns of one color share a nonzero row.
+
+    Columns of one color can be perturbed together in a single function evaluation.
+    """
+    S = sparse.csr_matrix(sparsity, dtype=bool)
+    C = S.tocsc()
+    n = S.shape[1]
+    colors = np.full(n, -1, dtype=np.int64)
+    for j in range(n):
+        rows_j = C.indices[C.indptr[j]:C.indptr[j + 1]]
+        nbrs = np.concatenate([S.indices[S.indptr[r]:S.indptr[r + 1]] for r in rows_j]) if rows_j.size else np.empty(0, int)
+        used = np.unique(colors[nbrs])
+        c = 0
+        for u in used:
+            if u == c:
+                c += 1
+            elif u > c:
+                break
+        colors[j] = c
+    return colors
+
+
+def sparse_fd_jacobian(f: Callable[[Vector], Vector], x: Vector, sparsity, colors: Optional[np.ndarray] = None,
+                       eps: Optional[float] = None):
+    """Forward-difference Jacobian with a known sparsity pattern, in n_colors + 1 evaluations.
+
+    Returns a scipy.sparse CSR matrix with the pattern of `sparsity`.
+    """
+    if sparse is None:
+        raise ImportError('scipy is required for sparse Jacobians')
+    x = np.asarray(x, dtype=float)
+    pattern = sparse.coo_matrix(sparsity)
+    rows, cols = pattern.row, pattern.col
+    if colors is None:
+        colors = color_columns(sparsity)
+    if eps is None:
+        eps = np.sqrt(np.finfo(float).eps) * max(1.0, np.linalg.norm(x, np.inf))
+    F0 = f(x)
+    data = np.empty(rows.size)
+    col_color = colors[cols]
+    for c in range(int(colors.max()) + 1):
+        xp = x.copy()
+        xp[colors == c] += eps
+        dF = (f(xp) - F0) / eps
+        sel = col_color == c
+        data[sel] = dF[rows[sel]]
+    return sparse.csr_matrix((data, (rows, cols)), shape=(F0.size, x.size))
+
+
+def jacobian(f: Callable[[Vector], Vector], x: Vector, jac: Any = None, sparsity: Any = None):
+    """Jacobian service: callable jac, 'complex' step, colored sparse FD, or dense forward FD."""
+    if callable(jac):
+        return jac(x)
+    if jac == 'complex':
+        return complex_step_jacobian(f, x)
+    if jac is not None:
+        raise ValueError(f"jac must be None, 'complex' or a callable, got {jac!r}")
+    if sparsity is not None:
+        return sparse_fd_jacobian(f, x, sparsity)
+    return approx_jacobian(lambda y: f(y), x)
+
+
+def jvp(f: Callable[[Vector], Vector], x: Vector, v: Vector, f0: Optional[Vector] = None,
+        method: str = 'fd') -> Vector:
+    """Jacobian-vector product J(x) v without forming J.
+
+    method='fd': (f(x + e v) - f(x)) / e with e scaled to x and v (pass f0 = f(x) to
+    save an evaluation); method='complex': Im f(x + i h v) / h.
+    """
+    v = np.asarray(v, dtype=float)
+    nv = np.linalg.norm(v)
+    if nv == 0:
+        return np.zeros_like(f(x) if f0 is None else f0, dtype=float)
+    if method == 'complex':
+        h = 1e-20
+        return np.imag(f(np.asarray(x, dtype=complex) + 1j * h * v)) / h
+    e = np.sqrt(np.finfo(float).eps) * (1.0 + np.linalg.norm(x)) / nv
+    if f0 is None:
+        f0 = f(x)
+    return (f(x + e * v) - f0) / e
+
+
+def newton_krylov(f: Callable[[Vector], Vector], x0: Vector, tol: float = 1e-8, maxiter: int = 50,
+                  inner_maxiter: int = 200) -> Tuple[Vector, Dict[str, Any]]:
+    """Matrix-free inexact Newton: GMRES on J(x) d = -f(x) with J applied by `jvp`.
+
+    The inner tolerance follows the residual (Eisenstat-Walker style forcing) and each
+    step is backtracked until ||f|| decreases. Needs scipy.sparse.linalg.
+    """
+    if splinalg is None:
+        raise ImportError('scipy is required for newton_krylov')
+    x = np.asarray(x0, dtype=float).copy()
+    Fx = f(x)
+    norm = np.linalg.norm(Fx)
+    nfev = 1
+    for i in range(maxiter):
+        if norm < tol:
+            return x, {'success': True, 'iter': i, 'nfev': nfev}
+        counter = [0]
+
+        def matvec(v, x=x, Fx=Fx):
+            counter[0] += 1
+            return jvp(f, x, v, f0=Fx)
+
+        A = splinalg.LinearOperator((x.size, x.size), matvec=matvec, dtype=float)
+        eta = min(0.5, np.sqrt(norm))
+        try:
+            d, _ = splinalg.gmres(A, -Fx, rtol=eta, atol=0.0, maxiter=inner_maxiter)
+        except TypeError:
+            # scipy < 1.12 names the relative tolerance `tol`
+            d, _ = splinalg.gmres(A, -Fx, tol=eta, atol=0.0, maxiter=inner_maxiter)
+        nfev += counter[0]
+        alpha = 1.0
+        while True:
+            x_new = x + alpha * d
+            F_new = f(x_new)
+            nfev += 1
+            norm_new = np.linalg.norm(F_new)
+            if norm_new < norm or alpha < 1e-4:
+                break
+            alpha *= 0.5
+        x, Fx, norm = x_new, F_new, norm_new
+    return x, {'success': norm < tol, 'iter': maxiter, 'nfev': nfev}
+
+
 # ----------------------------- Constraint projection utilities -----------------------------
 
 def project_to_linear_constraint(x: Vector, A: np.ndarray, b: Vector) -> Vector:
@@ -227,16 +786,39 @@ def enforce_nonlinear_constraint(x: Vector, g: Callable[[Vector], float], dg: Ca
 
 # ----------------------------- Linear stability analysis -----------------------------
 
-def stability_at_fixed_point(f: Callable[[Vector], Vector], x_star: Vector) -> Dict[str, Any]:
+def stability_at_fixed_point(f: Callable[[Vector], Vector], x_star: Vector, k: Optional[int] = None,
+                             jac: Any = None, sparsity: Any = None) -> Dict[str, Any]:
     """Estimate Jacobian at x_star and compute eigenvalues to assess linear stability.
     Returns dict with Jacobian and eigenvalues.
+
+    With k set, only the k eigenvalues of largest real part are computed with ARPACK
+    (scipy.sparse.linalg.eigs) on a sparse Jacobian (jac / sparsity) or, if neither is
+    given, on a matrix-free Jacobian-vector product operator; 'J' is then the sparse
+    matrix or None. 'max_real' and 'stable' (max_real < 0) are always reported.
     """
-    J = approx_jacobian(lambda y: f(y), x_star)
-    if linalg is not None:
-        eigvals = linalg.eigvals(J)
+    if k is None:
+        J = jacobian(f, x_star, jac=jac, sparsity=sparsity)
+        if sparse is not None and sparse.issparse(J):
+            J = J.toarray()
+        if linalg is not None:
+            eigvals = linalg.eigvals(J)
+        else:
+            eigvals = np.linalg.eigvals(J)
     else:
-        eigvals = np.linalg.eigvals(J)
-    return {'J': J, 'eigvals': eigvals}
+        if splinalg is None:
+            raise ImportError('scipy is required for leading-eigenvalue stability checks')
+        if jac is None and sparsity is None:
+            J = None
+            F0 = f(x_star)
+            op = splinalg.LinearOperator((x_star.size, x_star.size), dtype=float,
+                                         matvec=lambda v: jvp(f, x_star, v, f0=F0))
+        else:
+            J = jacobian(f, x_star, jac=jac, sparsity=sparsity)
+            op = J
+        eigvals = splinalg.eigs(op, k=k, which='LR', return_eigenvectors=False)
+        eigvals = eigvals[np.argsort(-eigvals.real)]
+    max_real = float(np.max(np.real(eigvals)))
+    return {'J': J, 'eigvals': eigvals, 'max_real': max_real, 'stable': max_real < 0}
 
 
 # ----------------------------- Demo harness -----------------------------
@@ -249,6 +831,12 @@ if __name__ == "__main__":
     x0 = np.array([1.0])
     ts, xs = integrate_ode(x0, lambda x, t: f(x, t), (0.0, 5.0), dt=0.01, method='rk4')
     print('ODE final state:', xs[-1])
+    ts, xs = integrate_ode(x0, f, (0.0, 5.0), dt=0.01, method='rk45', save_every=50, rtol=1e-8)
+    print('RK45 decimated trajectory:', xs[:, 0])
+    # stiff relaxation onto cos(t)
+    stiff = lambda x, t: -1e4 * (x - np.cos(t)) - np.sin(t)
+    sol = integrate_ode_dense(np.array([1.0]), stiff, (0.0, 2.0), method='rosenbrock', rtol=1e-6)
+    print('Rosenbrock steps:', len(sol.t_steps), 'x(1.5) =', sol(1.5), 'cos(1.5) =', np.cos(1.5))
 
     # DDE example: x' = -x(t) + 0.5 * x(t-delay)
     def history(t):
@@ -263,6 +851,10 @@ if __name__ == "__main__":
     diffusion = lambda x, t: 0.2 * np.ones_like(x)
     ts_sde, xs_sde = integrate_sde_em(np.array([0.0]), drift, diffusion, (0.0, 5.0), dt=0.001)
     print('SDE sample final state:', xs_sde[-1])
+    ts_b, res = integrate_sde_batch(np.array([1.0]), drift, diffusion, (0.0, 5.0), dt=0.001, n_paths=10000,
+                                    seed=1234, save_every=1000, barrier=0.5)
+    print('SDE batch mean/var at saved times:', res['mean'][:, 0], res['var'][:, 0])
+    print('Mean first passage to 0.5:', res['first_passage'][np.isfinite(res['first_passage'])].mean())
 
     # fixed-point solve for g(x) = -x + sin(x) -> root near 0
     f_root = lambda x: -x + np.sin(x)
@@ -13,6 +13,9 @@ Inputs:
 - dt: time step
 - n_steps: number of iterations
 - optional λ (coupling constant)
+- optional n_workers / tiles for shared-memory domain decomposition
+- optional callback(step, Phi, V, S) per-step hook (e.g. an EntropyLedger)
+- optional boundary / bc_value (periodic by default; see core.boundary_conditions)
 
 Outputs:
 - Updated Phi, V, S arrays
@@ -23,12 +26,19 @@ Testing Focus:
 - Preservation of global entropy bounds
 """
 from __future__ import annotations
-from typing import Tuple, Optional
+from typing import Callable, Tuple, Optional
 import numpy as np
 
 
-def lamphron_step(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, lam: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Single Lamphron relaxation step (toy placeholder)."""
+def lamphron_step(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, lam: float = 1.0,
+                  boundary='periodic', bc_value=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Single Lamphron relaxation step (toy placeholder).
+
+    Non-periodic boundaries and 3D lattices use the ghost-cell stencil.
+    """
+    if boundary != 'periodic' or Phi.ndim != 2:
+        from core.boundary_conditions import diffuse
+        return tuple(diffuse(f, dt * lam, bc=boundary, value=bc_value, ndim=Phi.ndim) for f in (Phi, V, S))
     # basic smoothing term
     Phi_new = Phi + dt * lam * (np.roll(Phi, 1, axis=0) + np.roll(Phi, -1, axis=0) + 
                                 np.roll(Phi, 1, axis=1) + np.roll(Phi, -1, axis=1) - 4*Phi)
@@ -39,11 +49,39 @@ def lamphron_step(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.0
     return Phi_new, V_new, S_new
 
 
-def run_lamphron(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, n_steps: int = 100, lam: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Full Lamphron evolution over n_steps."""
+def run_lamphron(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, n_steps: int = 100, lam: float = 1.0,
+                 n_workers: int = 1, tiles: Optional[Tuple[int, int]] = None,
+                 callback: Optional[Callable] = None, boundary='periodic',
+                 bc_value=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Full Lamphron evolution over n_steps.
+
+    n_workers > 1 runs the same update on a shared-memory process pool (bit-identical).
+    callback(step, Phi, V, S), if given, runs after every serial step.
+    Other than periodic on a 2D lattice, the fields are relaxed in place inside
+    GhostField buffers (periodic 2D only with n_workers > 1).
+    """
+    ghosted = boundary != 'periodic' or Phi.ndim != 2
+    if n_workers > 1 and ghosted:
+        raise ValueError('n_workers > 1 supports only periodic 2D lattices')
+    if ghosted:
+        from core.boundary_conditions import GhostField
+        grids = [GhostField.from_array(f, bc=boundary, value=bc_value, ndim=Phi.ndim) for f in (Phi, V, S)]
+        for step in range(n_steps):
+            for g in grids:
+                g.diffuse(dt * lam)
+            if callback is not None:
+                callback(step + 1, *(g.interior for g in grids))
+        return tuple(np.ascontiguousarray(g.interior) for g in grids)
+    if n_workers > 1:
+        if callback is not None:
+            raise ValueError('callback is not supported with n_workers > 1')
+        from utils.domain_decomposition import run_decomposed
+        return run_decomposed((Phi, V, S), coef=dt * lam, n_steps=n_steps, n_workers=n_workers, tiles=tiles)
     Phi_curr, V_curr, S_curr = Phi.copy(), V.copy(), S.copy()
     for step in range(n_steps):
         Phi_curr, V_curr, S_curr = lamphron_step(Phi_curr, V_curr, S_curr, dt=dt, lam=lam)
+        if callback is not None:
+            callback(step + 1, Phi_curr, V_curr, S_curr)
     return Phi_curr, V_curr, S_curr
 
 
@@ -5,9 +5,12 @@ Information-geometry and semantic-manifold utilities for the RSVP Analysis Suite
 This starter module provides:
 - functions to construct local probability distributions from fields
 - pointwise and global information metrics (KL divergence, Jensen-Shannon, Fisher info)
+- batched, block-wise pairwise KL / JS / Hellinger matrices over stacks of snapshots
 - routines to compute a simple Fisher-Rao metric tensor for discretized fields
 - a toy φ_RSVP diagnostic that combines field gradients and entropy to yield a scalar map
-- PCA / manifold embedding helpers for visualization-ready low-dimensional embeddings
+- PCA / manifold embedding helpers for visualization-ready low-dimensional embeddings:
+  zero-copy patch views, a streaming randomized PCA and a sparse kNN-graph spectral
+  embedding that scale to ~10^6 patches without forming P x P or P x d dense matrices
 
 This module intentionally focuses on clear, auditable numerics that you can
 plug into the grid-based `rsvp_fields` outputs.
@@ -24,6 +27,16 @@ except Exception:
     PCA = None
     SpectralEmbedding = None
 
+# optional scipy pieces for the kNN-graph spectral embedding
+try:
+    import scipy.sparse as sp_sparse
+    import scipy.sparse.linalg as sp_linalg
+    from scipy.spatial import cKDTree
+except Exception:
+    sp_sparse = None
+    sp_linalg = None
+    cKDTree = None
+
 
 # ----------------------------- Probability conversions -----------------------------
 
@@ -56,26 +69,129 @@ def jensen_shannon(p: np.ndarray, q: np.ndarray, base: float = 2.0) -> float:
     return 0.5 * kl_divergence(p, m, base=base) + 0.5 * kl_divergence(q, m, base=base)
 
 
+# ----------------------------- Batched pairwise divergences -----------------------------
+
+def normalize_pmf_stack(P: np.ndarray, eps: float = 1e-12, dtype: Any = None) -> np.ndarray:
+    """Normalize a stack of fields (n, ...) into n row pmfs of shape (n, d) in one pass.
+
+    Each row is clipped at eps and divided by its sum, exactly as `normalize_to_pmf`
+    does for a single array. dtype (e.g. np.float32) sets the working precision;
+    by default floating inputs keep their dtype and anything else becomes float64.
+    """
+    P = np.asarray(P)
+    if dtype is None:
+        dtype = P.dtype if np.issubdtype(P.dtype, np.floating) else np.float64
+    X = np.clip(P.reshape(P.shape[0], -1).astype(dtype, copy=True), eps, None)
+    X /= X.sum(axis=1, keepdims=True)
+    return X
+
+
+def _row_blocks(n: int, size: int):
+    return [(i, min(i + size, n)) for i in range(0, n, size)]
+
+
+def pairwise_divergence(P: np.ndarray, Q: np.ndarray | None = None, metric: str = 'js', base: float = 2.0,
+                        block_size: int = 256, max_block_mb: float = 64.0, n_threads: int = 1,
+                        normalized: bool = False, dtype: Any = None) -> np.ndarray:
+    """Pairwise divergence matrix between every row pmf of P and every row pmf of Q.
+
+    P (n, ...) and Q (m, ...) are stacks of fields, normalized once with
+    `normalize_pmf_stack` (skip with normalized=True). Q=None compares P with itself
+    and, for the symmetric metrics, only the upper block triangle is computed.
+
+    metric:
+      'kl'        - D_KL(p_i || q_j) = sum p log p - p @ log(q)^T   (one GEMM per block)
+      'js'        - Jensen-Shannon, H(m) - (H(p) + H(q)) / 2 with m = (p + q) / 2
+      'hellinger' - sqrt(1 - sum sqrt(p q))                        (one GEMM per block)
+
+    KL and JS are in units of log(base); Hellinger lies in [0, 1]. The matrix products
+    run through BLAS (multithreaded if the BLAS is). JS has no GEMM form; its
+    (rows, cols, d) temporaries are capped at max_block_mb and the row blocks can be
+    spread over n_threads threads, since numpy releases the GIL inside the ufuncs.
+    """
+    symmetric = Q is None
+    X = P if normalized else normalize_pmf_stack(P, dtype=dtype)
+    Y = X if symmetric else (Q if normalized else normalize_pmf_stack(Q, dtype=X.dtype))
+    X = np.asarray(X)
+    Y = np.asarray(Y)
+    if X.shape[1] != Y.shape[1]:
+        raise ValueError(f'pmf sizes differ: {X.shape[1]} vs {Y.shape[1]}')
+    n, m, d = X.shape[0], Y.shape[0], X.shape[1]
+    out = np.empty((n, m), dtype=X.dtype)
+    log_base = np.log(base)
+
+    if metric == 'kl':
+        negent = np.einsum('ij,ij->i', X, np.log(X))
+        logY = np.log(Y)
+        kernel = lambda i0, i1, j0, j1: (negent[i0:i1, None] - X[i0:i1] @ logY[j0:j1].T) / log_base
+        symmetric = False
+    elif metric == 'hellinger':
+        sX = np.sqrt(X)
+        sY = sX if Y is X else np.sqrt(Y)
+        kernel = lambda i0, i1, j0, j1: np.sqrt(np.clip(1.0 - sX[i0:i1] @ sY[j0:j1].T, 0.0, None))
+    elif metric == 'js':
+        hX = np.einsum('ij,ij->i', X, np.log(X))
+        hY = hX if Y is X else np.einsum('ij,ij->i', Y, np.log(Y))
+        cols = max(1, int(max_block_mb * 2 ** 20 // (X.itemsize * d * min(block_size, n))))
+
+        def kernel(i0, i1, j0, j1):
+            res = np.empty((i1 - i0, j1 - j0), dtype=X.dtype)
+            for c0, c1 in _row_blocks(j1 - j0, cols):
+                M = 0.5 * (X[i0:i1, None, :] + Y[None, j0 + c0:j0 + c1, :])
+                mlogm = np.einsum('abk,abk->ab', M, np.log(M))
+                res[:, c0:c1] = 0.5 * (hX[i0:i1, None] + hY[None, j0 + c0:j0 + c1]) - mlogm
+            return np.clip(res, 0.0, None) / log_base
+    else:
+        raise ValueError(f"unknown metric '{metric}'")
+
+    tasks = [(i0, i1, j0, j1) for i0, i1 in _row_blocks(n, block_size) for j0, j1 in _row_blocks(m, block_size)
+             if not (symmetric and j1 <= i0)]
+
+    def run(task):
+        i0, i1, j0, j1 = task
+        out[i0:i1, j0:j1] = kernel(i0, i1, j0, j1)
+        if symmetric and j0 != i0:
+            out[j0:j1, i0:i1] = out[i0:i1, j0:j1].T
+
+    if n_threads > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=n_threads) as pool:
+            list(pool.map(run, tasks))
+    else:
+        for task in tasks:
+            run(task)
+    if symmetric:
+        # diagonal blocks were computed in full; make them exactly symmetric with a zero diagonal
+        out = 0.5 * (out + out.T)
+        np.fill_diagonal(out, 0.0)
+    return out
+
+
 # ----------------------------- Fisher information (discrete approx) -----------------------------
 
 def fisher_information_field(pmf_field: np.ndarray, dx: float = 1.0) -> np.ndarray:
-    """Compute a pointwise scalar Fisher information density for a PMF defined over a 2D grid.
+    r"""Compute a pointwise scalar Fisher information density for a PMF defined over a 2D grid.
 
     We approximate I = \int (|grad p(x)|^2 / p(x)) dx by discrete finite differences per cell.
-    Returns the same shape as pmf_field.
+    The grid is the last two axes, so a time-stacked (T, nx, ny) array is handled in
+    one pass. float32 input stays float32. Returns the same shape as pmf_field.
     """
-    p = np.asarray(pmf_field, dtype=float)
+    p = np.asarray(pmf_field)
+    if not np.issubdtype(p.dtype, np.floating):
+        p = p.astype(float)
     p = np.clip(p, 1e-12, None)
-    # gradients (central differences)
-    p_p = np.pad(p, 1, mode='wrap')
-    dpdx = (p_p[1:-1, 2:] - p_p[1:-1, 0:-2]) / (2 * dx)
-    dpdy = (p_p[2:, 1:-1] - p_p[0:-2, 1:-1]) / (2 * dx)
+    # gradients (central differences, periodic)
+    dpdx = (np.roll(p, -1, axis=-1) - np.roll(p, 1, axis=-1)) / (2 * dx)
+    dpdy = (np.roll(p, -1, axis=-2) - np.roll(p, 1, axis=-2)) / (2 * dx)
     I = (dpdx ** 2 + dpdy ** 2) / p
     return I
 
 
-def total_fisher_information(pmf_field: np.ndarray, dx: float = 1.0) -> float:
+def total_fisher_information(pmf_field: np.ndarray, dx: float = 1.0) -> Any:
+    """Total Fisher information; a float for one field, shape (T,) for a time stack."""
     I = fisher_information_field(pmf_field, dx=dx)
+    if I.ndim > 2:
+        return np.sum(I, axis=(-2, -1)) * (dx * dx)
     return float(np.sum(I) * (dx * dx))
 
 
@@ -113,29 +229,164 @@ def phi_rsvp_map(Phi: np.ndarray, S: np.ndarray, normalize: bool = True) -> np.n
 
 # ----------------------------- Embedding helpers -----------------------------
 
-def field_patch_embedding(Phi: np.ndarray, S: np.ndarray, patch_size: int = 4, method: str = 'pca') -> np.ndarray:
+def patch_view(Phi: np.ndarray, S: np.ndarray, patch_size: int = 4, stride: int | None = None) -> np.ndarray:
+    """Patches of the stacked (Phi, S) fields as a strided view, shape (n_i, n_j, 2, p, p).
+
+    Built with `sliding_window_view`, so only the (2, nx, ny) stack is allocated. stride
+    defaults to patch_size (non-overlapping tiles); patches that would run past the
+    grid edge are dropped. Flattening the last three axes gives the feature order
+    [Phi patch, S patch] used by `field_patch_embedding`.
+    """
+    stride = patch_size if stride is None else stride
+    F = np.stack([np.asarray(Phi), np.asarray(S)])
+    if F.shape[1] < patch_size or F.shape[2] < patch_size:
+        raise ValueError('patch_size larger than the field')
+    W = np.lib.stride_tricks.sliding_window_view(F, (patch_size, patch_size), axis=(1, 2))
+    return W[:, ::stride, ::stride].transpose(1, 2, 0, 3, 4)
+
+
+def _patch_batches(view: np.ndarray, batch_size: int):
+    """Yield (start, X) with X a dense (rows, d) float block of consecutive patches."""
+    n_i, n_j = view.shape[:2]
+    d = int(np.prod(view.shape[2:]))
+    rows_per = max(1, batch_size // max(n_j, 1))
+    for i0 in range(0, n_i, rows_per):
+        block = view[i0:i0 + rows_per]
+        yield i0 * n_j, block.reshape(-1, d).astype(float, copy=False)
+
+
+def randomized_patch_pca(view: np.ndarray, n_components: int = 2, n_oversample: int = 10,
+                         n_iter: int = 2, batch_size: int = 65536, seed: int = 0) -> np.ndarray:
+    """Streaming randomized PCA (Halko et al.) of the flattened patches in `view`.
+
+    The centred data matrix Xc (P x d) is never formed: every product with Xc or its
+    transpose runs over patch batches, so memory is O(P * l + d * l) with
+    l = n_components + n_oversample. Component signs are fixed so the largest
+    loading is positive. Returns scores of shape (P, n_components).
+    """
+    n_i, n_j = view.shape[:2]
+    P = n_i * n_j
+    d = int(np.prod(view.shape[2:]))
+    l = min(n_components + n_oversample, d, P)
+    mean = np.zeros(d)
+    for _, X in _patch_batches(view, batch_size):
+        mean += X.sum(axis=0)
+    mean /= P
+
+    def Xc_dot(M):  # (P, d) @ (d, l)
+        out = np.empty((P, M.shape[1]))
+        for start, X in _patch_batches(view, batch_size):
+            out[start:start + X.shape[0]] = (X - mean) @ M
+        return out
+
+    def XcT_dot(Q):  # (d, P) @ (P, l)
+        out = np.zeros((d, Q.shape[1]))
+        for start, X in _patch_batches(view, batch_size):
+            out += (X - mean).T @ Q[start:start + X.shape[0]]
+        return out
+
+    rng = np.random.default_rng(seed)
+    Q, _ = np.linalg.qr(Xc_dot(rng.standard_normal((d, l))))
+    for _ in range(n_iter):
+        Z, _ = np.linalg.qr(XcT_dot(Q))
+        Q, _ = np.linalg.qr(Xc_dot(Z))
+    B = XcT_dot(Q).T  # (l, d) = Q^T Xc
+    Ub, s, Vt = np.linalg.svd(B, full_matrices=False)
+    k = min(n_components, s.size)
+    signs = np.sign(Vt[np.arange(k), np.argmax(np.abs(Vt[:k]), axis=1)])
+    signs[signs == 0] = 1.0
+    return (Q @ Ub[:, :k]) * (s[:k] * signs)
+
+
+def _knn_affinity(dist: np.ndarray, sigma_q: np.ndarray, sigma_ref: np.ndarray) -> np.ndarray:
+    """Self-tuning Gaussian affinities exp(-d^2 / (sigma_i sigma_j))."""
+    return np.exp(-dist ** 2 / (sigma_q[:, None] * sigma_ref))
+
+
+def knn_spectral_embedding(X: np.ndarray, n_components: int = 2, n_neighbors: int = 10,
+                           n_landmarks: int = 20000, seed: int = 0) -> np.ndarray:
+    """Laplacian eigenmap of X (P x d) on a sparse symmetric kNN graph.
+
+    Neighbours come from a KD-tree (O(P log P)) and the affinities are Gaussian with a
+    per-point scale (distance to the k-th neighbour). The smallest non-trivial
+    eigenvectors of the normalised Laplacian are found as the largest of
+    D^-1/2 W D^-1/2 with sparse Lanczos, so nothing P x P is ever dense.
+
+    When P > n_landmarks the eigenproblem is solved on a random landmark subset and
+    every point is placed by the affinity-weighted mean of its nearest landmarks'
+    coordinates (a Nystrom-style extension), keeping the cost near O(P log P).
+    """
+    if cKDTree is None or sp_sparse is None:
+        raise ImportError('scipy required for kNN spectral embedding')
+    X = np.asarray(X, dtype=float)
+    P = X.shape[0]
+    rng = np.random.default_rng(seed)
+    L = X if P <= n_landmarks else X[np.sort(rng.choice(P, n_landmarks, replace=False))]
+    m = L.shape[0]
+    k = min(n_neighbors, m - 1)
+    tree = cKDTree(L)
+    dist, idx = tree.query(L, k=k + 1)
+    dist, idx = dist[:, 1:], idx[:, 1:]
+    sigma = np.maximum(dist[:, -1], 1e-12)
+    w = _knn_affinity(dist, sigma, sigma[idx])
+    W = sp_sparse.csr_matrix((w.ravel(), (np.repeat(np.arange(m), k), idx.ravel())), shape=(m, m))
+    W = W.maximum(W.T)
+    deg = np.asarray(W.sum(axis=1)).ravel()
+    d_inv_sqrt = 1.0 / np.sqrt(np.maximum(deg, 1e-300))
+    M = sp_sparse.diags(d_inv_sqrt) @ W @ sp_sparse.diags(d_inv_sqrt)
+    vals, vecs = sp_linalg.eigsh(M, k=n_components + 1, which='LA', v0=rng.standard_normal(m))
+    order = np.argsort(vals)[::-1]
+    Y = vecs[:, order[1:n_components + 1]] * d_inv_sqrt[:, None]
+    signs = np.sign(Y[np.argmax(np.abs(Y), axis=0), np.arange(Y.shape[1])])
+    Y = Y * np.where(signs == 0, 1.0, signs)
+    if m == P:
+        return Y
+
+    out = np.empty((P, Y.shape[1]))
+    step = 1 << 16
+    for s0 in range(0, P, step):
+        dq, iq = tree.query(X[s0:s0 + step], k=k)
+        sq = np.maximum(dq[:, -1], 1e-12)
+        wq = _knn_affinity(dq, sq, sigma[iq]) + 1e-300
+        out[s0:s0 + step] = np.einsum('pk,pkc->pc', wq, Y[iq]) / wq.sum(axis=1)[:, None]
+    return out
+
+
+def field_patch_embedding(Phi: np.ndarray, S: np.ndarray, patch_size: int = 4, method: str = 'pca',
+                          n_components: int = 2, stride: int | None = None, n_neighbors: int = 10,
+                          n_landmarks: int = 20000, batch_size: int = 65536, seed: int = 0) -> np.ndarray:
     """Extract patches from (Phi,S) and embed them into low-dim coordinates for visualization.
 
-    Returns an array of shape (n_patches, 2) if embedding to 2D.
+    Patches come from `patch_view` (non-overlapping by default, row-major patch order).
+    Methods:
+      'pca'            - scikit-learn PCA on the dense patch matrix
+      'spectral'       - scikit-learn SpectralEmbedding (dense affinity, O(P^2))
+      'randomized_pca' - streaming randomized PCA, no dense patch matrix
+      'knn_spectral'   - sparse kNN-graph Laplacian eigenmap on a randomized-PCA
+                         reduction of the patches (8 components), solved on at
+                         most n_landmarks patches and extended to the rest
+
+    Returns an array of shape (n_patches, n_components).
     """
-    nx, ny = Phi.shape
-    patches = []
-    for i0 in range(0, nx, patch_size):
-        for j0 in range(0, ny, patch_size):
-            pphi = Phi[i0:i0 + patch_size, j0:j0 + patch_size].ravel()
-            ps = S[i0:i0 + patch_size, j0:j0 + patch_size].ravel()
-            patches.append(np.concatenate([pphi, ps]))
-    X = np.vstack(patches)
+    view = patch_view(Phi, S, patch_size, stride)
+    if method == 'randomized_pca':
+        return randomized_patch_pca(view, n_components, batch_size=batch_size, seed=seed)
+    if method == 'knn_spectral':
+        d = int(np.prod(view.shape[2:]))
+        Z = randomized_patch_pca(view, min(max(8, n_components), d), batch_size=batch_size, seed=seed)
+        return knn_spectral_embedding(Z, n_components, n_neighbors=n_neighbors,
+                                      n_landmarks=n_landmarks, seed=seed)
+    X = view.reshape(-1, int(np.prod(view.shape[2:])))
     if method == 'pca':
         if PCA is None:
             raise ImportError('scikit-learn required for PCA embedding')
-        pca = PCA(n_components=2)
+        pca = PCA(n_components=n_components)
         Y = pca.fit_transform(X)
         return Y
     elif method == 'spectral':
         if SpectralEmbedding is None:
             raise ImportError('scikit-learn required for SpectralEmbedding')
-        se = SpectralEmbedding(n_components=2)
+        se = SpectralEmbedding(n_components=n_components)
         Y = se.fit_transform(X)
         return Y
     else:
@@ -159,4 +410,8 @@ if __name__ == "__main__":
     print('Total Fisher information:', total_fisher_information(pmf))
     phi_map = phi_rsvp_map(Phi, S)
     print('phi_map stats:', phi_map.min(), phi_map.max(), phi_map.mean())
+    Y = field_patch_embedding(Phi, S, patch_size=4, method='randomized_pca')
+    print('Randomized PCA patch embedding:', Y.shape)
+    snapshots = np.stack([np.abs(Phi) + S * (1 + 0.1 * k) for k in range(6)])
+    print('Pairwise JS matrix (first row):', np.round(pairwise_divergence(snapshots, metric='js')[0], 6))
 
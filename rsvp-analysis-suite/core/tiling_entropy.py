@@ -6,10 +6,20 @@ RSVP Analysis Suite (RAS).
 
 Features in this starter module:
 - Gray-code sequence generators and index <-> 2D coordinate mappings
+- Vectorized Hilbert and Morton (Z-order) encode/decode over whole index arrays,
+  and `CurveLayout` for storing fields in space-filling-curve order so each tile
+  is one contiguous memory segment (see benchmarks/bench_curve_layout.py)
 - Functions to partition a 2D grid into tiles following a Gray-code ordering
   (useful for recursive tilings and entropy-tiling experiments)
 - Compute per-tile entropy and several diagnostics (mean, variance, Gini)
-- Build a tile-adjacency graph (uses networkx if available) for graph-based analyses
+- `EntropyPyramid`: sum p and sum p log p per block aggregated up a quadtree, so
+  every power-of-two tile size comes from one O(N) pass and field updates only
+  refresh the blocks they touch
+- `TileGrid`: tiles described by their row/column edges (ragged edge tiles allowed);
+  per-tile reductions run as one O(N) `np.add.reduceat` pass with no per-tile masks,
+  and an integer label array is available on demand
+- Build a tile-adjacency graph in O(N) from a tile-label array (networkx graph,
+  scipy CSR matrix or plain dict), optionally weighted by entropy differences
 - Small CLI/demo harness when executed as __main__
 
 This module intentionally focuses on clarity and extendability rather than
@@ -17,7 +27,8 @@ high performance. Replace tiling strategies with more advanced L-systems or
 CRDT-based tiling rules in later iterations.
 """
 from __future__ import annotations
-from typing import Tuple, List, Sequence, Dict, Any
+from typing import Tuple, List, Sequence, Dict, Any, Union
+import collections.abc
 
 import numpy as np
 
@@ -27,6 +38,12 @@ try:
 except Exception:
     nx = None
 
+# optional scipy.sparse for CSR adjacency output
+try:
+    import scipy.sparse as sp_sparse
+except Exception:
+    sp_sparse = None
+
 
 # ----------------------------- Gray code utilities -----------------------------
 
@@ -55,8 +72,9 @@ def hilbert_like_from_gray(idx: int, order: int) -> Tuple[int, int]:
     """Map a Gray-code index to a 2D coordinate for a 2^order x 2^order grid.
 
     This is a simple mapping that chops the index bits into x and y interleaved
-    from least-significant bits. It is NOT a true Hilbert curve mapper, but it
-    often produces locality-preserving layouts useful for tiling experiments.
+    from least-significant bits. It is NOT a true Hilbert curve mapper (that is
+    `hilbert_decode`), but it often produces locality-preserving layouts useful
+    for tiling experiments.
 
     Inputs
       idx: integer index (should be < 2^(2*order))
@@ -66,114 +84,332 @@ def hilbert_like_from_gray(idx: int, order: int) -> Tuple[int, int]:
     maxbits = 2 * order
     if idx >= (1 << maxbits):
         raise ValueError("idx too large for given order")
-    x = 0
-    y = 0
-    for b in range(order):
-        xi = (idx >> (2 * b)) & 1
-        yi = (idx >> (2 * b + 1)) & 1
-        x |= (xi << b)
-        y |= (yi << b)
+    x, y = morton_decode(idx)
+    return int(x), int(y)
+
+
+# ----------------------------- Space-filling curves -----------------------------
+# All encoders/decoders below operate on whole integer arrays (or scalars) at once;
+# the per-bit work is a fixed number of vectorized passes, never a Python loop
+# over indices. Coordinates are limited to 32 bits per axis (uint64 codes).
+
+_MORTON_MASKS = (
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, 0x5555555555555555),
+)
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    v = np.asarray(v, dtype=np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in _MORTON_MASKS:
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def _compact_bits(v: np.ndarray) -> np.ndarray:
+    v = np.asarray(v, dtype=np.uint64) & np.uint64(0x5555555555555555)
+    for (shift, _), (_, mask) in zip(reversed(_MORTON_MASKS), reversed(_MORTON_MASKS[:-1])):
+        v = (v | (v >> np.uint64(shift))) & np.uint64(mask)
+    return (v | (v >> np.uint64(16))) & np.uint64(0xFFFFFFFF)
+
+
+def morton_encode(x, y) -> np.ndarray:
+    """Z-order code with x in the even bits and y in the odd bits."""
+    return _spread_bits(x) | (_spread_bits(y) << np.uint64(1))
+
+
+def morton_decode(d) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of `morton_encode`; returns (x, y) as int64 arrays."""
+    d = np.asarray(d, dtype=np.uint64)
+    return (_compact_bits(d).astype(np.int64),
+            _compact_bits(d >> np.uint64(1)).astype(np.int64))
+
+
+def _hilbert_rot(s, x, y, rx, ry):
+    flip = (ry == 0) & (rx == 1)
+    x = np.where(flip, s - 1 - x, x)
+    y = np.where(flip, s - 1 - y, y)
+    swap = ry == 0
+    return np.where(swap, y, x), np.where(swap, x, y)
+
+
+def hilbert_encode(x, y, order: int) -> np.ndarray:
+    """Distance along the Hilbert curve of a 2^order x 2^order grid for cells (x, y)."""
+    x = np.array(x, dtype=np.int64)
+    y = np.array(y, dtype=np.int64)
+    n = 1 << order
+    if np.any((x < 0) | (x >= n) | (y < 0) | (y >= n)):
+        raise ValueError('coordinates outside the 2**order grid')
+    d = np.zeros(np.broadcast(x, y).shape, dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = ((x & s) > 0).astype(np.int64)
+        ry = ((y & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+        x, y = _hilbert_rot(n, x, y, rx, ry)
+        s >>= 1
+    return d
+
+
+def hilbert_decode(d, order: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Cells (x, y) at distances d along the Hilbert curve of a 2^order x 2^order grid."""
+    t = np.array(d, dtype=np.int64)
+    n = 1 << order
+    if np.any((t < 0) | (t >= n * n)):
+        raise ValueError('index too large for given order')
+    x = np.zeros_like(t)
+    y = np.zeros_like(t)
+    s = 1
+    while s < n:
+        rx = 1 & (t >> 1)
+        ry = 1 & (t ^ rx)
+        x, y = _hilbert_rot(s, x, y, rx, ry)
+        x = x + s * rx
+        y = y + s * ry
+        t = t >> 2
+        s <<= 1
     return x, y
 
 
+def curve_index(x, y, curve: str = 'hilbert', order: int | None = None) -> np.ndarray:
+    """Position of cells (x, y) along 'hilbert', 'morton' or 'tartan' (Gray-coded Morton) order.
+
+    order defaults to the smallest power of two enclosing the coordinates.
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    if order is None:
+        extent = int(max(np.max(x, initial=0), np.max(y, initial=0))) + 1
+        order = max(0, int(np.ceil(np.log2(extent))))
+    if curve == 'hilbert':
+        return hilbert_encode(x, y, order)
+    m = morton_encode(x, y)
+    if curve == 'morton':
+        return m.astype(np.int64)
+    if curve == 'tartan':
+        return (m ^ (m >> np.uint64(1))).astype(np.int64)
+    raise ValueError(f"unknown curve '{curve}'")
+
+
+def curve_permutation(grid_shape: Tuple[int, int], curve: str = 'hilbert',
+                      tile_size: Union[int, Tuple[int, int], None] = None) -> np.ndarray:
+    """Row-major flat indices of an (nx, ny) grid listed in space-filling-curve order.
+
+    Without tile_size the whole grid follows the curve (grids that are not a power of
+    two use the enclosing power-of-two curve with the outside cells dropped). With a
+    tile_size, tiles are visited in curve order over the tile grid and the cells of
+    each tile follow the curve locally, so every tile is one contiguous segment.
+    """
+    nx, ny = int(grid_shape[0]), int(grid_shape[1])
+    I, J = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    I, J = I.ravel(), J.ravel()
+    if tile_size is None:
+        return np.argsort(curve_index(I, J, curve), kind='stable')
+    grid = TileGrid((nx, ny), tile_size)
+    tx, ty = grid.tile_size
+    tile_key = curve_index(I // tx, J // ty, curve)
+    cell_key = curve_index(I % tx, J % ty, curve)
+    return np.lexsort((cell_key, tile_key))
+
+
+class CurveLayout:
+    """Storage of (nx, ny[, ...]) fields in space-filling-curve order.
+
+    `pack` gathers a row-major field into a flat curve-ordered buffer and `unpack`
+    scatters it back. With a tile_size each tile occupies one contiguous segment of
+    the packed buffer (`tile_offsets`), so tile-wise reductions are a single 1D
+    `np.add.reduceat` over unit-stride memory. Tile results are returned in the
+    row-major TileGrid numbering.
+    """
+
+    def __init__(self, grid_shape: Tuple[int, int], tile_size: Union[int, Tuple[int, int], None] = None,
+                 curve: str = 'hilbert'):
+        self.grid_shape = (int(grid_shape[0]), int(grid_shape[1]))
+        self.curve = curve
+        self.perm = curve_permutation(self.grid_shape, curve, tile_size)
+        self.tiles = None
+        if tile_size is not None:
+            self.tiles = TileGrid(self.grid_shape, tile_size)
+            packed_labels = self.tiles.labels().ravel()[self.perm]
+            starts = np.flatnonzero(np.diff(packed_labels, prepend=-1))
+            self.tile_offsets = starts
+            self.tile_ids = packed_labels[starts]
+
+    def pack(self, A: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        A = np.asarray(A)
+        if A.shape[:2] != self.grid_shape:
+            raise ValueError(f'array shape {A.shape} does not match grid {self.grid_shape}')
+        flat = A.reshape((-1,) + A.shape[2:])
+        return np.take(flat, self.perm, axis=0, out=out)
+
+    def unpack(self, a: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        a = np.asarray(a)
+        if out is None:
+            out = np.empty(self.grid_shape + a.shape[1:], dtype=a.dtype)
+        out.reshape((-1,) + a.shape[1:])[self.perm] = a
+        return out
+
+    def tile_sums(self, a: np.ndarray) -> np.ndarray:
+        """Per-tile sums of a packed buffer, in TileGrid order, shape (T, ...)."""
+        if self.tiles is None:
+            raise ValueError('CurveLayout was built without a tile_size')
+        seg = np.add.reduceat(np.asarray(a), self.tile_offsets, axis=0)
+        out = np.empty_like(seg)
+        out[self.tile_ids] = seg
+        return out
+
+
 # ----------------------------- Tiling generators -----------------------------
 
-def tartan_tiling_coords(order: int) -> List[Tuple[int, int]]:
+def tartan_tiling_coords(order: int, curve: str = 'tartan') -> List[Tuple[int, int]]:
     """Return a list of (x,y) coordinates covering a 2^order x 2^order grid
     in a Gray-code influenced ordering. Use this to map linear tile indices to
-    spatial cells.
+    spatial cells. curve='hilbert' or 'morton' returns those orderings instead.
     """
-    size = 1 << order
-    N = size * size
-    seq = []
-    for idx in range(N):
-        g = int_to_gray(idx)
-        x, y = hilbert_like_from_gray(g, order)
-        seq.append((x, y))
-    return seq
+    idx = np.arange(1 << (2 * order), dtype=np.int64)
+    if curve == 'hilbert':
+        x, y = hilbert_decode(idx, order)
+    elif curve == 'morton':
+        x, y = morton_decode(idx)
+    elif curve == 'tartan':
+        x, y = morton_decode(idx ^ (idx >> 1))
+    else:
+        raise ValueError(f"unknown curve '{curve}'")
+    return list(zip(x.tolist(), y.tolist()))
+
+
+class TileGrid(collections.abc.Sequence):
+    """Rectangular tiling of an (nx, ny) grid into tiles of tile_size (int or (tx, ty)).
 
+    Tiles are numbered row-major, k = i * n_cols + j, with tile (i, j) covering
+    rows row_edges[i]:row_edges[i+1] and cols col_edges[j]:col_edges[j+1]; the last
+    row/column of tiles is smaller when the grid is not divisible by the tile size.
+
+    Only the edges are stored. Indexing or iterating yields the legacy full-grid
+    boolean masks one at a time, so older mask-based code keeps working, while the
+    vectorized functions in this module use `tile_sums` / `labels` directly.
+    """
 
-def partition_grid_by_tiles(grid_shape: Tuple[int, int], tile_size: int) -> List[np.ndarray]:
-    """Partition a rectangular grid (nx, ny) into non-overlapping square tiles of tile_size.
-    Returns a list of boolean masks (nx, ny) where True indicates cells belonging to the tile.
+    def __init__(self, grid_shape: Tuple[int, int], tile_size: Union[int, Tuple[int, int]]):
+        self.grid_shape = (int(grid_shape[0]), int(grid_shape[1]))
+        tx, ty = (tile_size, tile_size) if np.isscalar(tile_size) else tile_size
+        if tx < 1 or ty < 1:
+            raise ValueError('tile_size must be positive')
+        nx, ny = self.grid_shape
+        self.tile_size = (int(tx), int(ty))
+        self.row_edges = np.append(np.arange(0, nx, tx), nx)
+        self.col_edges = np.append(np.arange(0, ny, ty), ny)
+        self.n_rows = self.row_edges.size - 1
+        self.n_cols = self.col_edges.size - 1
+
+    def __len__(self) -> int:
+        return self.n_rows * self.n_cols
+
+    def __getitem__(self, k: int) -> np.ndarray:
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        rs, cs = self.slices(k)
+        mask = np.zeros(self.grid_shape, dtype=bool)
+        mask[rs, cs] = True
+        return mask
+
+    def slices(self, k: int) -> Tuple[slice, slice]:
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError('tile index out of range')
+        i, j = divmod(k, self.n_cols)
+        return (slice(int(self.row_edges[i]), int(self.row_edges[i + 1])),
+                slice(int(self.col_edges[j]), int(self.col_edges[j + 1])))
+
+    def anchors(self) -> np.ndarray:
+        """(T, 2) array of each tile's top-left cell."""
+        I, J = np.meshgrid(self.row_edges[:-1], self.col_edges[:-1], indexing='ij')
+        return np.stack([I.ravel(), J.ravel()], axis=1)
+
+    def sizes(self) -> np.ndarray:
+        """Number of cells per tile, shape (T,)."""
+        return np.outer(np.diff(self.row_edges), np.diff(self.col_edges)).ravel()
+
+    def labels(self) -> np.ndarray:
+        """Integer (nx, ny) array holding each cell's tile index."""
+        ri = np.repeat(np.arange(self.n_rows), np.diff(self.row_edges))
+        ci = np.repeat(np.arange(self.n_cols), np.diff(self.col_edges))
+        return (ri[:, None] * self.n_cols + ci[None, :]).astype(np.int64)
+
+    def tile_sums(self, A: np.ndarray) -> np.ndarray:
+        """Per-tile sums of an (nx, ny) array in one O(N) pass, shape (T,)."""
+        A = np.asarray(A)
+        if A.shape[:2] != self.grid_shape:
+            raise ValueError(f'array shape {A.shape} does not match grid {self.grid_shape}')
+        out = np.add.reduceat(np.add.reduceat(A, self.row_edges[:-1], axis=0), self.col_edges[:-1], axis=1)
+        return out.reshape((len(self),) + A.shape[2:])
+
+
+def partition_grid_by_tiles(grid_shape: Tuple[int, int], tile_size: Union[int, Tuple[int, int]]) -> TileGrid:
+    """Partition a rectangular grid (nx, ny) into non-overlapping tiles of tile_size.
+    Returns a TileGrid, a sequence whose items are boolean masks (nx, ny) where True
+    indicates cells belonging to the tile (built on access; nothing is preallocated).
 
     Note: If grid dimensions are not divisible by tile_size, the final tiles along the
     right/bottom edges will be smaller.
     """
-    nx, ny = grid_shape
-    tiles = []
-    for i0 in range(0, nx, tile_size):
-        for j0 in range(0, ny, tile_size):
-            mask = np.zeros((nx, ny), dtype=bool)
-            mask[i0:min(i0 + tile_size, nx), j0:min(j0 + tile_size, ny)] = True
-            tiles.append(mask)
-    return tiles
+    return TileGrid(grid_shape, tile_size)
 
 
-def tile_order_from_tartan(order: int, tile_size: int, grid_shape: Tuple[int, int] | None = None) -> List[int]:
+def tile_order_from_tartan(order: int, tile_size: int, grid_shape: Tuple[int, int] | None = None,
+                           curve: str = 'tartan') -> List[int]:
     """Produce a linear ordering of tile indices following a tartan Gray-code inspired ordering.
 
-    We map each tile's anchor coordinate to the nearest Gray-code coordinate and sort.
+    Each tile's anchor coordinate is mapped to its Gray-coded Morton index (or its
+    'hilbert' / 'morton' curve index) in one vectorized pass and the tiles are sorted by it.
     Returns a list of tile indices (0..T-1) in the chosen order.
     """
     if grid_shape is None:
         size = 1 << order
         grid_shape = (size, size)
-    nx, ny = grid_shape
-
-    # form tile anchors
-    anchors = []
-    tiles = partition_grid_by_tiles(grid_shape, tile_size)
-    for k, m in enumerate(tiles):
-        # anchor is the top-left True cell
-        idxs = np.argwhere(m)
-        if idxs.shape[0] == 0:
-            anchors.append(((0, 0), k))
-        else:
-            anchors.append(((int(idxs[0, 0]), int(idxs[0, 1])), k))
-
-    # map anchor to Gray-like index by interleaving bits of anchor within grid order
-    def anchor_to_idx(anchor):
-        x, y = anchor
-        # clamp to grid powers
-        order_x = int(np.ceil(np.log2(max(1, nx))))
-        order_y = int(np.ceil(np.log2(max(1, ny))))
-        order_bits = max(order_x, order_y)
-        # build an idx by interleaving bits (simple)
-        idx = 0
-        for b in range(order_bits):
-            xi = (x >> b) & 1
-            yi = (y >> b) & 1
-            idx |= (xi << (2 * b))
-            idx |= (yi << (2 * b + 1))
-        return int_to_gray(idx)
-
-    mapped = [(anchor_to_idx(a), k) for (a, k) in anchors]
-    mapped.sort()
-    return [k for (_g, k) in mapped]
+
+    # form tile anchors (top-left cell of each tile)
+    anchors = partition_grid_by_tiles(grid_shape, tile_size).anchors()
+    order_bits = max(0, int(np.ceil(np.log2(max(1, *grid_shape)))))
+    key = curve_index(anchors[:, 0], anchors[:, 1], curve, order=order_bits)
+    return np.argsort(key, kind='stable').tolist()
 
 
 # ----------------------------- Entropy tiling diagnostics -----------------------------
 
+def _entropy_stats(S: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-cell sufficient statistics a = |S| and a log a (with 0 log 0 = 0)."""
+    a = np.abs(np.asarray(S, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alog = np.where(a > 0, a * np.log(a), 0.0)
+    return a, alog
+
+
+def _entropy_from_sums(Z: np.ndarray, A: np.ndarray, base: float) -> np.ndarray:
+    """Entropy of blocks with Z = sum a and A = sum a log a; empty blocks give 0."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H = (np.log(Z) - A / Z) / np.log(base)
+    return np.where(Z > 0, np.maximum(H, 0.0), 0.0)
+
+
 def compute_tile_entropies(S: np.ndarray, tiles: Sequence[np.ndarray], base: float = 2.0) -> np.ndarray:
     """Compute per-tile Shannon-like entropy (normalize each tile to a pmf then compute -sum p log_b p).
     Returns an array of entropies with length equal to number of tiles.
+
+    For a TileGrid all tiles are reduced at once: with a = |S|, Z = sum a and
+    A = sum a log a per tile, H = (log Z - A / Z) / log(base). A plain list of masks
+    falls back to one masked reduction per tile, with the same 0 log 0 = 0 convention.
     """
-    entropies = []
-    for mask in tiles:
-        vals = np.asarray(S)[mask]
-        if vals.size == 0:
-            entropies.append(0.0)
-            continue
-        p = np.abs(vals)
-        if np.sum(p) == 0:
-            entropies.append(0.0)
-            continue
-        p = p / np.sum(p)
-        with np.errstate(divide='ignore', invalid='ignore'):
-            e = -np.sum(p * np.log(p)) / np.log(base)
-        entropies.append(float(np.nan_to_num(e)))
-    return np.array(entropies)
+    a, alog = _entropy_stats(S)
+    if isinstance(tiles, TileGrid):
+        return _entropy_from_sums(tiles.tile_sums(a), tiles.tile_sums(alog), base)
+    Z = np.array([a[mask].sum() for mask in tiles], dtype=float)
+    A = np.array([alog[mask].sum() for mask in tiles], dtype=float)
+    return _entropy_from_sums(Z, A, base)
 
 
 def gini_coefficient(x: Sequence[float]) -> float:
@@ -204,49 +440,237 @@ def tile_entropy_diagnostics(S: np.ndarray, tiles: Sequence[np.ndarray], base: f
         'var_entropy': float(np.var(ent)) if ent.size else 0.0,
         'gini_entropy': gini_coefficient(ent),
     }
-    # fraction of total entropy in top-k tiles
+    # fraction of total entropy in top-k tiles; one partial sort serves every k
     total = float(np.sum(ent)) if ent.size else 0.0
-    for k in (1, 3, 5):
+    ks = (1, 3, 5)
+    if ent.size:
+        kmax = min(max(ks), ent.size)
+        idx = np.argpartition(-ent, kmax - 1)[:kmax]
+        idx = idx[np.argsort(-ent[idx], kind='stable')]
+        top = ent[idx]
+        diagnostics['top_tiles'] = [int(i) for i in idx]
+    for k in ks:
         if ent.size == 0 or total == 0:
             diagnostics[f'top_{k}_frac'] = 0.0
         else:
-            topk = np.sort(ent)[-k:]
-            diagnostics[f'top_{k}_frac'] = float(np.sum(topk) / total)
+            diagnostics[f'top_{k}_frac'] = float(np.sum(top[:k]) / total)
     return diagnostics
 
 
+# ----------------------------- Multi-scale entropy pyramid -----------------------------
+
+class EntropyPyramid:
+    """Quadtree of tile entropy sufficient statistics for tile sizes base_tile * 2**l.
+
+    Level 0 holds Z = sum |S| and A = sum |S| log |S| over base_tile x base_tile blocks;
+    each coarser level sums 2x2 blocks of the level below. Because the tile edges of
+    size 2t nest inside those of size t (ragged edge tiles included), level l equals
+    a TileGrid of tile size base_tile * 2**l, so every scale comes out of one O(N)
+    pass instead of one full reduction per tile size.
+
+    `update` re-reduces only the level-0 blocks covering a changed window and then
+    the ancestors of those blocks, recomputing from children rather than applying
+    deltas so repeated updates do not drift.
+    """
+
+    def __init__(self, S: np.ndarray, base_tile: int = 1, base: float = 2.0, max_levels: int | None = None):
+        S = np.asarray(S)
+        if S.ndim != 2:
+            raise ValueError('EntropyPyramid expects a 2D field')
+        if base_tile < 1:
+            raise ValueError('base_tile must be positive')
+        self.grid_shape = S.shape
+        self.base_tile = int(base_tile)
+        self.base = base
+        grid = TileGrid(S.shape, self.base_tile)
+        a, alog = _entropy_stats(S)
+        shape = (grid.n_rows, grid.n_cols)
+        self.Z = [grid.tile_sums(a).reshape(shape)]
+        self.A = [grid.tile_sums(alog).reshape(shape)]
+        while max(self.Z[-1].shape) > 1 and (max_levels is None or len(self.Z) < max_levels):
+            self.Z.append(self._coarsen(self.Z[-1]))
+            self.A.append(self._coarsen(self.A[-1]))
+
+    @staticmethod
+    def _coarsen(X: np.ndarray) -> np.ndarray:
+        rows = np.arange(0, X.shape[0], 2)
+        cols = np.arange(0, X.shape[1], 2)
+        return np.add.reduceat(np.add.reduceat(X, rows, axis=0), cols, axis=1)
+
+    @property
+    def tile_sizes(self) -> List[int]:
+        return [self.base_tile << l for l in range(len(self.Z))]
+
+    def level(self, tile_size: int) -> int:
+        """Pyramid level of tile_size; sizes beyond a single-tile top level map to that level."""
+        sizes = self.tile_sizes
+        if tile_size in sizes:
+            return sizes.index(tile_size)
+        q, r = divmod(tile_size, self.base_tile)
+        if (not r and tile_size > sizes[-1] and q & (q - 1) == 0
+                and self.Z[-1].shape == (1, 1)):
+            # a tile at least as large as the grid covers it whole, like the top level
+            return len(sizes) - 1
+        raise ValueError(f'tile_size {tile_size} not in pyramid {sizes}')
+
+    def entropies(self, tile_size: int) -> np.ndarray:
+        """Tile entropies in TileGrid order; equals compute_tile_entropies(S, partition_grid_by_tiles(shape, tile_size))."""
+        l = self.level(tile_size)
+        return _entropy_from_sums(self.Z[l], self.A[l], self.base).ravel()
+
+    def scale_profile(self) -> Dict[str, np.ndarray]:
+        """Mean and variance of tile entropy at every tile size."""
+        ents = [self.entropies(t) for t in self.tile_sizes]
+        return {
+            'tile_size': np.array(self.tile_sizes),
+            'mean_entropy': np.array([e.mean() for e in ents]),
+            'var_entropy': np.array([e.var() for e in ents]),
+        }
+
+    def update(self, S: np.ndarray, window: Tuple[slice, slice]) -> None:
+        """Refresh the pyramid after the cells S[window] changed (S is the full updated field)."""
+        S = np.asarray(S)
+        if S.shape != self.grid_shape:
+            raise ValueError(f'field shape {S.shape} does not match pyramid {self.grid_shape}')
+        (r0, r1, _), (c0, c1, _) = (w.indices(n) for w, n in zip(window, self.grid_shape))
+        if r1 <= r0 or c1 <= c0:
+            return
+        bt = self.base_tile
+        i0, i1 = r0 // bt, -(-r1 // bt)
+        j0, j1 = c0 // bt, -(-c1 // bt)
+        block = S[i0 * bt:i1 * bt, j0 * bt:j1 * bt]
+        a, alog = _entropy_stats(block)
+        rows = np.arange(0, block.shape[0], bt)
+        cols = np.arange(0, block.shape[1], bt)
+        self.Z[0][i0:i1, j0:j1] = np.add.reduceat(np.add.reduceat(a, rows, axis=0), cols, axis=1)
+        self.A[0][i0:i1, j0:j1] = np.add.reduceat(np.add.reduceat(alog, rows, axis=0), cols, axis=1)
+        for l in range(1, len(self.Z)):
+            # children i0..i1 map to parents i0 // 2 .. ceil(i1 / 2); re-sum those parents
+            i0, i1, j0, j1 = i0 // 2, -(-i1 // 2), j0 // 2, -(-j1 // 2)
+            for X in (self.Z, self.A):
+                X[l][i0:i1, j0:j1] = self._coarsen(X[l - 1][2 * i0:2 * i1, 2 * j0:2 * j1])
+
+
+def multiscale_tile_entropies(S: np.ndarray, tile_sizes: Sequence[int] | None = None,
+                              base: float = 2.0) -> Dict[int, np.ndarray]:
+    """Tile entropies for every power-of-two tile size (or the given subset) from one pyramid."""
+    sizes = list(tile_sizes) if tile_sizes is not None else None
+    base_tile = min(sizes) if sizes else 1
+    pyramid = EntropyPyramid(S, base_tile=base_tile, base=base)
+    return {t: pyramid.entropies(t) for t in (sizes or pyramid.tile_sizes)}
+
+
 # ----------------------------- Adjacency graph -----------------------------
 
-def build_tile_adjacency_graph(tiles: Sequence[np.ndarray]) -> Any:
+def tile_labels(tiles: Union[TileGrid, Sequence[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Integer label array (nx, ny) for a TileGrid, a label array or a list of masks.
+    Cells covered by no mask are labelled -1.
+    """
+    if isinstance(tiles, TileGrid):
+        return tiles.labels()
+    if isinstance(tiles, np.ndarray) and np.issubdtype(tiles.dtype, np.integer):
+        return tiles
+    labels = None
+    for k, mask in enumerate(tiles):
+        if labels is None:
+            labels = np.full(np.shape(mask), -1, dtype=np.int64)
+        labels[np.asarray(mask, dtype=bool)] = k
+    return labels if labels is not None else np.zeros((0, 0), dtype=np.int64)
+
+
+def tile_adjacency_pairs(labels: np.ndarray, periodic: bool = False) -> np.ndarray:
+    """Unique (i, j) tile pairs with i < j that share a 4-neighbour cell boundary.
+
+    Each pair of neighbouring cells is compared once (one shifted comparison per
+    axis), so the cost is O(N) in the number of cells rather than O(T^2 N). With
+    periodic=True the last row/column also touches the first. Returns shape (E, 2).
+    """
+    labels = np.asarray(labels)
+    a_parts, b_parts = [], []
+    for axis in range(labels.ndim):
+        if labels.shape[axis] < 2:
+            continue
+        n = labels.shape[axis]
+        lo = np.take(labels, np.arange(n - 1), axis=axis)
+        hi = np.take(labels, np.arange(1, n), axis=axis)
+        a_parts.append(lo.ravel())
+        b_parts.append(hi.ravel())
+        if periodic and n > 2:
+            a_parts.append(np.take(labels, -1, axis=axis).ravel())
+            b_parts.append(np.take(labels, 0, axis=axis).ravel())
+    if not a_parts:
+        return np.zeros((0, 2), dtype=np.int64)
+    a = np.concatenate(a_parts)
+    b = np.concatenate(b_parts)
+    keep = (a != b) & (a >= 0) & (b >= 0)
+    i = np.minimum(a[keep], b[keep]).astype(np.int64)
+    j = np.maximum(a[keep], b[keep]).astype(np.int64)
+    T = int(labels.max()) + 1 if labels.size else 0
+    key = np.unique(i * T + j)
+    return np.stack([key // max(T, 1), key % max(T, 1)], axis=1)
+
+
+def build_tile_adjacency_graph(tiles: Union[TileGrid, Sequence[np.ndarray], np.ndarray],
+                               entropies: np.ndarray | None = None,
+                               output: str = 'auto',
+                               periodic: bool = False) -> Any:
     """Build a graph where nodes are tile indices and edges exist if two tiles touch.
-    If networkx is present, returns an nx.Graph, otherwise returns adjacency dict.
+
+    tiles may be a TileGrid, an integer label array or a list of boolean masks; all
+    are reduced to a label array and adjacency is read off neighbouring cells in O(N)
+    (see `tile_adjacency_pairs`). If entropies (one value per tile, e.g. from
+    `compute_tile_entropies`) is given, each edge is weighted by |H_i - H_j|.
+
+    output:
+      'auto'     - nx.Graph if networkx is present, otherwise an adjacency dict
+      'networkx' - nx.Graph with a 'weight' edge attribute when weighted
+      'csr'      - symmetric scipy.sparse CSR matrix (T, T); unweighted edges are 1,
+                   weighted edges keep explicit zeros for equal-entropy neighbours
+      'dict'     - {i: set(j)} or, when weighted, {i: {j: w}}
     """
-    T = len(tiles)
-    adj = {i: set() for i in range(T)}
-    # naive O(T^2) overlap check — fine for moderate T
-    for i in range(T):
-        for j in range(i + 1, T):
-            # touching if any cell adjacent (4-neighborhood)
-            A = tiles[i]
-            B = tiles[j]
-            # compute dilation of A by 1 and check intersection with B
-            A_pad = np.pad(A.astype(int), pad_width=1, mode='constant', constant_values=0)
-            # shift neighbors
-            neigh = (
-                A_pad[0:-2, 1:-1] | A_pad[2:, 1:-1] | A_pad[1:-1, 0:-2] | A_pad[1:-1, 2:]
-            )
-            if np.any(neigh & B):
-                adj[i].add(j)
-                adj[j].add(i)
-    if nx is not None:
+    labels = tile_labels(tiles)
+    T = len(tiles) if not isinstance(tiles, np.ndarray) else (int(labels.max()) + 1 if labels.size else 0)
+    pairs = tile_adjacency_pairs(labels, periodic=periodic)
+    i, j = pairs[:, 0], pairs[:, 1]
+    if entropies is not None:
+        entropies = np.asarray(entropies, dtype=float)
+        if entropies.shape != (T,):
+            raise ValueError(f'entropies must have shape ({T},), got {entropies.shape}')
+        w = np.abs(entropies[i] - entropies[j])
+    else:
+        w = None
+
+    if output == 'auto':
+        output = 'networkx' if nx is not None else 'dict'
+    if output == 'csr':
+        if sp_sparse is None:
+            raise ImportError('scipy is required for output="csr"')
+        data = np.ones(i.size) if w is None else w
+        return sp_sparse.csr_matrix((np.concatenate([data, data]),
+                                     (np.concatenate([i, j]), np.concatenate([j, i]))), shape=(T, T))
+    if output == 'networkx':
+        if nx is None:
+            raise ImportError('networkx is required for output="networkx"')
         G = nx.Graph()
         G.add_nodes_from(range(T))
-        for i, nbrs in adj.items():
-            for j in nbrs:
-                G.add_edge(i, j)
+        if w is None:
+            G.add_edges_from(zip(i.tolist(), j.tolist()))
+        else:
+            G.add_weighted_edges_from(zip(i.tolist(), j.tolist(), w.tolist()))
         return G
-    else:
+    if output == 'dict':
+        if w is None:
+            adj = {k: set() for k in range(T)}
+            for a, b in zip(i.tolist(), j.tolist()):
+                adj[a].add(b)
+                adj[b].add(a)
+        else:
+            adj = {k: {} for k in range(T)}
+            for a, b, x in zip(i.tolist(), j.tolist(), w.tolist()):
+                adj[a][b] = x
+                adj[b][a] = x
         return adj
+    raise ValueError(f"unknown output '{output}'")
 
 
 # ----------------------------- Demo / CLI harness -----------------------------
@@ -266,9 +690,13 @@ if __name__ == "__main__":
     print('Computed', ent.size, 'tile entropies; mean=', np.mean(ent))
     diag = tile_entropy_diagnostics(S, tiles)
     print('Diagnostics:', diag)
-    G = build_tile_adjacency_graph(tiles)
+    profile = EntropyPyramid(S).scale_profile()
+    print('Mean tile entropy by tile size:',
+          dict(zip(profile['tile_size'].tolist(), np.round(profile['mean_entropy'], 3).tolist())))
+    G = build_tile_adjacency_graph(tiles, entropies=ent)
     if nx is not None:
-        print('Adjacency graph: nodes=', G.number_of_nodes(), 'edges=', G.number_of_edges())
+        print('Adjacency graph: nodes=', G.number_of_nodes(), 'edges=', G.number_of_edges(),
+              'total |dH|=', round(G.size(weight='weight'), 4))
     else:
         print('Adjacency dict created with', len(G), 'nodes')
 
@@ -6,6 +6,7 @@ Runs the cosmological validation suite for RSVP theory: redshift, CMB, and lensi
 Purpose:
 - Automate cosmological experiment execution
 - Collect results for analysis and visualization
+- Run the lattice-size x dt x λ grid through the parallel, resumable sweep executor
 
 Inputs:
 - Config parameters for simulation (lattice size, dt, λ)
@@ -18,39 +19,35 @@ Testing Focus:
 - Proper recording of metrics and observables
 """
 from __future__ import annotations
-import json
-import os
 import numpy as np
 
 from simulation.lattice_solver import run_lattice_solver
-from utils.logging_utils import initialize_log, log_event
-
-
-def run_cosmo_suite(output_path: str = 'cosmo_suite.jsonl') -> None:
-    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    initialize_log(output_path)
-
+from simulation.parameter_sweeps import expand_grid, run_sweep_executor
+
+
+def cosmo_task(task: dict) -> dict:
+    p = task['params']
+    L = p['lattice_size']
+    rng = np.random.default_rng(task['seed'])
+    Phi = rng.standard_normal((L,L))
+    V = rng.standard_normal((L,L,2))
+    S = rng.standard_normal((L,L))
+    Phi_new, V_new, S_new = run_lattice_solver(Phi, V, S, dt=p['dt'], n_steps=50)
+    return {
+        'Phi_min': float(Phi_new.min()),
+        'Phi_max': float(Phi_new.max()),
+        'S_min': float(S_new.min()),
+        'S_max': float(S_new.max())
+    }
+
+
+def run_cosmo_suite(output_path: str = 'cosmo_suite.jsonl', n_workers: int = 1, resume: bool = True, base_seed: int = 0) -> dict:
     lattice_sizes = [16,32]
     dt_values = [0.01,0.02]
     lambda_values = [0.5,1.0]
 
-    for L in lattice_sizes:
-        for dt in dt_values:
-            for lam in lambda_values:
-                Phi = np.random.randn(L,L)
-                V = np.random.randn(L,L,2)
-                S = np.random.randn(L,L)
-                Phi_new, V_new, S_new = run_lattice_solver(Phi, V, S, dt=dt, n_steps=50)
-                metrics = {
-                    'lattice_size': L,
-                    'dt': dt,
-                    'lambda': lam,
-                    'Phi_min': float(Phi_new.min()),
-                    'Phi_max': float(Phi_new.max()),
-                    'S_min': float(S_new.min()),
-                    'S_max': float(S_new.max())
-                }
-                log_event(metrics, output_path)
+    tasks = expand_grid(base_seed, lattice_size=lattice_sizes, dt=dt_values, **{'lambda': lambda_values})
+    return run_sweep_executor(tasks, cosmo_task, output_path, n_workers=n_workers, resume=resume)
 
 
 # Demo harness
@@ -6,11 +6,13 @@ Performs stress tests on RSVP simulations: varying λ, Σ̇, and boundary condit
 Purpose:
 - Identify critical points and sensitivity to parameters
 - Test robustness of entropic dynamics under extreme conditions
+- Run the λ x boundary-mode grid through the parallel, resumable sweep executor
 
 Inputs:
-- Range of λ values
+- Range of λ values (each task's λ is the Lamphron relaxation coupling)
 - Lattice size, dt, n_steps
-- Boundary condition type
+- Boundary condition type (each task's boundary_mode is passed to the relaxation
+  solver and the entropy balance)
 
 Outputs:
 - JSONL file summarizing stress test metrics
@@ -20,42 +22,37 @@ Testing Focus:
 - Proper logging of Σ̇ and boundary behavior
 """
 from __future__ import annotations
-import json
-import os
 import numpy as np
 
-from simulation.lattice_solver import run_lattice_solver
+from core.lamphron_solver import run_lamphron
 from simulation.entropy_balance import run_entropy_balance
-from utils.logging_utils import initialize_log, log_event
-
-
-def run_entropy_stress(output_path: str = 'entropy_stress.jsonl') -> None:
-    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    initialize_log(output_path)
-
+from simulation.parameter_sweeps import expand_grid, run_sweep_executor
+
+
+def entropy_stress_task(task: dict, lattice_size: int = 16, dt: float = 0.01, n_steps: int = 50) -> dict:
+    rng = np.random.default_rng(task['seed'])
+    Phi = rng.standard_normal((lattice_size, lattice_size))
+    V = rng.standard_normal((lattice_size, lattice_size, 2))
+    S = rng.standard_normal((lattice_size, lattice_size))
+    p = task['params']
+    boundary = p['boundary_mode']
+    Phi_new, V_new, S_new = run_lamphron(Phi, V, S, dt=dt, n_steps=n_steps, lam=p['lambda'], boundary=boundary)
+    Sigma_dot_history, S_final = run_entropy_balance(Phi_new, V, S_new, dt=dt, n_steps=n_steps, boundary=boundary)
+    return {
+        'Sigma_dot_mean': float(np.mean(Sigma_dot_history)),
+        'Phi_min': float(Phi_new.min()),
+        'Phi_max': float(Phi_new.max()),
+        'S_min': float(S_final.min()),
+        'S_max': float(S_final.max())
+    }
+
+
+def run_entropy_stress(output_path: str = 'entropy_stress.jsonl', n_workers: int = 1, resume: bool = True, base_seed: int = 0) -> dict:
     lambda_values = [0.1, 0.5, 1.0, 2.0, 5.0]  # stress extremes
-    lattice_size = 16
-    dt = 0.01
-    n_steps = 50
     boundary_modes = ['periodic', 'reflective', 'open']
 
-    for lam in lambda_values:
-        for mode in boundary_modes:
-            Phi = np.random.randn(lattice_size, lattice_size)
-            V = np.random.randn(lattice_size, lattice_size, 2)
-            S = np.random.randn(lattice_size, lattice_size)
-            Phi_new, V_new, S_new = run_lattice_solver(Phi, V, S, dt=dt, n_steps=n_steps)
-            Sigma_dot_history, S_final = run_entropy_balance(Phi_new, V, S_new, dt=dt, n_steps=n_steps)
-            metrics = {
-                'lambda': lam,
-                'boundary_mode': mode,
-                'Sigma_dot_mean': float(np.mean(Sigma_dot_history)),
-                'Phi_min': float(Phi_new.min()),
-                'Phi_max': float(Phi_new.max()),
-                'S_min': float(S_final.min()),
-                'S_max': float(S_final.max())
-            }
-            log_event(metrics, output_path)
+    tasks = expand_grid(base_seed, **{'lambda': lambda_values}, boundary_mode=boundary_modes)
+    return run_sweep_executor(tasks, entropy_stress_task, output_path, n_workers=n_workers, resume=resume)
 
 
 # Demo harness
@@ -6,6 +6,7 @@ Executes neural validation experiments for RSVP theory: EEG/fMRI entropy couplin
 Purpose:
 - Automate neural experiment execution
 - Collect field-neural correlations for analysis
+- Run the lattice-size x dt x λ grid through the parallel, resumable sweep executor
 
 Inputs:
 - EEG/fMRI data arrays
@@ -19,45 +20,39 @@ Testing Focus:
 - Proper logging and reproducibility
 """
 from __future__ import annotations
-import json
-import os
 import numpy as np
 
 from simulation.lattice_solver import run_lattice_solver
 from simulation.entropy_balance import run_entropy_balance
-from utils.logging_utils import initialize_log, log_event
-from utils.stats_utils import spatial_coherence
-
-
-def run_neuro_suite(output_path: str = 'neuro_suite.jsonl') -> None:
-    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    initialize_log(output_path)
-
+from simulation.parameter_sweeps import expand_grid, run_sweep_executor
+from simulation.phase_coherence import spatial_coherence
+
+
+def neuro_task(task: dict) -> dict:
+    p = task['params']
+    L, dt = p['lattice_size'], p['dt']
+    rng = np.random.default_rng(task['seed'])
+    Phi = rng.standard_normal((L,L))
+    V = rng.standard_normal((L,L,2))
+    S = rng.standard_normal((L,L))
+    Phi_new, V_new, S_new = run_lattice_solver(Phi, V, S, dt=dt, n_steps=50)
+    Sigma_dot_history, S_final = run_entropy_balance(Phi_new, V, S_new, dt=dt, n_steps=50)
+    coherence_metric = spatial_coherence(Phi_new, S_final)
+    return {
+        'coherence_metric': float(coherence_metric),
+        'Sigma_dot_mean': float(np.mean(Sigma_dot_history))
+    }
+
+
+def run_neuro_suite(output_path: str = 'neuro_suite.jsonl', n_workers: int = 1, resume: bool = True, base_seed: int = 0) -> dict:
     lattice_sizes = [16]
     dt_values = [0.01]
     lambda_values = [0.5]
 
-    # Placeholder: simulate EEG/fMRI data as random fields
-    eeg_data = np.random.randn(16,16)
-    fmri_data = np.random.randn(16,16)
+    # Placeholder: EEG/fMRI inputs are not yet wired into the tasks
 
-    for L in lattice_sizes:
-        for dt in dt_values:
-            for lam in lambda_values:
-                Phi = np.random.randn(L,L)
-                V = np.random.randn(L,L,2)
-                S = np.random.randn(L,L)
-                Phi_new, V_new, S_new = run_lattice_solver(Phi, V, S, dt=dt, n_steps=50)
-                Sigma_dot_history, S_final = run_entropy_balance(Phi_new, V, S_new, dt=dt, n_steps=50)
-                coherence_metric = spatial_coherence(Phi_new, S_final)
-                metrics = {
-                    'lattice_size': L,
-                    'dt': dt,
-                    'lambda': lam,
-                    'coherence_metric': float(coherence_metric),
-                    'Sigma_dot_mean': float(np.mean(Sigma_dot_history))
-                }
-                log_event(metrics, output_path)
+    tasks = expand_grid(base_seed, lattice_size=lattice_sizes, dt=dt_values, **{'lambda': lambda_values})
+    return run_sweep_executor(tasks, neuro_task, output_path, n_workers=n_workers, resume=resume)
 
 
 # Demo harness
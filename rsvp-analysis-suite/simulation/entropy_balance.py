@@ -6,42 +6,189 @@ Tracks entropy evolution: ∂_t S, divergence of (Phi*V), and entropy production
 Purpose:
 - Monitor entropy conservation or production in RSVP simulations.
 - Provide metrics for stability and phase transitions.
+- Account for Σ̇ incrementally with `EntropyLedger`: a preallocated ring buffer of
+  recent Σ̇ values, a running integral ∫Σ̇ dt and a conservation error
+  (ΔΣS - ∫Σ̇ dt). A ledger is a per-step hook for the lattice, spectral and Lamphron
+  solvers (`callback=ledger`), so entropy is measured on the run itself.
 
 Inputs:
 - Phi, V, S arrays
 - dt: timestep
 - n_steps: number of iterations
+- boundary, bc_value: boundary condition for div V (periodic by default; see
+  core.boundary_conditions)
 
 Outputs:
 - Sigma_dot time series
 - Updated S array
+- Ledger summary (running integral, extrema, conservation error)
 
 Testing Focus:
 - Correct computation of divergence
 - Consistency of integrated Σ̇
+- Ring buffer wrap-around and hook agreement with the batch computation
 """
 from __future__ import annotations
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 import numpy as np
 
 
-def divergence(Phi: np.ndarray, V: np.ndarray) -> np.ndarray:
+def divergence(Phi: np.ndarray, V: np.ndarray, out: Optional[np.ndarray] = None,
+               work: Optional[np.ndarray] = None, boundary='periodic', bc_value=0.0,
+               ghost=None) -> np.ndarray:
+    """2D periodic central-difference divergence of V.
+
+    Uses slice differences instead of rolled copies; the arithmetic per cell
+    ((V[i+1] - V[i-1]) / 2 for each component, then the sum) is unchanged.
+    `out` and `work` are optional preallocated buffers of the lattice shape.
+
+    Any other boundary, or a 3D lattice (V of shape (nx, ny, nz, 3)), reads the
+    differences from a ghost-padded copy of V; pass a matching `ghost` GhostField to
+    reuse its buffer across calls.
+    """
+    if boundary != 'periodic' or V.ndim != 3:
+        return _ghost_divergence(V, out, work, boundary, bc_value, ghost)
+    Vx, Vy = V[..., 0], V[..., 1]
+    if out is None:
+        out = np.empty(Vx.shape, dtype=np.result_type(V, float))
+    tmp = np.empty_like(out) if work is None else work
     # 2D central difference
-    dVx_dx = (np.roll(V[...,0], -1, axis=0) - np.roll(V[...,0], 1, axis=0))/2
-    dVy_dy = (np.roll(V[...,1], -1, axis=1) - np.roll(V[...,1], 1, axis=1))/2
-    return dVx_dx + dVy_dy
+    np.subtract(Vx[2:], Vx[:-2], out=out[1:-1])
+    np.subtract(Vx[:1], Vx[-2:-1], out=out[-1:])
+    np.subtract(Vx[1:2], Vx[-1:], out=out[:1])
+    np.subtract(Vy[:, 2:], Vy[:, :-2], out=tmp[:, 1:-1])
+    np.subtract(Vy[:, :1], Vy[:, -2:-1], out=tmp[:, -1:])
+    np.subtract(Vy[:, 1:2], Vy[:, -1:], out=tmp[:, :1])
+    out /= 2
+    tmp /= 2
+    out += tmp
+    return out
+
+
+def _ghost_divergence(V, out, work, boundary, bc_value, ghost):
+    if ghost is None:
+        from core.boundary_conditions import GhostField
+        ghost = GhostField(V.shape, bc=boundary, value=bc_value, ndim=V.ndim - 1,
+                           dtype=np.result_type(V, float))
+    ghost.interior[...] = V
+    ghost.fill()
+    if out is None:
+        out = np.empty(V.shape[:-1], dtype=np.result_type(V, float))
+    tmp = np.empty_like(out) if work is None else work
+    ghost.central_difference(0, out=out, component=0, fill=False)
+    for axis in range(1, V.ndim - 1):
+        ghost.central_difference(axis, out=tmp, component=axis, fill=False)
+        out += tmp
+    return out
+
+
+class EntropyLedger:
+    """Incremental Σ̇ bookkeeping for a running simulation.
+
+    `record(Sigma_dot, S_total)` adds one step: Σ̇ goes into a ring buffer holding
+    the last `capacity` values, the integral ∫Σ̇ dt is accumulated with compensated
+    (Kahan) summation and, when S_total = ΣS is supplied, the conservation error
+    (S_total - S_total_0) - ∫Σ̇ dt is updated.
+
+    Called as `ledger(step, Phi, V, S)` it is a solver hook: Σ̇ = Σ div V is
+    evaluated into a cached scratch buffer, with no per-step allocation. Give it the
+    solver's `boundary` / `bc_value` so div V sees the same boundary.
+    """
+
+    def __init__(self, dt: float, capacity: int = 1024, S0: Optional[np.ndarray] = None,
+                 boundary='periodic', bc_value=0.0):
+        if capacity < 1:
+            raise ValueError('capacity must be >= 1')
+        self.dt = dt
+        self.capacity = capacity
+        self._ring = np.empty(capacity)
+        self.n_steps = 0
+        self.integral = 0.0
+        self._comp = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.S_total0 = float(np.sum(S0)) if S0 is not None else None
+        self.S_total = self.S_total0
+        self.boundary = boundary
+        self.bc_value = bc_value
+        self._div: Optional[np.ndarray] = None
+        self._work: Optional[np.ndarray] = None
+        self._ghost = None
+
+    def record(self, Sigma_dot: float, S_total: Optional[float] = None) -> None:
+        Sigma_dot = float(Sigma_dot)
+        self._ring[self.n_steps % self.capacity] = Sigma_dot
+        self.n_steps += 1
+        # Kahan-compensated running integral
+        y = Sigma_dot * self.dt - self._comp
+        t = self.integral + y
+        self._comp = (t - self.integral) - y
+        self.integral = t
+        self.min = min(self.min, Sigma_dot)
+        self.max = max(self.max, Sigma_dot)
+        if S_total is not None:
+            if self.S_total0 is None:
+                # first observation after one step: back out the initial total
+                self.S_total0 = float(S_total) - self.integral
+            self.S_total = float(S_total)
+
+    def __call__(self, step: int, Phi: np.ndarray, V: np.ndarray, S: np.ndarray) -> None:
+        if self._div is None or self._div.shape != V.shape[:-1]:
+            self._div = np.empty(V.shape[:-1], dtype=np.result_type(V, float))
+            self._work = np.empty_like(self._div)
+            self._ghost = None
+            if self.boundary != 'periodic' or V.ndim != 3:
+                from core.boundary_conditions import GhostField
+                self._ghost = GhostField(V.shape, bc=self.boundary, value=self.bc_value, ndim=V.ndim - 1,
+                                         dtype=self._div.dtype)
+        div = divergence(Phi, V, out=self._div, work=self._work, boundary=self.boundary,
+                         bc_value=self.bc_value, ghost=self._ghost)
+        self.record(div.sum(), S.sum())
+
+    def history(self) -> np.ndarray:
+        """The last min(n_steps, capacity) Σ̇ values, oldest first."""
+        n = min(self.n_steps, self.capacity)
+        start = (self.n_steps - n) % self.capacity
+        return np.roll(self._ring, -start)[:n] if n == self.capacity else self._ring[:n].copy()
+
+    @property
+    def conservation_error(self) -> Optional[float]:
+        if self.S_total is None:
+            return None
+        return (self.S_total - self.S_total0) - self.integral
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        n = self.n_steps
+        return {
+            'n_steps': n,
+            'Sigma_dot_integral': self.integral,
+            'Sigma_dot_mean': self.integral / (n * self.dt) if n else 0.0,
+            'Sigma_dot_min': self.min if n else None,
+            'Sigma_dot_max': self.max if n else None,
+            'S_total': self.S_total,
+            'conservation_error': self.conservation_error,
+        }
+
 
+def run_entropy_balance(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, n_steps: int = 100,
+                        ledger: Optional[EntropyLedger] = None, boundary='periodic',
+                        bc_value=0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Integrate the toy entropy update S += dt * div(V) for n_steps.
 
-def run_entropy_balance(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, n_steps: int = 100) -> Tuple[np.ndarray, np.ndarray]:
-    Sigma_dot_history = []
+    Phi and V are fixed during the loop, so div(V) and Σ̇ are computed once; only
+    the S update is repeated. Pass a `ledger` to accumulate the run into it.
+    `boundary` / `bc_value` set the boundary condition of div(V).
+    """
     S_curr = S.copy()
+    div_PhiV = divergence(Phi, V, boundary=boundary, bc_value=bc_value)
+    Sigma_dot = np.sum(div_PhiV)  # total entropy production rate
+    increment = dt * div_PhiV
     for _ in range(n_steps):
-        div_PhiV = divergence(Phi, V)
-        Sigma_dot = np.sum(div_PhiV)  # total entropy production rate
-        Sigma_dot_history.append(Sigma_dot)
         # simple update for S (toy placeholder)
-        S_curr += dt * div_PhiV
-    return np.array(Sigma_dot_history), S_curr
+        S_curr += increment
+        if ledger is not None:
+            ledger.record(Sigma_dot, S_curr.sum())
+    return np.full(n_steps, Sigma_dot), S_curr
 
 
 # Demo harness
@@ -52,4 +199,7 @@ if __name__ == '__main__':
     Sigma_dot_history, S_final = run_entropy_balance(Phi, V, S, dt=0.01, n_steps=50)
     print('Sigma_dot_history min/max:', Sigma_dot_history.min(), Sigma_dot_history.max())
     print('S_final min/max:', S_final.min(), S_final.max())
+    ledger = EntropyLedger(dt=0.01, capacity=32, S0=S)
+    run_entropy_balance(Phi, V, S, dt=0.01, n_steps=50, ledger=ledger)
+    print('ledger summary:', ledger.summary())
 
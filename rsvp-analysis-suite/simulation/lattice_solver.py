@@ -2,7 +2,10 @@
 lattice_solver.py
 
 Finite-difference 2D/3D lattice solver for RSVP fields (Phi, V, S).
-Supports optional GPU acceleration via Numba/CuPy.
+Supports pluggable array backends: NumPy (reference), a Numba njit(parallel=True)
+CPU kernel, and CuPy. The backend is chosen from `config.Config.backend` (or the
+`backend` argument) through `utils.gpu_utils.resolve_backend`, and state stays
+resident on that backend for the whole run.
 
 Purpose:
 - Evolve fields according to discrete PDEs
@@ -12,7 +15,13 @@ Inputs:
 - Phi, V, S arrays (numpy)
 - dt: time step
 - n_steps: number of iterations
-- use_gpu: boolean flag for GPU acceleration
+- use_gpu: boolean flag for GPU acceleration (upgrades to the detected GPU backend)
+- backend: optional 'numpy' | 'numba' | 'cupy' override of the configured backend
+- n_workers / tiles: optional shared-memory domain decomposition across processes
+- callback: optional per-step hook callback(step, Phi, V, S), e.g. an
+  entropy_balance.EntropyLedger
+- boundary / bc_value: boundary condition (see core.boundary_conditions); anything
+  other than periodic on a 2D lattice runs on persistent ghost-cell buffers
 
 Outputs:
 - Updated Phi, V, S arrays
@@ -22,7 +31,7 @@ Testing Focus:
 - Stability under different dt and n_steps
 """
 from __future__ import annotations
-from typing import Tuple
+from typing import Callable, Tuple, Optional
 import numpy as np
 
 try:
@@ -38,28 +47,118 @@ except ImportError:
     NUMBA_AVAILABLE = False
 
 
-def finite_diff_step(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Basic finite-difference step for 2D fields (CPU)."""
-    Phi_new = Phi + dt * (np.roll(Phi, 1, axis=0) + np.roll(Phi, -1, axis=0) +
-                          np.roll(Phi, 1, axis=1) + np.roll(Phi, -1, axis=1) - 4*Phi)
-    V_new = V + dt * (np.roll(V, 1, axis=0) + np.roll(V, -1, axis=0) +
-                      np.roll(V, 1, axis=1) + np.roll(V, -1, axis=1) - 4*V)
-    S_new = S + dt * (np.roll(S, 1, axis=0) + np.roll(S, -1, axis=0) +
-                      np.roll(S, 1, axis=1) + np.roll(S, -1, axis=1) - 4*S)
+def finite_diff_step(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, xp=np,
+                     boundary='periodic', bc_value=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Basic finite-difference step for 2D fields.
+
+    xp is the array module the fields live in (numpy or cupy), so the step runs
+    on the device without host round-trips. Other boundaries, and 3D lattices
+    (Phi.ndim == 3), use the ghost-cell stencil of core.boundary_conditions.
+    """
+    if boundary != 'periodic' or Phi.ndim != 2:
+        from core.boundary_conditions import diffuse
+        return tuple(diffuse(f, dt, bc=boundary, value=bc_value, ndim=Phi.ndim, xp=xp) for f in (Phi, V, S))
+    Phi_new = Phi + dt * (xp.roll(Phi, 1, axis=0) + xp.roll(Phi, -1, axis=0) +
+                          xp.roll(Phi, 1, axis=1) + xp.roll(Phi, -1, axis=1) - 4*Phi)
+    V_new = V + dt * (xp.roll(V, 1, axis=0) + xp.roll(V, -1, axis=0) +
+                      xp.roll(V, 1, axis=1) + xp.roll(V, -1, axis=1) - 4*V)
+    S_new = S + dt * (xp.roll(S, 1, axis=0) + xp.roll(S, -1, axis=0) +
+                      xp.roll(S, 1, axis=1) + xp.roll(S, -1, axis=1) - 4*S)
     return Phi_new, V_new, S_new
 
 
-def run_lattice_solver(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, n_steps: int = 100, use_gpu: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    if use_gpu and GPU_AVAILABLE:
-        Phi_gpu, V_gpu, S_gpu = cp.asarray(Phi), cp.asarray(V), cp.asarray(S)
-        for _ in range(n_steps):
-            Phi_gpu, V_gpu, S_gpu = finite_diff_step(cp.asnumpy(Phi_gpu), cp.asnumpy(V_gpu), cp.asnumpy(S_gpu), dt=dt)
-        return cp.asnumpy(Phi_gpu), cp.asnumpy(V_gpu), cp.asnumpy(S_gpu)
-    else:
-        Phi_curr, V_curr, S_curr = Phi.copy(), V.copy(), S.copy()
-        for _ in range(n_steps):
-            Phi_curr, V_curr, S_curr = finite_diff_step(Phi_curr, V_curr, S_curr, dt=dt)
-        return Phi_curr, V_curr, S_curr
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _numba_stencil(u, out, coef):
+        """Periodic 5-point update of a (nx, ny, nc) array into `out`, rows in parallel."""
+        nx, ny, nc = u.shape
+        for i in prange(nx):
+            im = i - 1 if i > 0 else nx - 1
+            ip = i + 1 if i < nx - 1 else 0
+            for j in range(ny):
+                jm = j - 1 if j > 0 else ny - 1
+                jp = j + 1 if j < ny - 1 else 0
+                for c in range(nc):
+                    uc = u[i, j, c]
+                    out[i, j, c] = uc + coef * (u[im, j, c] + u[ip, j, c] +
+                                                u[i, jm, c] + u[i, jp, c] - 4*uc)
+
+
+def _run_numba(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float, n_steps: int,
+               callback: Optional[Callable] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Numba path: one persistent double buffer per field, swapped every step."""
+    cur, nxt = [], []
+    for f in (Phi, V, S):
+        c = np.array(f, dtype=np.result_type(f, float), order='C')
+        cur.append(c)
+        nxt.append(np.empty_like(c))
+    # view 2D scalars as (nx, ny, 1) so a single kernel covers Phi, V and S
+    as3 = lambda a: a.reshape(a.shape[0], a.shape[1], -1)
+    for step in range(n_steps):
+        for i in range(3):
+            _numba_stencil(as3(cur[i]), as3(nxt[i]), dt)
+            cur[i], nxt[i] = nxt[i], cur[i]
+        if callback is not None:
+            callback(step + 1, *cur)
+    return cur[0], cur[1], cur[2]
+
+
+def run_lattice_solver(Phi: np.ndarray, V: np.ndarray, S: np.ndarray, dt: float = 0.01, n_steps: int = 100, use_gpu: bool = False,
+                       n_workers: int = 1, tiles: Optional[Tuple[int, int]] = None,
+                       backend: Optional[str] = None, callback: Optional[Callable] = None,
+                       boundary='periodic', bc_value=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Evolve (Phi, V, S) for n_steps.
+
+    n_workers > 1 splits the lattice into row blocks (or a tiles=(pr, pc) grid) advanced
+    in lockstep by a process pool over shared memory; results are bit-identical to the
+    serial path.
+
+    Otherwise the array backend is resolved from `backend` (default: the configured
+    `Config.backend`); use_gpu=True upgrades to the detected GPU backend when present.
+    Fields are moved to the backend once, evolved there, and copied back at the end.
+
+    callback(step, Phi, V, S) is invoked after every step with the backend's arrays;
+    it is not available with n_workers > 1.
+
+    boundary selects the boundary condition ('periodic', 'reflective', 'open',
+    'dirichlet', 'neumann' or one per axis; bc_value is the Dirichlet value or Neumann
+    gradient). Periodic 2D lattices keep the kernels above; otherwise each field is
+    held in a GhostField and updated in place (the callback then sees the live
+    interior views). The numba and decomposed paths are periodic 2D only.
+    """
+    ghosted = boundary != 'periodic' or Phi.ndim != 2
+    if n_workers > 1 and not use_gpu:
+        if ghosted:
+            raise ValueError('n_workers > 1 supports only periodic 2D lattices')
+        if callback is not None:
+            raise ValueError('callback is not supported with n_workers > 1')
+        from utils.domain_decomposition import run_decomposed
+        return run_decomposed((Phi, V, S), coef=dt, n_steps=n_steps, n_workers=n_workers, tiles=tiles)
+
+    from utils.gpu_utils import resolve_backend, get_array_module, to_host
+    name = resolve_backend(backend, prefer_gpu=use_gpu)
+    if name == 'numba':
+        if ghosted:
+            raise ValueError("the numba backend supports only periodic 2D lattices")
+        return _run_numba(Phi, V, S, dt, n_steps, callback)
+
+    xp = get_array_module(name)
+    if ghosted:
+        from core.boundary_conditions import GhostField
+        grids = [GhostField.from_array(f, bc=boundary, value=bc_value, ndim=Phi.ndim, xp=xp) for f in (Phi, V, S)]
+        for step in range(n_steps):
+            for g in grids:
+                g.diffuse(dt)
+            if callback is not None:
+                callback(step + 1, *(g.interior for g in grids))
+        return tuple(to_host(xp.ascontiguousarray(g.interior)) for g in grids)
+
+    Phi_curr, V_curr, S_curr = xp.array(Phi), xp.array(V), xp.array(S)
+    for step in range(n_steps):
+        Phi_curr, V_curr, S_curr = finite_diff_step(Phi_curr, V_curr, S_curr, dt=dt, xp=xp)
+        if callback is not None:
+            callback(step + 1, Phi_curr, V_curr, S_curr)
+    return to_host(Phi_curr), to_host(V_curr), to_host(S_curr)
 
 
 # Demo harness
@@ -7,57 +7,224 @@ Produces JSONL summaries for analysis.
 Purpose:
 - Automate parameter scans for stability, phase transitions, and scaling studies.
 - Save structured output for downstream analysis.
+- Run sweep tasks in a process pool with deterministic per-task seeds, append each
+  result atomically, and resume an interrupted sweep by skipping finished tasks.
 
 Inputs:
 - dt_values: list of timesteps
 - lambda_values: list of lambda parameters
 - lattice_sizes: list of lattice dimensions
 - solver_fn: callable to run simulation (e.g., lattice_solver.run_lattice_solver)
+- n_workers: number of worker processes (1 runs in-process)
+- resume: skip tasks whose task_id is already present in the output file
 
 Outputs:
-- JSONL file summarizing parameters and key metrics (min/max Phi, S, Sigma_dot)
+- JSONL file summarizing parameters and key metrics (min/max Phi, S, Sigma_dot);
+  every record carries its task_id and seed
+- Progress reports with throughput and ETA
 
 Testing Focus:
 - Correct sweep loops
 - Reproducible results with seeds
+- Restart skips completed tasks and repairs a truncated final line
 """
 from __future__ import annotations
-from typing import List, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import multiprocessing as mp
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+import hashlib
+import itertools
 import numpy as np
 import json
 import os
+import time
 
 
-def run_parameter_sweep(dt_values: List[float], lambda_values: List[float], lattice_sizes: List[int], solver_fn: Callable, output_path: str = 'parameter_sweep.jsonl') -> None:
+Task = Dict[str, Any]
+
+
+# ----------------------------- Task expansion -----------------------------
+
+def task_seed(task_id: str, base_seed: int = 0) -> int:
+    """Deterministic 32-bit seed for a task, stable across processes and restarts."""
+    digest = int.from_bytes(hashlib.sha256(task_id.encode()).digest()[:8], 'little')
+    return int(np.random.SeedSequence([base_seed, digest]).generate_state(1)[0])
+
+
+def expand_grid(base_seed: int = 0, **axes: Iterable[Any]) -> List[Task]:
+    """Cartesian product of named parameter axes -> list of task dicts.
+
+    Each task is {'task_id': ..., 'seed': ..., 'params': {...}}; the task_id is the
+    sorted JSON of the parameters, so it identifies the task across restarts.
+    """
+    names = list(axes)
+    tasks = []
+    for values in itertools.product(*(list(axes[n]) for n in names)):
+        params = {n: (v.item() if isinstance(v, np.generic) else v) for n, v in zip(names, values)}
+        task_id = json.dumps(params, sort_keys=True)
+        tasks.append({'task_id': task_id, 'seed': task_seed(task_id, base_seed), 'params': params})
+    return tasks
+
+
+def expand_sweep_tasks(dt_values: List[float], lambda_values: List[float], lattice_sizes: List[int],
+                       base_seed: int = 0) -> List[Task]:
+    """The dt x lambda x L grid used by run_parameter_sweep."""
+    return expand_grid(base_seed, dt=dt_values, **{'lambda': lambda_values}, lattice_size=lattice_sizes)
+
+
+# ----------------------------- Output bookkeeping -----------------------------
+
+def load_completed(output_path: str) -> Set[str]:
+    """Return task_ids already recorded in a JSONL output.
+
+    A partially written final line (e.g. from a killed run) is truncated away so
+    subsequent appends start on a fresh line.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            data = data[:data.rfind(b'\n') + 1]
+            f.truncate(len(data))
+    done = set()
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and 'task_id' in record:
+            done.add(record['task_id'])
+    return done
+
+
+def append_record(fd: int, record: Dict[str, Any]) -> None:
+    """Append one JSON line with a single write on an O_APPEND descriptor, then fsync."""
+    os.write(fd, (json.dumps(record) + '\n').encode())
+    os.fsync(fd)
+
+
+def report_progress(info: Dict[str, float]) -> None:
+    print(f"[sweep] {info['done']}/{info['total']} tasks  "
+          f"{info['tasks_per_sec']:.2f} tasks/s  ETA {info['eta_sec']:.0f}s")
+
+
+def _run_task(task_fn: Callable[[Task], Dict[str, Any]], task: Task) -> Dict[str, Any]:
+    record = {'task_id': task['task_id'], 'seed': task['seed']}
+    record.update(task['params'])
+    record.update(task_fn(task))
+    return record
+
+
+# ----------------------------- Executor -----------------------------
+
+def run_sweep_executor(tasks: List[Task], task_fn: Callable[[Task], Dict[str, Any]], output_path: str,
+                       n_workers: int = 1, resume: bool = True,
+                       progress: Optional[Callable[[Dict[str, float]], None]] = report_progress,
+                       start_method: str = 'spawn') -> Dict[str, float]:
+    """Run `task_fn` over `tasks` and append one JSONL record per finished task.
+
+    task_fn(task) returns a metrics dict; it must be picklable (module-level function
+    or functools.partial of one) when n_workers > 1. With resume=True tasks already in
+    output_path are skipped; with resume=False the file is truncated first. Only the
+    parent process writes, one whole line per os.write, so an interrupted run leaves
+    at most one truncated line, which `load_completed` repairs on restart.
+
+    Workers are started with `start_method` ('spawn' by default, for the reason given
+    in utils.domain_decomposition).
+
+    A failing task does not discard the others: every task that finishes is still
+    recorded, and the first error is re-raised once the sweep has drained, so a
+    restart only reruns the failed tasks.
+
+    Returns a summary with total / skipped / done counts, elapsed time and throughput.
+    """
     os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    with open(output_path, 'w') as f:
-        for dt in dt_values:
-            for lam in lambda_values:
-                for L in lattice_sizes:
-                    # Initialize fields
-                    Phi = np.random.randn(L,L)
-                    V = np.random.randn(L,L,2)
-                    S = np.random.randn(L,L)
-                    # Run solver
-                    Phi_new, V_new, S_new = solver_fn(Phi, V, S, dt=dt, n_steps=50)
-                    # Compute summary metrics
-                    summary = {
-                        'dt': dt,
-                        'lambda': lam,
-                        'lattice_size': L,
-                        'Phi_min': float(Phi_new.min()),
-                        'Phi_max': float(Phi_new.max()),
-                        'S_min': float(S_new.min()),
-                        'S_max': float(S_new.max())
-                    }
-                    f.write(json.dumps(summary) + '\n')
+    done_ids = load_completed(output_path) if resume else set()
+    pending = [t for t in tasks if t['task_id'] not in done_ids]
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | (0 if resume else os.O_TRUNC)
+    fd = os.open(output_path, flags, 0o644)
+
+    t0 = time.perf_counter()
+    n_done = 0
+
+    def _record(record: Dict[str, Any]) -> None:
+        nonlocal n_done
+        append_record(fd, record)
+        n_done += 1
+        if progress is not None:
+            elapsed = time.perf_counter() - t0
+            rate = n_done / elapsed if elapsed > 0 else float('inf')
+            progress({'done': n_done, 'total': len(pending), 'elapsed_sec': elapsed,
+                      'tasks_per_sec': rate, 'eta_sec': (len(pending) - n_done) / rate if rate > 0 else 0.0})
+
+    error: Optional[BaseException] = None
+    try:
+        if n_workers <= 1:
+            for task in pending:
+                try:
+                    record = _run_task(task_fn, task)
+                except Exception as exc:
+                    error = error or exc
+                    continue
+                _record(record)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context(start_method)) as pool:
+                futures = [pool.submit(_run_task, task_fn, task) for task in pending]
+                for fut in as_completed(futures):
+                    if fut.exception() is not None:
+                        error = error or fut.exception()
+                        continue
+                    _record(fut.result())
+    finally:
+        os.close(fd)
+    if error is not None:
+        raise error
+
+    elapsed = time.perf_counter() - t0
+    return {'total': len(tasks), 'skipped': len(tasks) - len(pending), 'done': n_done,
+            'elapsed_sec': elapsed, 'tasks_per_sec': n_done / elapsed if elapsed > 0 else 0.0}
+
+
+# ----------------------------- Lattice sweep -----------------------------
+
+def lattice_sweep_task(task: Task, solver_fn: Callable, n_steps: int = 50) -> Dict[str, float]:
+    """Initialize seeded random fields, run solver_fn and summarize min/max of Phi and S."""
+    p = task['params']
+    L = p['lattice_size']
+    rng = np.random.default_rng(task['seed'])
+    Phi = rng.standard_normal((L,L))
+    V = rng.standard_normal((L,L,2))
+    S = rng.standard_normal((L,L))
+    Phi_new, V_new, S_new = solver_fn(Phi, V, S, dt=p['dt'], n_steps=n_steps)
+    return {
+        'Phi_min': float(Phi_new.min()),
+        'Phi_max': float(Phi_new.max()),
+        'S_min': float(S_new.min()),
+        'S_max': float(S_new.max())
+    }
+
+
+def run_parameter_sweep(dt_values: List[float], lambda_values: List[float], lattice_sizes: List[int], solver_fn: Callable,
+                        output_path: str = 'parameter_sweep.jsonl', n_workers: int = 1, resume: bool = True,
+                        base_seed: int = 0, progress: Optional[Callable] = report_progress) -> Dict[str, float]:
+    """Sweep dt x lambda x lattice size through `run_sweep_executor`.
+
+    solver_fn must be picklable when n_workers > 1.
+    """
+    tasks = expand_sweep_tasks(dt_values, lambda_values, lattice_sizes, base_seed=base_seed)
+    return run_sweep_executor(tasks, partial(lattice_sweep_task, solver_fn=solver_fn), output_path,
+                              n_workers=n_workers, resume=resume, progress=progress)
+
+
+def _identity_solver(Phi, V, S, dt, n_steps):
+    return Phi, V, S
 
 
 # Demo harness
 if __name__ == '__main__':
     print('parameter_sweeps demo')
-    run_parameter_sweep(dt_values=[0.01,0.02], lambda_values=[0.5,1.0], lattice_sizes=[8,16],
-                        solver_fn=lambda Phi,V,S,dt,n_steps: (Phi,V,S),
-                        output_path='demo_sweep.jsonl')
-    print('Demo sweep written to demo_sweep.jsonl')
-
+    summary = run_parameter_sweep(dt_values=[0.01,0.02], lambda_values=[0.5,1.0], lattice_sizes=[8,16],
+                                  solver_fn=_identity_solver, output_path='demo_sweep.jsonl', n_workers=2)
+    print('Demo sweep written to demo_sweep.jsonl:', summary)
@@ -6,13 +6,18 @@ Computes spatiotemporal coherence of RSVP fields (Phi, V, S).
 Purpose:
 - Measure correlations like <Phi Phi'>, <S Phi> across lattice or time.
 - Useful for detecting coherent patterns or phase transitions.
+- Temporal coherence is computed from frames standardized once, as a single matrix
+  product, with a lag-diagonal summary available directly (direct or FFT) or in a
+  streaming form that keeps only a bounded lag window.
 
 Inputs:
 - Phi, S arrays
 - time_series: optional 3D arrays (t,x,y) for temporal coherence
+- max_lag: lag window for lagged coherence / streaming mode
 
 Outputs:
 - Coherence matrices
+- Lagged coherence C(k) = mean_t corr(Phi_t, S_{t+k}) for k in [-max_lag, max_lag]
 - Optional scalar summary metrics
 
 Testing Focus:
@@ -24,6 +29,18 @@ from typing import Optional
 import numpy as np
 
 
+def standardize_frames(time_series: np.ndarray) -> np.ndarray:
+    """Return (T, M) z-scored frames: each frame flattened, centred and scaled to unit std.
+
+    Frames with zero variance become NaN, matching np.corrcoef.
+    """
+    X = np.asarray(time_series, dtype=float).reshape(time_series.shape[0], -1)
+    mu = X.mean(axis=1, keepdims=True)
+    sd = X.std(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (X - mu) / sd
+
+
 def spatial_coherence(Phi: np.ndarray, S: np.ndarray) -> float:
     """Compute simple spatial correlation between Phi and S."""
     Phi_flat = Phi.ravel()
@@ -32,15 +49,85 @@ def spatial_coherence(Phi: np.ndarray, S: np.ndarray) -> float:
 
 
 def temporal_coherence(time_series_Phi: Optional[np.ndarray] = None, time_series_S: Optional[np.ndarray] = None) -> np.ndarray:
-    """Compute temporal correlation matrix over time for Phi and S."""
+    """Compute temporal correlation matrix over time for Phi and S.
+
+    Entry [i, j] is corr(Phi_i, S_j). Every frame is standardized once and the full
+    matrix is a single (T, M) @ (M, T) product.
+    """
     if time_series_Phi is None or time_series_S is None:
         raise ValueError('Time series data required for temporal coherence.')
-    t_steps = time_series_Phi.shape[0]
-    corr_matrix = np.zeros((t_steps, t_steps))
-    for i in range(t_steps):
-        for j in range(t_steps):
-            corr_matrix[i,j] = np.corrcoef(time_series_Phi[i].ravel(), time_series_S[j].ravel())[0,1]
-    return corr_matrix
+    Zp = standardize_frames(time_series_Phi)
+    Zs = standardize_frames(time_series_S)
+    return (Zp @ Zs.T) / Zp.shape[1]
+
+
+def lagged_coherence(time_series_Phi: np.ndarray, time_series_S: np.ndarray, max_lag: Optional[int] = None,
+                     method: str = 'direct') -> np.ndarray:
+    """Mean lagged coherence C(k) = mean_t corr(Phi_t, S_{t+k}) for k = -max_lag..max_lag.
+
+    This is the mean of the k-th diagonal of `temporal_coherence`, computed without
+    forming the T x T matrix:
+      - 'direct': one dot product per lag, O(max_lag * T * M)
+      - 'fft': zero-padded FFT cross-correlation along time, O(M * T log T), for long series
+    """
+    Zp = standardize_frames(time_series_Phi)
+    Zs = standardize_frames(time_series_S)
+    T, M = Zp.shape
+    max_lag = T - 1 if max_lag is None else min(max_lag, T - 1)
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    if method == 'direct':
+        sums = np.array([np.sum(Zp[:T - k] * Zs[k:]) if k >= 0 else np.sum(Zp[-k:] * Zs[:T + k]) for k in lags])
+    elif method == 'fft':
+        n = 1 << int(np.ceil(np.log2(2 * T - 1)))
+        spec = np.sum(np.conj(np.fft.rfft(Zp, n=n, axis=0)) * np.fft.rfft(Zs, n=n, axis=0), axis=1)
+        xc = np.fft.irfft(spec, n=n)
+        # xc[k] = sum_t Zp[t] . Zs[t + k]; negative lags wrap to the end
+        sums = xc[lags % n]
+    else:
+        raise ValueError(f'Unknown lagged coherence method: {method}')
+    return sums / (M * (T - np.abs(lags)))
+
+
+class StreamingCoherence:
+    """Lagged Phi-S coherence accumulated frame by frame with a bounded lag window.
+
+    Keeps the last max_lag + 1 standardized frames of each field in ring buffers,
+    so memory is O(max_lag * M) regardless of run length. `result()` returns the
+    same C(k), k = -max_lag..max_lag, as `lagged_coherence`.
+    """
+
+    def __init__(self, frame_shape, max_lag: int = 10):
+        M = int(np.prod(frame_shape))
+        self.max_lag = max_lag
+        self._phi = np.zeros((max_lag + 1, M))
+        self._s = np.zeros((max_lag + 1, M))
+        self._sums = np.zeros(2 * max_lag + 1)
+        self._counts = np.zeros(2 * max_lag + 1)
+        self._M = M
+        self._t = 0
+
+    def update(self, Phi_frame: np.ndarray, S_frame: np.ndarray) -> None:
+        zp = standardize_frames(np.asarray(Phi_frame)[np.newaxis])[0]
+        zs = standardize_frames(np.asarray(S_frame)[np.newaxis])[0]
+        W = self.max_lag + 1
+        slot = self._t % W
+        self._phi[slot] = zp
+        self._s[slot] = zs
+        L = self.max_lag
+        for k in range(min(self._t, L) + 1):
+            prev = (self._t - k) % W
+            # lag +k: Phi_{t-k} with S_t ; lag -k: Phi_t with S_{t-k}
+            self._sums[L + k] += self._phi[prev] @ zs
+            self._counts[L + k] += 1
+            if k > 0:
+                self._sums[L - k] += zp @ self._s[prev]
+                self._counts[L - k] += 1
+        self._t += 1
+
+    def result(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._sums / (self._M * self._counts)
 
 
 # Demo harness
@@ -57,4 +144,9 @@ if __name__ == '__main__':
     time_series_S = np.random.randn(t_steps, *shape)
     temp_corr_matrix = temporal_coherence(time_series_Phi, time_series_S)
     print('Temporal coherence matrix shape:', temp_corr_matrix.shape)
+    print('Lagged coherence (fft):', lagged_coherence(time_series_Phi, time_series_S, max_lag=2, method='fft'))
+    stream = StreamingCoherence(shape, max_lag=2)
+    for p_frame, s_frame in zip(time_series_Phi, time_series_S):
+        stream.update(p_frame, s_frame)
+    print('Lagged coherence (streaming):', stream.result())
 
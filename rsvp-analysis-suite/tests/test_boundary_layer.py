@@ -0,0 +1,116 @@
+"""
+Test Boundary Layer
+
+Checks the ghost-cell boundary layer and its use by the lattice, Lamphron, stochastic and entropy solvers.
+"""
+
+import numpy as np
+from core.boundary_conditions import GhostField, apply_boundary, fill_ghosts
+from core.lamphron_solver import run_lamphron
+from simulation.lattice_solver import run_lattice_solver, finite_diff_step
+from simulation.entropy_balance import divergence, EntropyLedger
+from simulation.stochastic_dynamics import run_stochastic_ensemble
+from simulation.parameter_sweeps import expand_grid
+from experiments.run_entropy_stress import entropy_stress_task
+
+
+def _fields(shape=(12, 9), seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random(shape), rng.random(shape + (len(shape),)), rng.random(shape)
+
+
+def test_periodic_ghosts_match_roll_stencils():
+    Phi, V, S = _fields()
+    g = GhostField.from_array(V, ndim=2)
+    ref = V + 0.1 * (np.roll(V, 1, axis=0) + np.roll(V, -1, axis=0) +
+                     np.roll(V, 1, axis=1) + np.roll(V, -1, axis=1) - 4*V)
+    assert np.array_equal(g.diffuse(0.1), ref)
+    assert np.array_equal(divergence(Phi, V, boundary=('periodic', 'periodic')), divergence(Phi, V))
+    (a, _, _), _ = run_stochastic_ensemble(Phi, V, S, n_members=3, n_steps=5, seed=1,
+                                           boundary=('periodic', 'periodic'))
+    (b, _, _), _ = run_stochastic_ensemble(Phi, V, S, n_members=3, n_steps=5, seed=1)
+    assert np.array_equal(a, b)
+
+
+def test_ghost_values_per_boundary():
+    u = np.arange(1.0, 13.0).reshape(3, 4)
+    for bc, value in (('reflective', 0.0), ('neumann', 0.5), ('dirichlet', 2.0), ('open', 0.0)):
+        g = GhostField.from_array(u, bc=bc, value=value)
+        P = g.fill()
+        assert np.array_equal(g.interior, u)
+        if bc == 'dirichlet':
+            assert np.allclose((P[0, 1:-1] + P[1, 1:-1]) / 2, value)
+            assert np.allclose((P[1:-1, -1] + P[1:-1, -2]) / 2, value)
+        elif bc == 'open':
+            assert not P[0].any() and not P[:, -1].any()
+        else:
+            assert np.allclose(P[0, 1:-1] - P[1, 1:-1], value)
+            assert np.allclose(P[1:-1, -1] - P[1:-1, -2], value)
+    # one boundary per axis: axis 0 wraps, axis 1 is zero-padded
+    P = fill_ghosts(np.pad(u, 1), ('periodic', 'open'))
+    assert np.array_equal(P[0, 1:-1], u[-1]) and np.array_equal(P[-1, 1:-1], u[0])
+    assert not P[:, 0].any() and not P[:, -1].any()
+    # the legacy edge rewrite is the ghost fill of a field whose outer ring is ghosts
+    f = np.random.default_rng(1).random((8, 8))
+    old = f.copy()
+    old[0, :], old[-1, :] = old[1, :], old[-2, :]
+    old[:, 0], old[:, -1] = old[:, 1], old[:, -2]
+    assert np.array_equal(apply_boundary(f, 'reflective'), old)
+    assert apply_boundary(f, 'open', inplace=True) is f and not f[0].any()
+    # a (nx, ny, 2) vector field: only the two lattice axes get edges, as before
+    V = np.random.default_rng(2).random((6, 5, 2))
+    for bc in ('reflective', 'periodic', 'open'):
+        old = V.copy()
+        if bc == 'reflective':
+            old[0, :], old[-1, :] = old[1, :], old[-2, :]
+            old[:, 0], old[:, -1] = old[:, 1], old[:, -2]
+        elif bc == 'periodic':
+            old[0, :], old[-1, :] = old[-2, :], old[1, :]
+            old[:, 0], old[:, -1] = old[:, -2], old[:, 1]
+        else:
+            old[0, :] = old[-1, :] = old[:, 0] = old[:, -1] = 0
+        assert np.array_equal(apply_boundary(V, bc), old)
+    f3 = apply_boundary(np.ones((4, 4, 4)), 'open', ndim=3)
+    assert f3.sum() == 8 and not f3[:, :, 0].any()
+
+
+def test_zero_flux_boundaries_conserve_mass_in_2d_and_3d():
+    Phi, V, S = _fields()
+    for bc in ('reflective', 'neumann'):
+        P, W, T = run_lattice_solver(Phi, V, S, dt=0.1, n_steps=40, boundary=bc)
+        assert np.isclose(T.sum(), S.sum()) and np.allclose(W.sum(axis=(0, 1)), V.sum(axis=(0, 1)))
+    step = finite_diff_step(Phi, V, S, dt=0.1, boundary='open')
+    assert step[2].sum() < S.sum()
+    Phi3, V3, S3 = _fields((6, 7, 5), seed=2)
+    P3, W3, T3 = run_lamphron(Phi3, V3, S3, dt=0.05, n_steps=10, lam=0.5, boundary='reflective')
+    assert W3.shape == V3.shape and np.isclose(P3.sum(), Phi3.sum())
+    assert divergence(Phi3, V3, boundary='neumann').shape == Phi3.shape
+
+
+def test_dirichlet_relaxes_to_boundary_value():
+    Phi, V, S = _fields((8, 8))
+    _, _, T = run_lattice_solver(Phi, V, S, dt=0.2, n_steps=600, boundary='dirichlet', bc_value=1.5)
+    assert np.allclose(T, 1.5, atol=1e-3)
+
+
+def test_ledger_and_stress_modes_see_the_boundary():
+    Phi, V, S = _fields()
+    ledger = EntropyLedger(dt=0.01, boundary='open')
+    run_lattice_solver(Phi, V, S, dt=0.01, n_steps=3, boundary='open', callback=ledger)
+    P, W, _ = run_lattice_solver(Phi, V, S, dt=0.01, n_steps=3, boundary='open')
+    assert np.isclose(ledger.history()[-1], divergence(P, W, boundary='open').sum())
+    # tasks as the driver builds them, sharing one seed so only the boundary differs
+    tasks = expand_grid(0, **{'lambda': [1.0]}, boundary_mode=['periodic', 'reflective', 'open'])
+    results = [entropy_stress_task(dict(t, seed=0), n_steps=10) for t in tasks]
+    assert len({r['S_max'] for r in results}) == 3
+    lam_tasks = expand_grid(0, **{'lambda': [0.1, 5.0]}, boundary_mode=['open'])
+    assert len({entropy_stress_task(dict(t, seed=0), n_steps=10)['S_max'] for t in lam_tasks}) == 2
+
+
+if __name__ == '__main__':
+    test_periodic_ghosts_match_roll_stencils()
+    test_ghost_values_per_boundary()
+    test_zero_flux_boundaries_conserve_mass_in_2d_and_3d()
+    test_dirichlet_relaxes_to_boundary_value()
+    test_ledger_and_stress_modes_see_the_boundary()
+    print('Boundary layer tests passed.')
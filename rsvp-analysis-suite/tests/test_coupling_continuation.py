@@ -0,0 +1,38 @@
+"""
+Test Coupling Continuation
+
+Checks that continuation_scan brackets a known λ_c to tol with few solver calls.
+"""
+
+import numpy as np
+from core import coupling_scan
+
+LAM_C = 0.73219
+
+
+def _step_solver(Phi, V, S, dt=0.01, n_steps=1, lam=1.0):
+    """Relaxes S towards 0 below LAM_C and towards 1 above it."""
+    target = 1.0 if lam > LAM_C else 0.0
+    return Phi, V, target + (S - target) * 0.5 ** n_steps
+
+
+def test_bisection_reaches_tol():
+    shape = (8, 8)
+    Phi, V, S = np.zeros(shape), np.zeros(shape + (2,)), np.zeros(shape)
+    uniform_calls = int((2.0 - 0.1) / 1e-4)
+    for n_workers in (1, 2):
+        results, lam_c, info = coupling_scan.continuation_scan(
+            Phi, V, S, 0.1, 2.0, n_coarse=8, n_steps=60, tol=1e-4, steady_tol=1e-8,
+            n_workers=n_workers, solver=_step_solver)
+        lo, hi = info['bracket']
+        assert lo <= LAM_C <= hi and hi - lo <= 1e-4
+        assert abs(lam_c - LAM_C) < 1e-4
+        assert info['solver_calls'] < 30 < uniform_calls
+        assert list(results) == sorted(results)
+
+
+def test_no_transition_reports_none():
+    shape = (8, 8)
+    Phi, V, S = np.zeros(shape), np.zeros(shape + (2,)), np.ones(shape)
+    _, lam_c, info = coupling_scan.continuation_scan(Phi, V, S, 0.1, 0.5, n_coarse=4, n_steps=5)
+    assert lam_c is None and info['solver_calls'] == 4
@@ -0,0 +1,63 @@
+"""
+Test Derived Geometry
+
+Checks array-aware form sampling and the numeric sparse-LU nondegeneracy test against the symbolic one.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+sp = pytest.importorskip('sympy')
+from core.derived_geometry import (discretize_form_on_grid, is_nondegenerate, nondegeneracy_report,  # noqa: E402
+                                   shifted_symplectic_form)
+
+
+def _loop(fn, shape):
+    xs, ys = np.linspace(0, 1, shape[0]), np.linspace(0, 1, shape[1])
+    return np.array([[fn(x, y) for y in ys] for x in xs])
+
+
+def test_sampling_paths_agree():
+    shape = (9, 13)
+    scalar = lambda x, y: math.sin(2 * math.pi * x) * math.cos(2 * math.pi * y)
+    ref = _loop(scalar, shape)
+    assert np.allclose(discretize_form_on_grid(scalar, shape), ref)
+    arrays = lambda x, y: np.sin(2 * np.pi * x) * np.cos(2 * np.pi * y)
+    assert np.allclose(discretize_form_on_grid(arrays, shape, vectorized=True), ref)
+    x, y = sp.symbols('x y')
+    assert np.allclose(discretize_form_on_grid(sp.sin(2 * sp.pi * x) * sp.cos(2 * sp.pi * y), shape, symbols=(x, y)), ref)
+    assert np.all(discretize_form_on_grid(lambda x, y: 2.5, shape) == 2.5)
+    with pytest.raises(ValueError):
+        discretize_form_on_grid(scalar, shape, vectorized=True)
+
+
+def test_numeric_matches_symbolic_on_small_forms():
+    x1, x2, p1, p2, a = sp.symbols('x1 x2 p1 p2 a')
+    syms = (x1, x2, p1, p2)
+    for form in (shifted_symplectic_form(syms), a * x1 * p1 + x2 * p2 + x1 ** 2 * p2,
+                 x1 * p1 + x2 * p1, x1 * p1 * p2):
+        assert is_nondegenerate(form, syms, method='numeric') == is_nondegenerate(form, syms, method='symbolic')
+
+
+def test_lattice_sized_pairing():
+    n = 300
+    xs, ps = sp.symbols(f'x0:{n}'), sp.symbols(f'p0:{n}')
+    syms = tuple(xs) + tuple(ps)
+    pairing = shifted_symplectic_form(syms) + sum(xs[k] * xs[(k + 1) % n] * ps[k] for k in range(n))
+    report = nondegeneracy_report(pairing, syms)
+    assert report['method'] == 'numeric' and report['nondegenerate'] and np.isfinite(report['logabsdet'])
+    broken = pairing - xs[7] * ps[7] - xs[7] * xs[8] * ps[7]
+    report = nondegeneracy_report(broken, syms)
+    assert not report['nondegenerate'] and report['rank'] == 2 * n - 1  # only the p7 row vanishes
+    # beyond dense_max the rank comes from the sparse LU of the shifted Hessian
+    sparse = nondegeneracy_report(broken, syms, dense_max=0)
+    assert not sparse['nondegenerate'] and sparse['rank'] == 2 * n - 1 and sparse['logabsdet'] == -np.inf
+
+
+if __name__ == '__main__':
+    test_sampling_paths_agree()
+    test_numeric_matches_symbolic_on_small_forms()
+    test_lattice_sized_pairing()
+    print('Derived geometry tests passed.')
@@ -0,0 +1,60 @@
+"""
+Test Entropy Pyramid
+
+Checks every pyramid level against a from-scratch TileGrid reduction, before and after local updates.
+"""
+
+import numpy as np
+import pytest
+from core.tiling_entropy import (EntropyPyramid, multiscale_tile_entropies, compute_tile_entropies,
+                                 partition_grid_by_tiles)
+
+
+def _reference(S, t):
+    return compute_tile_entropies(S, partition_grid_by_tiles(S.shape, t))
+
+
+def test_levels_match_direct_tilings():
+    S = np.random.default_rng(0).standard_normal((37, 50))
+    S[:4, :4] = 0.0
+    pyramid = EntropyPyramid(S, base_tile=2)
+    assert pyramid.tile_sizes == [2, 4, 8, 16, 32, 64]
+    for t in pyramid.tile_sizes:
+        assert np.allclose(pyramid.entropies(t), _reference(S, t))
+    ents = multiscale_tile_entropies(S, tile_sizes=[4, 16])
+    assert list(ents) == [4, 16] and np.allclose(ents[16], _reference(S, 16))
+    profile = pyramid.scale_profile()
+    assert np.all(np.diff(profile['mean_entropy']) > 0)
+
+
+def test_incremental_update_touches_window_only():
+    rng = np.random.default_rng(1)
+    S = rng.random((64, 48))
+    pyramid = EntropyPyramid(S)
+    for _ in range(20):
+        r, c = rng.integers(0, 60), rng.integers(0, 44)
+        S[r:r + 3, c:c + 5] = rng.random((3, 5))
+        S[r, c] = 0.0
+        pyramid.update(S, (slice(r, r + 3), slice(c, c + 5)))
+    fresh = EntropyPyramid(S)
+    for t in (1, 4, 16, 64):
+        assert np.allclose(pyramid.entropies(t), fresh.entropies(t), atol=1e-12)
+        assert np.allclose(pyramid.entropies(t), _reference(S, t))
+
+
+def test_sweep_past_grid_size_uses_single_tile():
+    S = np.random.default_rng(2).random((64, 64))
+    sizes = [2 << k for k in range(8)]
+    ents = multiscale_tile_entropies(S, tile_sizes=sizes)
+    for t in sizes:
+        assert np.allclose(ents[t], _reference(S, t))
+    assert ents[256].shape == (1,)
+    with pytest.raises(ValueError):
+        EntropyPyramid(S, base_tile=2).entropies(96)
+
+
+if __name__ == '__main__':
+    test_levels_match_direct_tilings()
+    test_incremental_update_touches_window_only()
+    test_sweep_past_grid_size_uses_single_tile()
+    print('Entropy pyramid tests passed.')
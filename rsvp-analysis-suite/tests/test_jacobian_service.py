@@ -0,0 +1,62 @@
+"""
+Test Jacobian Service
+
+Checks complex-step, colored sparse and matrix-free Jacobians on a small lattice problem.
+"""
+
+import numpy as np
+import pytest
+from core.fpc_dynamics import (approx_jacobian, complex_step_jacobian, jvp, find_fixed_point,
+                               stability_at_fixed_point)
+
+pytest.importorskip('scipy')
+from core.fpc_dynamics import stencil_sparsity, color_columns, sparse_fd_jacobian
+
+SHAPE = (10, 12)
+B = np.sin(np.arange(SHAPE[0] * SHAPE[1]) / 7.0)
+
+
+def _residual(u):
+    """Periodic reaction-diffusion residual: lap(u) - u - u^3 + b (complex-safe)."""
+    U = u.reshape(SHAPE)
+    lap = (np.roll(U, 1, 0) + np.roll(U, -1, 0) + np.roll(U, 1, 1) + np.roll(U, -1, 1) - 4 * U)
+    return (lap - U - U**3).ravel() + B
+
+
+def test_complex_step_and_sparse_fd():
+    x = np.random.default_rng(0).standard_normal(B.size)
+    J_fd = approx_jacobian(_residual, x)
+    J_cs = complex_step_jacobian(_residual, x)
+    assert np.allclose(J_cs, J_fd, atol=1e-4)
+    assert np.allclose(np.diag(J_cs), -5 - 3 * x**2, atol=1e-13)
+
+    pattern = stencil_sparsity(SHAPE)
+    colors = color_columns(pattern)
+    assert colors.max() + 1 <= 8
+    J_sp = sparse_fd_jacobian(_residual, x, pattern, colors)
+    assert np.allclose(J_sp.toarray(), J_cs, atol=1e-5)
+
+    v = np.random.default_rng(1).standard_normal(B.size)
+    assert np.allclose(jvp(_residual, x, v), J_cs @ v, atol=1e-5)
+    assert np.allclose(jvp(_residual, x, v, method='complex'), J_cs @ v, atol=1e-12)
+
+
+def test_solvers_and_leading_eigenvalues():
+    x0 = np.zeros(B.size)
+    x_nk, info = find_fixed_point(_residual, x0, method='newton_krylov', tol=1e-10)
+    assert info['success'] and np.linalg.norm(_residual(x_nk)) < 1e-10
+    x_sp, info = find_fixed_point(_residual, x0, sparsity=stencil_sparsity(SHAPE), tol=1e-10)
+    assert info['success'] and np.allclose(x_sp, x_nk, atol=1e-8)
+
+    dense = stability_at_fixed_point(_residual, x_nk, jac='complex')
+    top = np.sort(dense['eigvals'].real)[::-1][:3]
+    for kwargs in ({}, {'sparsity': stencil_sparsity(SHAPE)}):
+        lead = stability_at_fixed_point(_residual, x_nk, k=3, **kwargs)
+        assert np.allclose(lead['eigvals'].real, top, atol=1e-5)
+        assert lead['stable'] and dense['stable']
+
+
+if __name__ == '__main__':
+    test_complex_step_and_sparse_fd()
+    test_solvers_and_leading_eigenvalues()
+    print('Jacobian service tests passed.')
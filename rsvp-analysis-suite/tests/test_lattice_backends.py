@@ -0,0 +1,37 @@
+"""
+Test Lattice Backends
+
+Checks backend resolution and that the Numba kernel reproduces the NumPy lattice update.
+"""
+
+import numpy as np
+import pytest
+from simulation.lattice_solver import run_lattice_solver, NUMBA_AVAILABLE
+from utils.gpu_utils import resolve_backend
+
+
+def test_resolve_backend_aliases():
+    assert resolve_backend('cpu') == 'numpy'
+    assert resolve_backend('numpy') == 'numpy'
+    with pytest.raises(ValueError):
+        resolve_backend('jax')
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason='numba not installed')
+def test_numba_matches_numpy():
+    rng = np.random.default_rng(0)
+    Phi = rng.random((19, 23))
+    V = rng.random((19, 23, 2))
+    S = rng.random((19, 23))
+    ref = run_lattice_solver(Phi, V, S, dt=0.01, n_steps=9, backend='numpy')
+    out = run_lattice_solver(Phi, V, S, dt=0.01, n_steps=9, backend='numba')
+    for a, b in zip(ref, out):
+        assert a.shape == b.shape
+        assert np.allclose(a, b, rtol=0, atol=1e-13)
+
+
+if __name__ == '__main__':
+    test_resolve_backend_aliases()
+    if NUMBA_AVAILABLE:
+        test_numba_matches_numpy()
+    print('Lattice backend tests passed.')
@@ -0,0 +1,57 @@
+"""
+Test Pairwise Divergence
+
+Checks the block-wise KL/JS/Hellinger matrices against the scalar kernels and the time-stacked Fisher field.
+"""
+
+import numpy as np
+from core.semantic_phase import (pairwise_divergence, normalize_pmf_stack, kl_divergence, jensen_shannon,
+                                 fisher_information_field, total_fisher_information)
+
+
+def _snapshots(n=7, shape=(9, 11), seed=0):
+    return np.random.default_rng(seed).random((n,) + shape) ** 3
+
+
+def test_matches_scalar_kernels():
+    P = _snapshots()
+    Q = _snapshots(5, seed=1)
+    kl = pairwise_divergence(P, Q, metric='kl', block_size=3)
+    js = pairwise_divergence(P, metric='js', block_size=3, max_block_mb=0.001)
+    for i in range(len(P)):
+        for j in range(len(Q)):
+            assert np.isclose(kl[i, j], kl_divergence(P[i], Q[j]), rtol=1e-10)
+        for j in range(len(P)):
+            assert np.isclose(js[i, j], jensen_shannon(P[i], P[j]), rtol=1e-8, atol=1e-14)
+    assert np.array_equal(js, js.T) and np.all(np.diag(js) == 0)
+
+    X = normalize_pmf_stack(P)
+    hel = pairwise_divergence(X, metric='hellinger', normalized=True, block_size=2, n_threads=3)
+    ref = np.sqrt(0.5 * ((np.sqrt(X)[:, None] - np.sqrt(X)[None]) ** 2).sum(-1))
+    assert np.allclose(hel, ref, atol=1e-7)
+
+
+def test_float32_and_threads():
+    P = _snapshots(20, (16, 16))
+    ref = pairwise_divergence(P, metric='js')
+    f32 = pairwise_divergence(P.astype(np.float32), metric='js', block_size=4, n_threads=4)
+    assert f32.dtype == np.float32 and np.allclose(f32, ref, atol=1e-5)
+    kl = pairwise_divergence(P, metric='kl', dtype=np.float32, n_threads=2, block_size=6)
+    assert kl.dtype == np.float32 and np.allclose(kl, pairwise_divergence(P, metric='kl'), rtol=1e-3, atol=1e-5)
+
+
+def test_fisher_time_stack():
+    P = _snapshots(4, (12, 10))
+    stacked = fisher_information_field(P, dx=0.5)
+    for t in range(4):
+        assert np.array_equal(stacked[t], fisher_information_field(P[t], dx=0.5))
+    totals = total_fisher_information(P, dx=0.5)
+    assert totals.shape == (4,) and np.isclose(totals[2], total_fisher_information(P[2], dx=0.5))
+    assert fisher_information_field(P.astype(np.float32)).dtype == np.float32
+
+
+if __name__ == '__main__':
+    test_matches_scalar_kernels()
+    test_float32_and_threads()
+    test_fisher_time_stack()
+    print('Pairwise divergence tests passed.')
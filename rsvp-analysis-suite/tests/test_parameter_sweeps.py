@@ -0,0 +1,82 @@
+"""
+Test Parameter Sweeps
+
+Checks deterministic task seeds, resume after interruption and parallel/serial agreement.
+"""
+
+import json
+import os
+import tempfile
+
+from simulation.parameter_sweeps import expand_sweep_tasks, run_parameter_sweep, _identity_solver, expand_grid, run_sweep_executor
+
+
+def _fail_on_two(task):
+    if task['params']['k'] == 2:
+        raise RuntimeError('task failed')
+    return {'k2': task['params']['k'] ** 2}
+
+
+def _records(path):
+    with open(path) as f:
+        return {r['task_id']: r for r in map(json.loads, f)}
+
+
+def test_task_seeds_are_deterministic():
+    a = expand_sweep_tasks([0.01, 0.02], [0.5], [8], base_seed=3)
+    b = expand_sweep_tasks([0.01, 0.02], [0.5], [8], base_seed=3)
+    assert [t['seed'] for t in a] == [t['seed'] for t in b]
+    assert len({t['task_id'] for t in a}) == 2
+    assert a[0]['seed'] != expand_sweep_tasks([0.01], [0.5], [8], base_seed=4)[0]['seed']
+
+
+def test_resume_skips_done_and_repairs_partial_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sweep.jsonl')
+        args = ([0.01, 0.02], [0.5, 1.0], [8], _identity_solver)
+        first = run_parameter_sweep(*args, output_path=path, progress=None)
+        assert first['done'] == 4
+        full = _records(path)
+
+        # simulate a run killed mid-write: drop the last record, leave half a line
+        with open(path) as f:
+            lines = f.readlines()
+        with open(path, 'w') as f:
+            f.writelines(lines[:-1])
+            f.write(lines[-1][:10])
+
+        second = run_parameter_sweep(*args, output_path=path, progress=None)
+        assert second['skipped'] == 3 and second['done'] == 1
+        assert _records(path) == full
+
+
+def test_parallel_matches_serial():
+    with tempfile.TemporaryDirectory() as tmp:
+        args = ([0.01], [0.5, 1.0], [8, 12], _identity_solver)
+        serial = os.path.join(tmp, 'serial.jsonl')
+        parallel = os.path.join(tmp, 'parallel.jsonl')
+        run_parameter_sweep(*args, output_path=serial, progress=None)
+        run_parameter_sweep(*args, output_path=parallel, n_workers=2, progress=None)
+        assert _records(serial) == _records(parallel)
+
+
+def test_failed_task_keeps_other_results():
+    tasks = expand_grid(0, k=[0, 1, 2, 3, 4])
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_workers in (1, 2):
+            path = os.path.join(tmp, f'fail_{n_workers}.jsonl')
+            try:
+                run_sweep_executor(tasks, _fail_on_two, path, n_workers=n_workers, progress=None)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError('the failing task should re-raise')
+            assert sorted(r['k'] for r in _records(path).values()) == [0, 1, 3, 4]
+
+
+if __name__ == '__main__':
+    test_task_seeds_are_deterministic()
+    test_resume_skips_done_and_repairs_partial_line()
+    test_parallel_matches_serial()
+    test_failed_task_keeps_other_results()
+    print('Parameter sweep tests passed.')
@@ -0,0 +1,62 @@
+"""
+Test Patch Embedding
+
+Checks zero-copy patch views, streaming randomized PCA against an exact SVD and the kNN spectral embedding.
+"""
+
+import numpy as np
+import pytest
+from core.semantic_phase import patch_view, randomized_patch_pca, field_patch_embedding
+
+
+def _fields(n=64, m=48, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = np.meshgrid(np.linspace(0, 4 * np.pi, n), np.linspace(0, 3 * np.pi, m), indexing='ij')
+    Phi = 0.2 * np.sin(x) * np.cos(y) + 0.01 * rng.standard_normal((n, m))
+    S = np.where(x < 2 * np.pi, 1.0, -1.0) + 0.01 * rng.standard_normal((n, m))
+    return Phi, S
+
+
+def test_patch_view_matches_loop():
+    Phi, S = _fields()
+    p = 4
+    ref = np.vstack([np.concatenate([Phi[i:i + p, j:j + p].ravel(), S[i:i + p, j:j + p].ravel()])
+                     for i in range(0, 64, p) for j in range(0, 48, p)])
+    view = patch_view(Phi, S, p)
+    assert view.shape == (16, 12, 2, p, p) and view.base is not None
+    assert np.array_equal(view.reshape(len(ref), -1), ref)
+    assert patch_view(Phi, S, p, stride=2).shape[:2] == (31, 23)
+    assert patch_view(Phi[:-3], S[:-3], p).shape[:2] == (15, 12)  # ragged edge dropped
+
+
+def test_randomized_pca_matches_svd():
+    Phi, S = _fields()
+    view = patch_view(Phi, S, 4, stride=2)
+    X = view.reshape(-1, 32)
+    Xc = X - X.mean(axis=0)
+    U, s, Vt = np.linalg.svd(Xc, full_matrices=False)
+    exact = U[:, :3] * s[:3]
+    approx = randomized_patch_pca(view, n_components=3, batch_size=100)
+    for c in range(3):
+        assert abs(abs(np.corrcoef(exact[:, c], approx[:, c])[0, 1]) - 1) < 1e-6
+    assert np.allclose(field_patch_embedding(Phi, S, 4, 'randomized_pca', stride=2, batch_size=100),
+                       approx[:, :2])
+
+
+def test_knn_spectral_separates_regions():
+    pytest.importorskip('scipy')
+    Phi, S = _fields(128, 96)
+    side = patch_view(Phi, S, 4)[:, :, 1].mean(axis=(2, 3)).ravel() > 0
+    for n_landmarks in (10 ** 6, 300):
+        Y = field_patch_embedding(Phi, S, 4, 'knn_spectral', n_landmarks=n_landmarks)
+        assert Y.shape == (32 * 24, 2) and np.all(np.isfinite(Y))
+        split = Y[:, 0] > np.median(Y[:, 0])
+        agreement = max(np.mean(split == side), np.mean(split != side))
+        assert agreement > 0.95
+
+
+if __name__ == '__main__':
+    test_patch_view_matches_loop()
+    test_randomized_pca_matches_svd()
+    test_knn_spectral_separates_regions()
+    print('Patch embedding tests passed.')
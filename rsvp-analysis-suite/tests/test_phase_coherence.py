@@ -0,0 +1,45 @@
+"""
+Test Phase Coherence
+
+Checks the matrix-product temporal coherence and the lagged / streaming variants.
+"""
+
+import numpy as np
+from simulation.phase_coherence import temporal_coherence, lagged_coherence, StreamingCoherence
+
+
+def _series(T=12, shape=(6, 5), seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal((T, *shape))
+    return base, 0.5 * np.roll(base, 2, axis=0) + rng.standard_normal((T, *shape))
+
+
+def test_matches_corrcoef_loop():
+    Phi_ts, S_ts = _series()
+    C = temporal_coherence(Phi_ts, S_ts)
+    T = Phi_ts.shape[0]
+    ref = np.array([[np.corrcoef(Phi_ts[i].ravel(), S_ts[j].ravel())[0, 1] for j in range(T)] for i in range(T)])
+    assert np.allclose(C, ref)
+
+
+def test_lagged_methods_agree():
+    Phi_ts, S_ts = _series(T=15)
+    C = temporal_coherence(Phi_ts, S_ts)
+    direct = lagged_coherence(Phi_ts, S_ts, max_lag=4)
+    fft = lagged_coherence(Phi_ts, S_ts, max_lag=4, method='fft')
+    diag = np.array([np.mean(np.diagonal(C, offset=k)) for k in range(-4, 5)])
+    assert np.allclose(direct, diag)
+    assert np.allclose(fft, diag)
+
+    stream = StreamingCoherence(Phi_ts.shape[1:], max_lag=4)
+    for p, s in zip(Phi_ts, S_ts):
+        stream.update(p, s)
+    assert np.allclose(stream.result(), diag)
+    # the S series lags Phi by two frames
+    assert np.argmax(direct) == 4 + 2
+
+
+if __name__ == '__main__':
+    test_matches_corrcoef_loop()
+    test_lagged_methods_agree()
+    print('Phase coherence tests passed.')
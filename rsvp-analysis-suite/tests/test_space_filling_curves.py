@@ -0,0 +1,50 @@
+"""
+Test Space-Filling Curves
+
+Checks the vectorized Hilbert/Morton codecs, the legacy tartan ordering and CurveLayout packing.
+"""
+
+import numpy as np
+from core.tiling_entropy import (hilbert_encode, hilbert_decode, morton_encode, morton_decode,
+                                 hilbert_like_from_gray, int_to_gray, tartan_tiling_coords,
+                                 tile_order_from_tartan, curve_permutation, CurveLayout, TileGrid)
+
+
+def test_hilbert_is_a_continuous_bijection():
+    order = 6
+    d = np.arange(4 ** order)
+    x, y = hilbert_decode(d, order)
+    assert np.all(np.abs(np.diff(x)) + np.abs(np.diff(y)) == 1)
+    assert np.array_equal(hilbert_encode(x, y, order), d)
+    assert hilbert_encode(3, 0, 2) == 15 and hilbert_decode(15, 2) == (3, 0)
+
+
+def test_morton_round_trip_and_legacy_tartan():
+    rng = np.random.default_rng(0)
+    xs, ys = rng.integers(0, 2 ** 31, 500), rng.integers(0, 2 ** 31, 500)
+    X, Y = morton_decode(morton_encode(xs, ys))
+    assert np.array_equal(X, xs) and np.array_equal(Y, ys)
+    order = 3
+    assert tartan_tiling_coords(order) == [hilbert_like_from_gray(int_to_gray(i), order) for i in range(64)]
+    assert sorted(tartan_tiling_coords(order, curve='hilbert')) == sorted(tartan_tiling_coords(order))
+    assert tile_order_from_tartan(2, 1) == [0, 4, 5, 1, 13, 9, 8, 12, 15, 11, 10, 14, 2, 6, 7, 3]
+    assert sorted(tile_order_from_tartan(5, 3, (20, 13), curve='hilbert')) == list(range(7 * 5))
+
+
+def test_curve_layout_tiles_are_contiguous():
+    A = np.random.default_rng(1).random((23, 17, 2))
+    perm = curve_permutation(A.shape[:2], 'hilbert')
+    assert np.array_equal(np.sort(perm), np.arange(23 * 17))
+    layout = CurveLayout(A.shape[:2], tile_size=(5, 4), curve='morton')
+    packed = layout.pack(A)
+    assert packed.shape == (23 * 17, 2) and np.array_equal(layout.unpack(packed), A)
+    grid = TileGrid(A.shape[:2], (5, 4))
+    assert layout.tile_offsets.size == len(grid)
+    assert np.allclose(layout.tile_sums(packed), grid.tile_sums(A))
+
+
+if __name__ == '__main__':
+    test_hilbert_is_a_continuous_bijection()
+    test_morton_round_trip_and_legacy_tartan()
+    test_curve_layout_tiles_are_contiguous()
+    print('Space-filling curve tests passed.')
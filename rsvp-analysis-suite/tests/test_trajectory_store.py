@@ -0,0 +1,78 @@
+"""
+Test Trajectory Store
+
+Round-trips frames through the chunked store and checks JSON metadata in save_state.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+from core.rsvp_fields import save_state, load_state
+from utils.io_utils import save_numpy_state, load_numpy_state
+from utils.trajectory_store import TrajectoryWriter, TrajectoryReader
+
+
+def _frames(n=11, shape=(10, 7), seed=0):
+    rng = np.random.default_rng(seed)
+    return [(0.1 * k, rng.standard_normal(shape), (rng.standard_normal(shape), rng.standard_normal(shape)),
+             rng.standard_normal(shape)) for k in range(n)]
+
+
+def test_windowed_reads_across_chunks_and_tiles():
+    frames = _frames()
+    S_all = np.stack([f[3] for f in frames])
+    for codec in (None, 'zlib'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run')
+            with TrajectoryWriter(path, (10, 7), chunk_frames=4, tile=(4, 3), codec=codec,
+                                  metadata={'dt': 0.1}) as w:
+                for t, Phi, v, S in frames:
+                    w.append(t, Phi, v, S)
+            r = TrajectoryReader(path)
+            assert len(r) == 11 and r.metadata == {'dt': 0.1}
+            assert np.array_equal(r.read('S'), S_all)
+            win = r.read('S', slice(2, 9), (slice(3, 9), slice(1, 6)))
+            assert np.array_equal(win, S_all[2:9, 3:9, 1:6])
+            t, Phi, (vx, vy), S = r.frame(-1)
+            assert t == frames[-1][0] and np.array_equal(vy, frames[-1][2][1])
+            assert r.time_slice(0.25, 0.55) == slice(3, 6)
+
+
+def test_reopen_appends_after_flushed_frames():
+    frames = _frames(n=6)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'run')
+        with TrajectoryWriter(path, (10, 7), chunk_frames=4) as w:
+            for f in frames[:3]:
+                w.append(*f)
+        with TrajectoryWriter(path, (10, 7)) as w:
+            for f in frames[3:]:
+                w.append(*f)
+        r = TrajectoryReader(path)
+        assert np.array_equal(r.read('Phi'), np.stack([f[1] for f in frames]))
+        assert np.allclose(r.times, [f[0] for f in frames])
+
+
+def test_save_state_metadata_is_json():
+    Phi, v, S = np.zeros((4, 4)), (np.ones((4, 4)), np.ones((4, 4))), np.zeros((4, 4))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snap.npz')
+        save_state(path, Phi, v, S, {'t': 0.5, 'tag': 'x'})
+        assert load_state(path)[3] == {'t': 0.5, 'tag': 'x'}
+        # legacy repr() metadata still loads, without eval
+        np.savez(path, Phi=Phi, vx=v[0], vy=v[1], S=S, metadata=repr({'t': 1}))
+        assert load_state(path)[3] == {'t': 1}
+        # numpy scalars / arrays produced by solvers serialize as plain JSON
+        meta = {'n': np.int64(3), 'dt': np.float32(0.5), 'shape': np.array([4, 4])}
+        save_state(path, Phi, v, S, meta)
+        assert load_state(path)[3] == {'n': 3, 'dt': 0.5, 'shape': [4, 4]}
+        save_numpy_state(path, metadata=meta, Phi=Phi)
+        assert load_numpy_state(path)['metadata'] == {'n': 3, 'dt': 0.5, 'shape': [4, 4]}
+
+
+if __name__ == '__main__':
+    test_windowed_reads_across_chunks_and_tiles()
+    test_reopen_appends_after_flushed_frames()
+    test_save_state_metadata_is_json()
+    print('Trajectory store tests passed.')
@@ -6,19 +6,31 @@ Handles GPU backend selection and availability checks for RSVP simulations.
 Purpose:
 - Automatically detect if CuPy/Numba GPU acceleration is available.
 - Provide unified interface for choosing CPU/GPU.
+- Resolve the array backend used by the solvers ('numpy', 'numba', 'cupy') from
+  `config.Config.backend` or an explicit choice, and expose its array module.
 
 Outputs:
 - GPU availability flag
 - Recommended backend
+- Resolved solver backend name / array module
 
 Testing Focus:
 - Detection logic across systems
 """
 from __future__ import annotations
+from typing import Optional
+
+import numpy as np
 
 GPU_AVAILABLE = False
 BACKEND = 'cpu'
 
+try:
+    import numba  # noqa: F401
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 try:
     import cupy as cp
     GPU_AVAILABLE = True
@@ -43,9 +55,58 @@ def is_gpu_available() -> bool:
     return GPU_AVAILABLE
 
 
+# config / detection names -> solver backend
+BACKEND_ALIASES = {
+    'numpy': 'numpy',
+    'cpu': 'numpy',
+    'numba': 'numba',
+    'gpu_numba': 'numba',  # no CUDA kernels yet: use the parallel CPU kernel
+    'cupy': 'cupy',
+    'gpu_cupy': 'cupy',
+}
+
+
+def resolve_backend(name: Optional[str] = None, prefer_gpu: bool = False) -> str:
+    """Return the solver backend ('numpy', 'numba' or 'cupy') to use.
+
+    name=None reads `config.default().backend`. prefer_gpu=True upgrades to the
+    detected GPU backend when one is available (and silently stays on the CPU
+    otherwise, like `select_backend`).
+    """
+    if prefer_gpu and GPU_AVAILABLE:
+        name = select_backend(prefer_gpu=True)
+    elif name is None:
+        from config import default
+        name = default().backend
+    key = str(name).lower()
+    if key not in BACKEND_ALIASES:
+        raise ValueError(f'Unknown array backend: {name}')
+    resolved = BACKEND_ALIASES[key]
+    if resolved == 'numba' and not NUMBA_AVAILABLE:
+        raise ImportError('numba is required for the numba backend')
+    if resolved == 'cupy' and BACKEND != 'gpu_cupy':
+        raise ImportError('cupy is required for the cupy backend')
+    return resolved
+
+
+def get_array_module(backend: str):
+    """Return the array namespace (numpy or cupy) for a resolved backend."""
+    if backend == 'cupy':
+        return cp
+    return np
+
+
+def to_host(arr):
+    """Copy a backend array back to a NumPy array (no-op for NumPy arrays)."""
+    if BACKEND == 'gpu_cupy' and isinstance(arr, cp.ndarray):
+        return cp.asnumpy(arr)
+    return np.asarray(arr)
+
+
 # Demo harness
 if __name__ == '__main__':
     print('gpu_utils demo')
     print('GPU available:', is_gpu_available())
     print('Selected backend:', select_backend())
+    print('Solver backend (from config):', resolve_backend())
 
@@ -6,6 +6,7 @@ Provides:
 - experiment logging and JSON metadata storage
 - simple experiment registry using a local directory structure
 - wrappers for saving/loading numpy states and pandas DataFrames
+  (multi-frame field trajectories live in utils.trajectory_store)
 - reproducible RNG state capture and restore helpers
 - lightweight JSONL experiment logger for streaming experiment records
 
@@ -43,16 +44,37 @@ def new_experiment(name: str, metadata: Dict[str, Any] | None = None) -> str:
     return path
 
 
-def save_numpy_state(path: str, **arrays) -> None:
-    """Save named numpy arrays to a .npz file at path."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    np.savez(path, **arrays)
+def json_default(obj: Any) -> Any:
+    """json.dumps fallback for numpy metadata: scalars via .item(), arrays via .tolist()."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def save_numpy_state(path: str, metadata: Dict[str, Any] | None = None, compress: bool = False, **arrays) -> None:
+    """Save named numpy arrays to a .npz file at path.
+
+    metadata, if given, is stored as a JSON string under the key 'metadata'; numpy
+    scalars and arrays in it are stored as plain numbers and lists.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if metadata is not None:
+        arrays['metadata'] = np.array(json.dumps(metadata, default=json_default))
+    (np.savez_compressed if compress else np.savez)(path, **arrays)
+
 
+def load_numpy_state(path: str) -> Dict[str, Any]:
+    """Load a .npz saved with save_numpy_state and return a dict of arrays.
 
-def load_numpy_state(path: str) -> Dict[str, np.ndarray]:
-    """Load a .npz saved with save_numpy_state and return a dict of arrays."""
-    data = np.load(path, allow_pickle=True)
-    return {k: data[k] for k in data.files}
+    A JSON 'metadata' entry is decoded back to a dict; object arrays are refused (no pickle).
+    """
+    with np.load(path, allow_pickle=False) as data:
+        out = {k: data[k] for k in data.files}
+    if 'metadata' in out and out['metadata'].dtype.kind == 'U':
+        out['metadata'] = json.loads(str(out['metadata']))
+    return out
 
 
 def save_dataframe(path: str, df) -> None:
@@ -0,0 +1,295 @@
+"""
+trajectory_store.py
+
+Chunked on-disk store for RSVP field trajectories (t, Phi, vx, vy, S).
+
+Purpose:
+- Append frames during a run without keeping the trajectory in memory.
+- Read any time range and spatial window back by touching only the chunks it
+  intersects, so runs far larger than RAM can be analyzed.
+- Keep metadata as plain JSON next to the data.
+
+Layout (one directory per run):
+- meta.json           shape, dtype, chunking, codec, frame count, chunk index, user metadata
+- times.f64           append-only float64 frame times
+- <field>/<k>_<i>_<j>.npy   time chunk k, spatial tile (i, j); memory-mapped on read
+- <field>/<k>_<i>_<j>.zlib  (or .lzma) compressed chunk when a codec is set
+
+Each time chunk holds up to `chunk_frames` frames; the writer buffers one chunk
+per field, so writer memory is about chunk_frames * 4 frames. meta.json is
+replaced atomically after the chunk files are written, so a reader never sees
+a frame whose data is not on disk.
+
+Inputs:
+- path: run directory
+- shape: (nx, ny) lattice shape
+- chunk_frames, tile, codec: chunking and compression settings
+
+Outputs:
+- TrajectoryWriter / TrajectoryReader; `read(field, frames, window)` arrays
+
+Testing Focus:
+- Round trip of frames and metadata, with and without compression
+- Windowed reads crossing chunk and tile boundaries
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import bisect
+import json
+import lzma
+import os
+import zlib
+
+import numpy as np
+
+Array = np.ndarray
+
+FIELDS = ('Phi', 'vx', 'vy', 'S')
+CODECS = {
+    None: ('.npy', None, None),
+    'zlib': ('.zlib', lambda data, level: zlib.compress(data, level), zlib.decompress),
+    'lzma': ('.lzma', lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+}
+FORMAT_VERSION = 1
+
+
+def _tile_edges(n: int, size: int) -> List[Tuple[int, int]]:
+    return [(a, min(a + size, n)) for a in range(0, n, size)]
+
+
+def _as_slice(index: Union[int, slice, None], n: int) -> slice:
+    if index is None:
+        return slice(0, n)
+    if isinstance(index, (int, np.integer)):
+        i = int(index) + n if index < 0 else int(index)
+        if not 0 <= i < n:
+            raise IndexError(f'index {index} out of range for {n}')
+        return slice(i, i + 1)
+    start, stop, step = index.indices(n)
+    if step != 1:
+        raise ValueError('strided slices are not supported; read a range and subsample it')
+    return slice(start, max(start, stop))
+
+
+def _write_json_atomic(path: str, obj: Dict[str, Any]) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(obj, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class TrajectoryWriter:
+    """Append (t, Phi, (vx, vy), S) frames to a chunked trajectory directory.
+
+    Opening an existing run with the same shape and dtype continues it; frames are
+    appended after the last flushed one.
+    """
+
+    def __init__(self, path: str, shape: Tuple[int, int], dtype: str = 'float64', chunk_frames: int = 16,
+                 tile: Optional[Tuple[int, int]] = None, codec: Optional[str] = None, level: int = 1,
+                 metadata: Optional[Dict[str, Any]] = None):
+        if codec not in CODECS:
+            raise ValueError(f'unknown codec {codec!r}; expected one of {sorted(c for c in CODECS if c)} or None')
+        if chunk_frames < 1:
+            raise ValueError('chunk_frames must be >= 1')
+        self.path = path
+        self.shape = tuple(int(n) for n in shape)
+        self.dtype = np.dtype(dtype)
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+            if tuple(self.meta['shape']) != self.shape or self.meta['dtype'] != self.dtype.str:
+                raise ValueError(f'existing store at {path} has shape {self.meta["shape"]} '
+                                 f'and dtype {self.meta["dtype"]}')
+            if metadata:
+                self.meta['metadata'].update(metadata)
+        else:
+            tile = tuple(tile) if tile is not None else self.shape
+            self.meta = {
+                'version': FORMAT_VERSION,
+                'fields': list(FIELDS),
+                'shape': list(self.shape),
+                'dtype': self.dtype.str,
+                'chunk_frames': int(chunk_frames),
+                'tile': [int(tile[0]), int(tile[1])],
+                'codec': codec,
+                'n_frames': 0,
+                'chunks': [],
+                'metadata': dict(metadata or {}),
+            }
+        for name in self.meta['fields']:
+            os.makedirs(os.path.join(path, name), exist_ok=True)
+        self.chunk_frames = self.meta['chunk_frames']
+        self._rows = _tile_edges(self.shape[0], self.meta['tile'][0])
+        self._cols = _tile_edges(self.shape[1], self.meta['tile'][1])
+        self._buf = {name: np.empty((self.chunk_frames,) + self.shape, dtype=self.dtype) for name in self.meta['fields']}
+        self._times: List[float] = []
+        self._times_path = os.path.join(path, 'times.f64')
+        # drop times that were written but never committed to meta.json
+        if os.path.exists(self._times_path):
+            with open(self._times_path, 'rb+') as f:
+                f.truncate(self.meta['n_frames'] * 8)
+        self._closed = False
+
+    @property
+    def n_frames(self) -> int:
+        return self.meta['n_frames'] + len(self._times)
+
+    def append(self, t: float, Phi: Array, v: Tuple[Array, Array], S: Array) -> None:
+        """Buffer one frame; a full chunk is written out automatically."""
+        if self._closed:
+            raise ValueError('writer is closed')
+        k = len(self._times)
+        for name, arr in zip(FIELDS, (Phi, v[0], v[1], S)):
+            if arr.shape != self.shape:
+                raise ValueError(f'{name} has shape {arr.shape}, expected {self.shape}')
+            self._buf[name][k] = arr
+        self._times.append(float(t))
+        if len(self._times) == self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered frames as a new time chunk and commit meta.json."""
+        n = len(self._times)
+        if n == 0:
+            return
+        ext, compress, _ = CODECS[self.meta['codec']]
+        k = len(self.meta['chunks'])
+        for name, buf in self._buf.items():
+            for i, (r0, r1) in enumerate(self._rows):
+                for j, (c0, c1) in enumerate(self._cols):
+                    block = np.ascontiguousarray(buf[:n, r0:r1, c0:c1])
+                    fname = os.path.join(self.path, name, f'{k}_{i}_{j}{ext}')
+                    if compress is None:
+                        np.save(fname, block)
+                    else:
+                        with open(fname, 'wb') as f:
+                            f.write(compress(block.tobytes(), self.level))
+        with open(self._times_path, 'ab') as f:
+            f.write(np.asarray(self._times, dtype='<f8').tobytes())
+        start = self.meta['n_frames']
+        self.meta['chunks'].append([start, start + n])
+        self.meta['n_frames'] = start + n
+        _write_json_atomic(os.path.join(self.path, 'meta.json'), self.meta)
+        self._times = []
+
+    def close(self) -> None:
+        if not self._closed:
+            self.flush()
+            self._closed = True
+
+    def __enter__(self) -> 'TrajectoryWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TrajectoryReader:
+    """Random access to a trajectory written by TrajectoryWriter.
+
+    Only chunks intersecting the requested frames and window are opened;
+    uncompressed chunks are memory-mapped, compressed ones decompressed one at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.shape = tuple(self.meta['shape'])
+        self.dtype = np.dtype(self.meta['dtype'])
+        self.fields = tuple(self.meta['fields'])
+        self.metadata = self.meta['metadata']
+        self.n_frames = self.meta['n_frames']
+        self.times = np.fromfile(os.path.join(path, 'times.f64'), dtype='<f8', count=self.n_frames)
+        self._starts = [c[0] for c in self.meta['chunks']]
+        self._rows = _tile_edges(self.shape[0], self.meta['tile'][0])
+        self._cols = _tile_edges(self.shape[1], self.meta['tile'][1])
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def time_slice(self, t0: float, t1: float) -> slice:
+        """Frame slice covering times t0 <= t < t1 (times are assumed nondecreasing)."""
+        return slice(int(np.searchsorted(self.times, t0, 'left')), int(np.searchsorted(self.times, t1, 'left')))
+
+    def _chunk(self, name: str, k: int, i: int, j: int) -> Array:
+        ext, _, decompress = CODECS[self.meta['codec']]
+        fname = os.path.join(self.path, name, f'{k}_{i}_{j}{ext}')
+        if decompress is None:
+            return np.load(fname, mmap_mode='r')
+        start, stop = self.meta['chunks'][k]
+        r0, r1 = self._rows[i]
+        c0, c1 = self._cols[j]
+        with open(fname, 'rb') as f:
+            raw = decompress(f.read())
+        return np.frombuffer(raw, dtype=self.dtype).reshape(stop - start, r1 - r0, c1 - c0)
+
+    def read(self, field: str, frames: Union[int, slice, None] = None,
+             window: Optional[Tuple[slice, slice]] = None) -> Array:
+        """Return field[frames, rows, cols] as an in-memory array of shape (nt, nr, nc)."""
+        if field not in self.fields:
+            raise ValueError(f'unknown field {field!r}; expected one of {self.fields}')
+        fs = _as_slice(frames, self.n_frames)
+        rs, cs = (None, None) if window is None else window
+        rs, cs = _as_slice(rs, self.shape[0]), _as_slice(cs, self.shape[1])
+        out = np.empty((fs.stop - fs.start, rs.stop - rs.start, cs.stop - cs.start), dtype=self.dtype)
+        if out.size == 0:
+            return out
+        k0 = bisect.bisect_right(self._starts, fs.start) - 1
+        k1 = bisect.bisect_right(self._starts, fs.stop - 1)
+        for k in range(k0, k1):
+            start, stop = self.meta['chunks'][k]
+            a, b = max(start, fs.start), min(stop, fs.stop)
+            for i, (r0, r1) in enumerate(self._rows):
+                ra, rb = max(r0, rs.start), min(r1, rs.stop)
+                if ra >= rb:
+                    continue
+                for j, (c0, c1) in enumerate(self._cols):
+                    ca, cb = max(c0, cs.start), min(c1, cs.stop)
+                    if ca >= cb:
+                        continue
+                    block = self._chunk(field, k, i, j)
+                    out[a - fs.start:b - fs.start, ra - rs.start:rb - rs.start, ca - cs.start:cb - cs.start] = \
+                        block[a - start:b - start, ra - r0:rb - r0, ca - c0:cb - c0]
+        return out
+
+    def frame(self, index: int) -> Tuple[float, Array, Tuple[Array, Array], Array]:
+        """Return (t, Phi, (vx, vy), S) for a single frame."""
+        Phi, vx, vy, S = (self.read(name, index)[0] for name in FIELDS)
+        return float(self.times[_as_slice(index, self.n_frames).start]), Phi, (vx, vy), S
+
+    def iter_chunks(self, field: str, window: Optional[Tuple[slice, slice]] = None) -> Iterator[Tuple[Array, Array]]:
+        """Yield (times, data) one time chunk at a time, for streaming reductions."""
+        for start, stop in self.meta['chunks']:
+            yield self.times[start:stop], self.read(field, slice(start, stop), window)
+
+
+def open_trajectory(path: str, mode: str = 'r', **kwargs) -> Union[TrajectoryReader, TrajectoryWriter]:
+    """Open a trajectory store for reading ('r') or appending ('a'; kwargs go to TrajectoryWriter)."""
+    if mode == 'r':
+        return TrajectoryReader(path)
+    if mode == 'a':
+        return TrajectoryWriter(path, **kwargs)
+    raise ValueError(f"mode must be 'r' or 'a', got {mode!r}")
+
+
+# Demo harness
+if __name__ == '__main__':
+    print('trajectory_store demo')
+    rng = np.random.default_rng(0)
+    shape = (64, 64)
+    with TrajectoryWriter('out/demo_traj', shape, chunk_frames=8, tile=(32, 32), codec='zlib',
+                          metadata={'dt': 0.01, 'solver': 'demo'}) as w:
+        for step in range(20):
+            Phi = rng.standard_normal(shape)
+            w.append(0.01 * step, Phi, (Phi, -Phi), Phi**2)
+    r = TrajectoryReader('out/demo_traj')
+    print('frames:', len(r), 'metadata:', r.metadata)
+    win = r.read('S', r.time_slice(0.05, 0.15), (slice(10, 40), slice(0, 16)))
+    print('window shape:', win.shape, 'mean:', win.mean())